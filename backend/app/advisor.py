@@ -1,7 +1,7 @@
 import logging
 from datetime import date
 from .models import ChartResponse, Panchanga
-from .engine import get_nakshatra
+from .engine import get_nakshatra, current_dasha
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +16,22 @@ def calculate_daily_energy(chart: ChartResponse, current_date: date, panchang: P
     Calculate the Daily Energy Score (0-100) based on multiple factors.
     Returns a dict with total score, breakdown, and label.
     """
-    
+    # Extract User's Moon Nakshatra
+    user_moon = next((p for p in chart.planets if p.name == 'Moon'), None)
+    user_moon_nak = user_moon.nakshatra if user_moon else "Ashwini" # Fallback
+
+    # Current Dasha lord: "Sun-Moon" -> "Sun"
+    running = current_dasha(chart.dashas, current_date)
+    current_dasha_lord = running.lord.split('-')[0] if running else "Jupiter"
+
+    return calculate_daily_energy_from_natal(user_moon_nak, chart.ascendant_sign, current_dasha_lord, panchang)
+
+def calculate_daily_energy_from_natal(user_moon_nak: str, ascendant_sign: str, current_dasha_lord: str,
+                                      panchang: Panchanga) -> dict:
+    """
+    Daily Energy Score from the natal core alone: Moon nakshatra, ascendant sign
+    and the Mahadasha lord running on the day.
+    """
     # 1. Panchanga Score (40%)
     panchanga_score = calculate_panchanga_score(panchang)
     
@@ -24,25 +39,19 @@ def calculate_daily_energy(chart: ChartResponse, current_date: date, panchang: P
     # Requires analyzing current Moon position vs Natal Moon
     # Using a simplified model for MVP: Look at Tara Bala (Compat) or simply Moon Sign friendliness?
     # Enhanced Strategy: Use Tara Bala (Nakshatra relationships)
-    
-    # Extract User's Moon Nakshatra
-    user_moon = next((p for p in chart.planets if p.name == 'Moon'), None)
-    user_moon_nak = user_moon.nakshatra if user_moon else "Ashwini" # Fallback
-    
     moon_transit_score = calculate_tara_bala(user_moon_nak, panchang.nakshatra.name)
     
     # 3. Dasha Score (20%)
     # Current Dasha lord's relationship to Lagna Lord OR generalized "Good/Bad" nature
     # Simplified MVP: Check if Dasha Lord is a benefic/malefic generally? 
     # Better: Check functional nature. For now, we'll use a neutral default + benefic bonus
-    current_dasha_lord = chart.dashas[0].lord.split('-')[0] # "Sun-Moon" -> "Sun"
-    dasha_score = calculate_dasha_score(current_dasha_lord, chart.ascendant_sign)
+    dasha_score = calculate_dasha_score(current_dasha_lord, ascendant_sign)
     
     # 4. Vara Score (10%)
     # Weekday Lord vs Natal Day Lord (or Ascendant Lord)
     # Using Vara vs Ascendant Lord relationship
     # Current Vara is in panchang.vara (e.g., "Sunday")
-    asc_lord = get_lord_of_sign(chart.ascendant_sign)
+    asc_lord = get_lord_of_sign(ascendant_sign)
     vara_lord = get_lord_of_weekday(panchang.vara)
     vara_score = get_friendship_score(asc_lord, vara_lord)
 
@@ -55,22 +64,7 @@ def calculate_daily_energy(chart: ChartResponse, current_date: date, panchang: P
     )
 
     # Determine Label & Colors
-    if total_score >= 80:
-        label = "Super Push Day"
-        color = "Green"
-        auspiciousness = "✨ Highly Favorable Day"
-    elif total_score >= 60:
-        label = "Push Day"
-        color = "Green"
-        auspiciousness = "✅ Favorable Day"
-    elif total_score >= 40:
-        label = "Balanced Day"
-        color = "Amber"
-        auspiciousness = "⚖️ Balanced Day"
-    else:
-        label = "Reflect Day"
-        color = "Red"
-        auspiciousness = "⚠️ Caution Advised"
+    label, color, auspiciousness = energy_label(total_score)
 
     # Generate Vibe & Theme
     vibe = get_nakshatra_vibe(panchang.nakshatra.name)
@@ -91,6 +85,18 @@ def calculate_daily_energy(chart: ChartResponse, current_date: date, panchang: P
         }
     }
 
+# (minimum score, label, color, auspiciousness), best first
+ENERGY_LABELS = [
+    (80, "Super Push Day", "Green", "✨ Highly Favorable Day"),
+    (60, "Push Day", "Green", "✅ Favorable Day"),
+    (40, "Balanced Day", "Amber", "⚖️ Balanced Day"),
+    (float("-inf"), "Reflect Day", "Red", "⚠️ Caution Advised"),
+]
+
+def energy_label(total_score: float) -> tuple:
+    """(label, color, auspiciousness) for a Daily Energy Score."""
+    return next(entry[1:] for entry in ENERGY_LABELS if total_score >= entry[0])
+
 def get_nakshatra_vibe(nak_name: str) -> str:
     """Return a short vibe string for the Nakshatra."""
     vibes = {
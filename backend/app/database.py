@@ -2,7 +2,7 @@ import os
 import json
 from typing import List, Optional, Any
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, ForeignKey, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from sqlalchemy.sql import func
 from pydantic import BaseModel
@@ -61,6 +61,19 @@ class DBChart(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+class DBChartNatal(Base):
+    """Natal points of a saved chart, kept for library-wide transit scans and matching."""
+    __tablename__ = "chart_natal"
+
+    chart_id = Column(Integer, ForeignKey("charts.id", ondelete="CASCADE"), primary_key=True)
+    # Birth data the points were computed from; a mismatch marks the row stale
+    source = Column(String)
+    moon = Column(Float, nullable=True)       # sidereal longitudes, chart's ayanamsa
+    ascendant = Column(Float, nullable=True)
+    saturn = Column(Float, nullable=True)
+    mars = Column(Float, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class DBUser(Base):
     __tablename__ = "users"
 
@@ -88,8 +101,17 @@ class SavedChart(BaseModel):
         from_attributes = True
 
 # --- DB INIT ---
+def _add_missing_columns(bind, table):
+    """Add nullable columns defined on `table` but missing from an existing database table."""
+    existing = {c["name"] for c in inspect(bind).get_columns(table.name)}
+    with bind.begin() as conn:
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(bind.dialect)}'))
+
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns(engine, DBChartNatal.__table__)
 
 # --- CRUD OPERATIONS ---
 def get_db():
@@ -152,6 +174,7 @@ def delete_chart(chart_id: int):
     try:
         chart = db.query(DBChart).filter(DBChart.id == chart_id).first()
         if chart:
+            db.query(DBChartNatal).filter(DBChartNatal.chart_id == chart_id).delete()
             db.delete(chart)
             db.commit()
     finally:
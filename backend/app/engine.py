@@ -1,10 +1,13 @@
 import swisseph as swe
 import os
+import math
+import bisect
+from functools import lru_cache
+from itertools import compress
 import logging
 from datetime import date, time, timedelta, datetime, timezone
-from typing import Optional, List, Tuple, Dict
-from threading import RLock
-from timezonefinder import TimezoneFinder
+from typing import Optional, List, Tuple, Dict, Iterator, FrozenSet, NamedTuple, Sequence, Union
+import numpy as np
 import pytz
 from .models import (
     PlanetPosition, House, ChartResponse, BirthDetails, Panchanga, 
@@ -12,9 +15,17 @@ from .models import (
     KaranaData, SpecialTime, DailyPanchangaResponse, LocationInfo,
     DateInfo, TithiDataExtended, NakshatraDataExtended, YogaDataExtended, 
     KaranaDataExtended, VaraData, PanchangaExtended, HinduCalendar, 
-    AuspiciousTiming, AuspiciousTimings, PlanetaryPositionSmall
+    AuspiciousTiming, AuspiciousTimings, PlanetaryPositionSmall, DashaPeriod
 )
 from .utils.timezone_helper import get_timezone_for_coordinates, get_local_datetime, get_sunrise_sunset, jd_to_datetime
+from .utils.local_time import format_local, jd_to_local, jd_to_local_many
+from . import ephemeris
+from .transitions import LIMBS, Transition, TransitionSolver
+from .transition_index import get_index, lookup_panchanga
+from .services.solar_events import solar_day, sunrise, following_day, vedic_day, quantize
+from .services.lunar_events import moon_day
+from .services.day_context import DayContext, WEEKDAY_LORDS, day_context
+from .services.timezones import timezone_name, get_zone
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +36,7 @@ logger = logging.getLogger(__name__)
 def get_timezone_offset(timezone_name: str) -> timedelta:
     """Get UTC offset for a timezone name."""
     try:
-        tz = pytz.timezone(timezone_name)
+        tz = get_zone(timezone_name)
         now = datetime.now()
         localized = tz.localize(now)
         offset = localized.utcoffset()
@@ -48,9 +59,9 @@ def convert_to_utc(date_obj: date, time_obj: time, location_timezone: str) -> Tu
         
         # Localize
         try:
-            local_tz = pytz.timezone(location_timezone)
+            local_tz = get_zone(location_timezone)
         except:
-            local_tz = pytz.timezone('UTC') # Fallback
+            local_tz = get_zone('UTC') # Fallback
             
         birth_local = local_tz.localize(birth_local_naive)
         
@@ -88,7 +99,7 @@ def convert_utc_to_local(utc_time_str: str, timezone_name: str) -> str:
         
         utc_dt = datetime(y, mo, d, h, m, s, tzinfo=timezone.utc)
         
-        local_tz = pytz.timezone(timezone_name)
+        local_tz = get_zone(timezone_name)
         local_dt = utc_dt.astimezone(local_tz)
         
         return local_dt.strftime("%I:%M %p %Y-%m-%d")
@@ -98,7 +109,6 @@ def convert_utc_to_local(utc_time_str: str, timezone_name: str) -> str:
 
 # Initialize Swiss Ephemeris
 EPHEME_PATH = os.getenv("EPHEME_PATH", "/app/ephemeris")
-tf = TimezoneFinder()
 
 # Validate ephemeris path and files exist
 if not os.path.exists(EPHEME_PATH):
@@ -117,17 +127,9 @@ if missing:
     )
 
 swe.set_ephe_path(EPHEME_PATH)
-swe_lock = RLock()
-
-# Ayanamsa Mapping
-# To add more, find the ID in swisseph documentation
-AYANAMSA_MAP = {
-    'LAHIRI': swe.SIDM_LAHIRI,
-    'RAMAN': swe.SIDM_RAMAN,
-    'KRISHNAMURTI': swe.SIDM_KRISHNAMURTI,
-    'FAGAN_BRADLEY': swe.SIDM_FAGAN_BRADLEY,
-    'SAYANA': None, # Tropical - handled specially
-}
+
+# Sidereal positions go through `ephemeris` (tropical position minus an explicit
+# ayanamsa offset), so no calculation depends on the global `swe.set_sid_mode`.
 
 PLANET_MAP = {
     'Sun': swe.SUN,
@@ -286,8 +288,12 @@ WEEKDAYS = [
     "Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"
 ]
 
-def calculate_panchanga(moon_lon: float, sun_lon: float, jd: float, details: BirthDetails) -> Panchanga:
-    """Calculate Panchanga (Tithi, Vara, Nakshatra, Yoga, Karana)."""
+def calculate_panchanga(moon_lon: float, sun_lon: float, jd: float, details: Optional[BirthDetails] = None,
+                        vara: Optional[str] = None) -> Panchanga:
+    """
+    Calculate Panchanga (Tithi, Vara, Nakshatra, Yoga, Karana).
+    The vara is taken from `vara` when given, otherwise from the date in `details` and its sunrise.
+    """
     
     # 1. Tithi (Lunar Day)
     diff = (moon_lon - sun_lon) % 360
@@ -355,17 +361,18 @@ def calculate_panchanga(moon_lon: float, sun_lon: float, jd: float, details: Bir
     )
 
     # 5. Vara (Weekday)
-    geopos = (details.longitude, details.latitude, 0)
-    jd_midnight = swe.julday(details.date.year, details.date.month, details.date.day, 0)
-    rise_res = swe.rise_trans(jd_midnight, swe.SUN, swe.CALC_RISE, geopos)
-    sunrise_jd = rise_res[1][0] if isinstance(rise_res, tuple) else rise_res
-    
-    if jd < sunrise_jd:
-       vara_idx = (int(jd_midnight - 1 + 1.5) % 7)
+    if vara is not None:
+        vara_name = vara
     else:
-       vara_idx = (int(jd_midnight + 1.5) % 7)
-       
-    vara_name = WEEKDAYS[vara_idx]
+        jd_midnight = swe.julday(details.date.year, details.date.month, details.date.day, 0)
+        sunrise_jd = solar_day(details.date, details.latitude, details.longitude).sunrise
+
+        if jd < sunrise_jd:
+           vara_idx = (int(jd_midnight - 1 + 1.5) % 7)
+        else:
+           vara_idx = (int(jd_midnight + 1.5) % 7)
+
+        vara_name = WEEKDAYS[vara_idx]
 
     return Panchanga(
         tithi=tithi_data,
@@ -386,63 +393,14 @@ def calculate_daily_panchanga(
     Calculates positions at Sunrise.
     """
     try:
-        tz = pytz.timezone(timezone_str)
+        # 1. Sunrise JD and weekday from the shared day context
+        ctx = day_context(date_obj, lat, lon)
 
-        # 1. Sunrise JD
-        # Use noon UTC to find sunrise of that day
-        noon_utc = datetime.combine(date_obj, time(12, 0), tzinfo=tz).astimezone(timezone.utc)
-        jd_noon = swe.julday(noon_utc.year, noon_utc.month, noon_utc.day, 12.0 + noon_utc.minute/60.0)
-        
-        geopos = (lon, lat, 0)
-        res_rise = swe.rise_trans(
-            jd_noon, swe.SUN, swe.CALC_RISE | swe.BIT_DISC_CENTER, geopos
-        )
-        
-        if isinstance(res_rise, tuple):
-             val = res_rise[1][0]
-        else:
-             val = res_rise
-             
-        if val == 0: # Checks logic? No, res_rise[0] is return code?
-             # Swisseph returns (int ret, tuple t)
-             # If ret == -1 or -2 error.
-             # If ret == 0, success.
-             # But line 347 checks isinstance?
-             # Let's trust line 347 pattern:
-             # sunrise_jd = rise_res[1][0] if isinstance(rise_res, tuple) else rise_res
-             pass
-        
-        if isinstance(res_rise, tuple) and res_rise[0] == 0:
-            jd_sunrise = res_rise[1][0]
-        elif not isinstance(res_rise, tuple):
-             jd_sunrise = res_rise # Old version?
-        else:
-            # Fallback
-            dt_6am = datetime.combine(date_obj, time(6, 0), tz).astimezone(timezone.utc)
-            jd_sunrise = swe.julday(dt_6am.year, dt_6am.month, dt_6am.day, dt_6am.hour + dt_6am.minute/60.0)
-
-        # 2. Calculate Positions at Sunrise
-        swe.set_sid_mode(swe.SIDM_LAHIRI)
-
-        # Sun
-        sun_res = swe.calc_ut(jd_sunrise, swe.SUN, swe.FLG_SWIEPH | swe.FLG_SIDEREAL)
-        sun_lon = sun_res[0][0]
-
-        # Moon
-        moon_res = swe.calc_ut(jd_sunrise, swe.MOON, swe.FLG_SWIEPH | swe.FLG_SIDEREAL)
-        moon_lon = moon_res[0][0]
-
-        # 3. Create Temp Details for 'Vara' calculation inside calculate_panchanga
-        # We pass the current_date as the 'date' in BirthDetails so logic works
-        temp_details = BirthDetails(
-            date=date_obj.isoformat(),
-            time="06:00",
-            latitude=lat,
-            longitude=lon,
-            ayanamsa_mode="LAHIRI"
-        )
+        # 2. Calculate Positions at Sunrise (Lahiri)
+        sun_lon = ephemeris.calc_ut(ctx.sunrise, swe.SUN, "LAHIRI")[0]
+        moon_lon = ephemeris.calc_ut(ctx.sunrise, swe.MOON, "LAHIRI")[0]
 
-        return calculate_panchanga(moon_lon, sun_lon, jd_sunrise, temp_details)
+        return calculate_panchanga(moon_lon, sun_lon, ctx.sunrise, vara=WEEKDAYS[ctx.weekday])
 
     except Exception as e:
         logger.error(f"Error in calculate_daily_panchanga: {e}")
@@ -477,131 +435,103 @@ def get_sunrise_sunset_daily(date_obj: date, lat: float, lon: float) -> Tuple[fl
     Get Sunrise, Sunset, and Next Sunrise JDs for a specific CIVIL DATE.
     Used for Daily Hora calculations.
     """
-    geopos = (lon, lat, 0)
-    
-    # JD for Midnight of the requested civil date
-    jd_midnight = swe.julday(date_obj.year, date_obj.month, date_obj.day, 0)
-    
-    # Find Sunrise for this civil day
-    # Search from midnight
-    rise = swe.rise_trans(jd_midnight, swe.SUN, swe.CALC_RISE, geopos)[1][0]
-    
-    # Find Sunset for this civil day (must be after sunrise)
-    sett = swe.rise_trans(rise, swe.SUN, swe.CALC_SET, geopos)[1][0]
-    
-    # Find Sunrise for NEXT civil day (to define night length)
-    # Search from tomorrow midnight to be safe/consistent?
-    # Or just search from sunset
-    next_rise = swe.rise_trans(sett, swe.SUN, swe.CALC_RISE, geopos)[1][0]
-    
-    return rise, sett, next_rise
+    return tuple(solar_day(date_obj, lat, lon))
+
+HORA_CACHE_SIZE = int(os.getenv("HORA_CACHE_SIZE", "4096"))
+
+class HoraSpan(NamedTuple):
+    index: int       # 1-12 day, 13-24 night
+    ruler: str
+    quality: str
+    color: str
+    start_jd: float  # JD (UT)
+    end_jd: float
+
+def _hora_quality(ruler_name: str, day_lord_name: str) -> Tuple[str, str]:
+    if ruler_name == day_lord_name:
+        return "Good", "#22c55e" # Own Hora is good
+    
+    # Standard: Check the relationship from the Day Lord's perspective
+    # "Horas of the planets which are friends of the Day Lord are good."
+    day_lord_info = PLANET_INFO.get(day_lord_name, {})
+    
+    if ruler_name in day_lord_info.get('friends', []):
+        return "Good", "#22c55e"
+    if ruler_name in day_lord_info.get('enemies', []):
+        return "Bad", "#ef4444"
+    return "Neutral", "#eab308" # Amber color for Neutral/Mixed
+
+@lru_cache(maxsize=HORA_CACHE_SIZE)
+def _hora_spans(lat: float, lon: float, ordinal: int) -> Tuple[HoraSpan, ...]:
+    """The 24 horas of the Vedic day starting at the sunrise of civil date `ordinal` (quantized location)."""
+    ctx = day_context(date.fromordinal(ordinal), lat, lon)
+    vedic_day_idx, day_lord_name = ctx.weekday, ctx.weekday_lord
+
+    # Day Horas split sunrise..sunset, night Horas sunset..next sunrise
+    # (ending exactly at the next sunrise, where the next day's first Hora starts)
+    bounds = ctx.parts(12) + ctx.parts(12, night=True)[1:]
+
+    # Hora Ruler Sequence (Reverse Speed): next Hora Ruler is the 6th from current in week order
+    spans = []
+    for i in range(24):
+        ruler = WEEKDAY_LORDS[(vedic_day_idx + 5 * i) % 7]
+        quality, color = _hora_quality(ruler, day_lord_name)
+        spans.append(HoraSpan(i + 1, ruler, quality, color, bounds[i], bounds[i + 1]))
+    return tuple(spans)
+
+def hora_spans(date_obj: date, lat: float, lon: float) -> Tuple[HoraSpan, ...]:
+    """Cached hora boundaries for the Vedic day starting at the sunrise of `date_obj`."""
+    return _hora_spans(*quantize(lat, lon), date_obj.toordinal())
+
+def hora_at(jd: float, lat: float, lon: float) -> Tuple[HoraSpan, HoraSpan]:
+    """
+    The hora running at `jd` (UT) and the one after it.
+    Before sunrise the previous Vedic day's night horas apply.
+    """
+    lat_q, lon_q = quantize(lat, lon)
+    y, m, d, _ = swe.revjul(jd + lon_q / 360.0)  # local mean date, as solar_day uses
+    ordinal = date(y, m, d).toordinal()
+    spans = _hora_spans(lat_q, lon_q, ordinal)
+    if jd < spans[0].start_jd:
+        ordinal -= 1
+    elif jd >= spans[-1].end_jd:
+        ordinal += 1
+    spans = _hora_spans(lat_q, lon_q, ordinal)
+    i = bisect.bisect_right([h.start_jd for h in spans], jd) - 1
+    if i < 0:
+        # Solar days tile time, so only float noise at a sunrise can land here
+        return _hora_spans(lat_q, lon_q, ordinal - 1)[-1], spans[0]
+    following = spans[i + 1] if i < 23 else _hora_spans(lat_q, lon_q, ordinal + 1)[0]
+    return spans[i], following
+
+def hora_models(spans: Sequence[HoraSpan], tz_str: str) -> List['Hora']:
+    """Hora response models, with local times converted in one pass."""
+    from .models import Hora
+    local = [dt.strftime("%I:%M %p") for dt in jd_to_local_many([h.start_jd for h in spans] + [spans[-1].end_jd], tz_str)]
+    return [
+        Hora(index=h.index, start_time=local[i], end_time=local[i + 1], ruler=h.ruler, quality=h.quality,
+             color=h.color, start_jd=h.start_jd, end_jd=h.end_jd)
+        for i, h in enumerate(spans)
+    ]
 
 def calculate_horas(date_obj: date, lat: float, lon: float, tz_str: str) -> 'DailyTimeline':
     """
-    Calculate 24 Horas for a given day.
+    Calculate 24 Horas for a given day (sunrise of `date_obj` to the next sunrise),
+    plus the previous day's night Horas that run from midnight until this sunrise.
     """
-    from .models import Hora, DailyTimeline # Local import to avoid circular dependency if any
-    
-    rise, sett, next_rise = get_sunrise_sunset_daily(date_obj, lat, lon)
-    
-    # Timezone conversion helper
-    def jd_to_local_str(jd_val):
-        utc_str = jd_to_time(jd_val)
-        return convert_utc_to_local(utc_str, tz_str)
-
-    # 1. Determine Day Lord (Vara)
-    # The ruler of the first Hora is the ruler of the weekday.
-    # Weekday defined by Sunrise.
-    # We used 'date_obj' so we assume the user wants the Horas "starting" on that civil date's sunrise.
-    weekday_idx = date_obj.weekday() # 0=Mon, 6=Sun
-    # Map Python weekday to Vedic (0=Sun, 1=Mon...)
-    # Python: Mon(0)..Sun(6) -> Vedic: Sun(0)..Sat(6) ?
-    # Wait. 
-    # Python: Mon=0, Tue=1, Wed=2, Thu=3, Fri=4, Sat=5, Sun=6.
-    # Vedic: Sun=0, Mon=1, Tue=2, Wed=3, Thu=4, Fri=5, Sat=6.
-    # Mapping: (python_day + 1) % 7
-    vedic_day_idx = (weekday_idx + 1) % 7
-    
-    # Planetary Rulers standard order (Sun -> Sat)
-    # 0=Sun, 1=Mon, 2=Mar, 3=Mer, 4=Jup, 5=Ven, 6=Sat
-    PLANET_ORDER = ['Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn']
-    day_lord_name = PLANET_ORDER[vedic_day_idx]
-    
-    # Define Quality Helper
-    def get_quality(ruler_name, day_lord_name):
-        if ruler_name == day_lord_name:
-            return "Good", "#22c55e" # Own Hora is good
-        
-        # Standard: Check the relationship from the Day Lord's perspective
-        # "Horas of the planets which are friends of the Day Lord are good."
-        day_lord_info = PLANET_INFO.get(day_lord_name, {})
-        
-        if ruler_name in day_lord_info.get('friends', []):
-            return "Good", "#22c55e"
-        if ruler_name in day_lord_info.get('enemies', []):
-            return "Bad", "#ef4444"
-        return "Neutral", "#eab308" # Amber color for Neutral/Mixed
-
-    # Hora Ruler Sequence (Reverse Speed): Sun, Ven, Mer, Moo, Sat, Jup, Mar
-    # Or simply: Next Hora Ruler is the 6th from current in week order.
-    HORA_ORDER = []
-    curr = vedic_day_idx
-    for _ in range(24):
-        HORA_ORDER.append(PLANET_ORDER[curr])
-        curr = (curr + 5) % 7
-        
-    horas = []
-    
-    # Day Horas (12 parts)
-    day_duration = sett - rise
-    part_len = day_duration / 12.0
-    
-    current_time = rise
-    for i in range(12):
-        start_t = current_time
-        end_t = current_time + part_len
-        
-        ruler = HORA_ORDER[i]
-        quality, color = get_quality(ruler, day_lord_name)
-        
-        horas.append(Hora(
-            index=i+1,
-            start_time=jd_to_local_str(start_t).split(" ")[0] + " " + jd_to_local_str(start_t).split(" ")[1], # HH:MM AM
-            end_time=jd_to_local_str(end_t).split(" ")[0] + " " + jd_to_local_str(end_t).split(" ")[1],
-            ruler=ruler,
-            quality=quality,
-            color=color
-        ))
-        current_time = end_t
-        
-    # Night Horas (12 parts)
-    night_duration = next_rise - sett
-    part_len_night = night_duration / 12.0
+    from .models import DailyTimeline # Local import to avoid circular dependency if any
     
-    current_time = sett
-    for i in range(12, 24):
-        start_t = current_time
-        end_t = current_time + part_len_night
-        
-        ruler = HORA_ORDER[i]
-        quality, color = get_quality(ruler, day_lord_name)
-        
-        horas.append(Hora(
-            index=i+1,
-            start_time=jd_to_local_str(start_t).split(" ")[0] + " " + jd_to_local_str(start_t).split(" ")[1],
-            end_time=jd_to_local_str(end_t).split(" ")[0] + " " + jd_to_local_str(end_t).split(" ")[1],
-            ruler=ruler,
-            quality=quality,
-            color=color
-        ))
-        current_time = end_t
+    spans = hora_spans(date_obj, lat, lon)
+    previous_night = hora_spans(date_obj - timedelta(days=1), lat, lon)[12:]
+    rise, sett = spans[0].start_jd, spans[12].start_jd
         
     return DailyTimeline(
         date=date_obj.isoformat(),
         location=f"{lat},{lon}",
-        sunrise=jd_to_local_str(rise),
-        sunset=jd_to_local_str(sett),
-        horas=horas
+        sunrise=format_local(rise, tz_str),
+        sunset=format_local(sett, tz_str),
+        horas=hora_models(spans, tz_str),
+        previous_night_horas=hora_models(previous_night, tz_str)
     )
 
 
@@ -609,17 +539,89 @@ def calculate_horas(date_obj: date, lat: float, lon: float, tz_str: str) -> 'Dai
 # CHART CALCULATION
 # ============================================================================
 
-def calculate_chart(details: BirthDetails) -> ChartResponse:
-    """Calculate complete birth chart with proper timezone handling."""
+# ============================================================================
+# CHART SECTIONS (include=)
+# ============================================================================
+
+CHART_SECTIONS = ("planets", "houses", "vargas", "dashas", "panchanga", "strengths", "special_times", "mandhi")
+
+# ChartResponse fields serialized for each section; ascendant and ayanamsa are always present
+CHART_SECTION_FIELDS = {
+    "planets": ["planets"],
+    "houses": ["houses"],
+    "vargas": ["divisional_charts"],
+    "dashas": ["dashas"],
+    "panchanga": ["panchanga"],
+    "strengths": ["strengths"],
+    "special_times": ["special_times"],
+    "mandhi": ["sunrise_time", "sunset_time", "mandhi_time_local"],
+}
+CHART_BASE_FIELDS = ["ascendant", "ascendant_sign", "ayanamsa"]
+
+class ChartSections(NamedTuple):
+    sections: FrozenSet[str]
+    vargas: Tuple[int, ...]  # divisional charts to return when "vargas" is included
+
+    def canonical(self) -> str:
+        parts = []
+        for name in CHART_SECTIONS:
+            if name not in self.sections:
+                continue
+            if name == "vargas" and self.vargas != tuple(VARGA_NUMS):
+                parts.append("vargas:" + ",".join(f"D{v}" for v in self.vargas))
+            else:
+                parts.append(name)
+        return ",".join(parts)
+
+    def response_fields(self) -> set:
+        fields = set(CHART_BASE_FIELDS)
+        for name in self.sections:
+            fields.update(CHART_SECTION_FIELDS[name])
+        return fields
+
+def parse_chart_include(spec: Optional[str]) -> Optional[ChartSections]:
+    """
+    Parse an include= spec such as "planets,houses,vargas:D1,D9,dashas".
+    Varga names following "vargas:" belong to it; a bare "vargas" means all of them.
+    Returns None (the full chart) for an empty spec or "all".
+    """
+    if spec is None or spec.strip().lower() in ("", "all"):
+        return None
+    sections = set()
+    vargas: List[int] = []
+    in_vargas = False
+    for token in (t.strip() for t in spec.split(",")):
+        if not token:
+            continue
+        if in_vargas and token[0] in "dD" and token[1:].isdigit():
+            name, varga = "vargas", token
+        else:
+            name, _, varga = token.partition(":")
+            name = name.lower()
+        if name not in CHART_SECTIONS:
+            raise ValueError(f"Unknown chart section: {name}")
+        sections.add(name)
+        in_vargas = name == "vargas"
+        if varga:
+            if not (varga[0] in "dD" and varga[1:].isdigit() and int(varga[1:]) in VARGA_ROWS):
+                raise ValueError(f"Unknown divisional chart: {varga}")
+            vargas.append(int(varga[1:]))
+    if "vargas" in sections and not vargas:
+        vargas = list(VARGA_NUMS)
+    return ChartSections(frozenset(sections), tuple(v for v in VARGA_NUMS if v in vargas))
+
+def calculate_chart(details: BirthDetails, include: Union[ChartSections, str, None] = None) -> ChartResponse:
+    """
+    Calculate birth chart with proper timezone handling.
+    `include` limits the work to the given sections (see `parse_chart_include`);
+    sections that are not requested are not computed and are left as None.
+    """
+    if include is None or isinstance(include, str):
+        include = parse_chart_include(include) or FULL_CHART
+    sections = include.sections
     try:
-        # Acquire lock for thread safety
-        with swe_lock:
-            mode_name = details.ayanamsa_mode
-            sid_mode = AYANAMSA_MAP.get(mode_name, swe.SIDM_LAHIRI)
-            is_tropical = mode_name == 'SAYANA'
-            
-            if not is_tropical:
-                swe.set_sid_mode(sid_mode)
+        mode_name = details.ayanamsa_mode
+        is_tropical = mode_name == 'SAYANA'
         
         # Validate input
         if details.latitude < -90 or details.latitude > 90:
@@ -634,7 +636,9 @@ def calculate_chart(details: BirthDetails) -> ChartResponse:
         # 1. Determine Timezone if missing
         tz_str = details.location_timezone
         if not tz_str:
-            tz_str = tf.timezone_at(lng=details.longitude, lat=details.latitude) or 'UTC'
+            tz_str = timezone_name(details.latitude, details.longitude)
+        elif tz_str not in pytz.all_timezones_set:
+            tz_str = 'UTC' # Same fallback as convert_to_utc
             
         # 2. Convert to UTC using helper
         birth_utc, _ = convert_to_utc(details.date, details.time, tz_str)
@@ -647,7 +651,7 @@ def calculate_chart(details: BirthDetails) -> ChartResponse:
         if is_tropical:
             ayanamsa = 0.0
         else:
-            ayanamsa = swe.get_ayanamsa_ut(jd)
+            ayanamsa = ephemeris.get_ayanamsa(jd, mode_name)
             logger.info(f"Ayanamsa: {ayanamsa}")
             
         # ────────────────────────────────────────────────────────────────
@@ -663,7 +667,7 @@ def calculate_chart(details: BirthDetails) -> ChartResponse:
         # Houses
         asc_sign_idx = int(ascendant_degree / 30) % 12
         houses = []
-        for i in range(12):
+        for i in range(12 if "houses" in sections else 0):
             h_num = i + 1
             s_idx = (asc_sign_idx + i) % 12
             houses.append(House(number=h_num, sign=SIGNS[s_idx], ascendant_degree=ascendant_degree if h_num==1 else None))
@@ -671,8 +675,7 @@ def calculate_chart(details: BirthDetails) -> ChartResponse:
         # Planets
         planets = []
         for name, pid in PLANET_MAP.items():
-            flags = swe.FLG_SWIEPH | swe.FLG_SPEED | (swe.FLG_SIDEREAL if not is_tropical else 0)
-            xx, _ = swe.calc_ut(jd, pid, flags)
+            xx = ephemeris.calc_ut(jd, pid, mode_name)
             lon = xx[0]
             lat_val = xx[1]
             speed = xx[3]
@@ -704,174 +707,95 @@ def calculate_chart(details: BirthDetails) -> ChartResponse:
         # ────────────────────────────────────────────────────────────────
         # SUNRISE / SUNSET (For Mandhi & Verification)
         # ────────────────────────────────────────────────────────────────
-        # ────────────────────────────────────────────────────────────────
-        # SUNRISE / SUNSET (For Mandhi & Verification)
-        # ────────────────────────────────────────────────────────────────
-        geopos = (details.longitude, details.latitude, 0)
-        
-        # Define UTC Midnight for reference
-        jd_midnight_utc = swe.julday(birth_utc.year, birth_utc.month, birth_utc.day, 0)
-        
-        # Start search from 24h before birth to catch sunrise if it happened just before UTC midnight
-        # But wait, jd_midnight_utc is 00:00 of the birth UTC date.
-        # Safest is to search relative to birth time? 
-        # But we need "Sunrise of that day".
-        # Let's search from (jd - 1) and find the one closest to (but before) birth?
-        # Or simpler: Start from jd_midnight_utc - 1.0. 
-        # Logic: Sunrise shouldn't be more than 24h away.
-        
-        search_start_jd = jd_midnight_utc - 1.0
-        
-        rise_res = swe.rise_trans(search_start_jd, swe.SUN, swe.CALC_RISE, geopos)
-        set_res = swe.rise_trans(search_start_jd, swe.SUN, swe.CALC_SET, geopos)
-        
-        # We need the sunrise/sunset PAIR that encloses (or is relevant to) the birth.
-        # If we found a sunrise/sunset at T-20h, and another at T+4h...
-        # We need the specific sunrise for the "Vedic Day".
-        # Definition: The sunrise strictly BEFORE birth (or if birth is before sunrise, the one before THAT).
-        # Actually Vedic day starts at Sunrise. 
-        # So we want the `sunrise_jd` such that `sunrise_jd <= jd < next_sunrise`.
-        
-        # Let's implement a robust finder
-        # 1. Find next sunrise after (jd - 2 days) to be safe?
-        # No, just find the sunrise immediately preceding (or equal to) jd.
-        
-        def find_prev_sunrise(target_jd, geo):
-            # Iterate backwards? No, swisseph finds next.
-            # Start 2 days back
-            t = target_jd - 2.0
-            last_rise = None
-            found_rise = None
-            for _ in range(4): # Check 4 sunrises
-                 res = swe.rise_trans(t, swe.SUN, swe.CALC_RISE, geo)
-                 r = res[1][0]
-                 if r > target_jd:
-                     break
-                 last_rise = r
-                 t = r + 0.1 # Move forward
-            return last_rise
-
-        # Actually simplest: swe.rise_trans(jd, ... swe.CALC_RISE | swe.BIT_DISC_CENTER | swe.BIT_NO_REFRACT) ?
-        # Standard: Look from jd - 1.2 (approx 30h back).
-        
-        # Let's try finding the rise/set pair for the *Civil Day* of birth?
-        # Revert to standard robust algorithm:
-        # Search from jd_utc_midnight - 1.0.
-        # Pick the rise that is on the SAME DAY (Local) or just the one preceding birth?
-        # Mandhi requires the Day/Night of the "Vedic Day".
-        
-        # New Logic:
-        # 1. Find sunrise immediately preceding birth.
-        # 2. Find sunset following that sunrise.
-        # 3. If birth < sunset: Day Birth.
-        # 4. If birth > sunset: Night Birth.
-        
-        t_search = jd - 1.5
-        sunrise_jd = 0
-        while True:
-            rr = swe.rise_trans(t_search, swe.SUN, swe.CALC_RISE, geopos)
-            r_time = rr[1][0]
-            if r_time > jd:
-                # We overshot. The PREVIOUS one was the sunrise.
-                # If this is the first iteration, birth is before any sunrise we found?
-                # Start earlier.
-                break
-            sunrise_jd = r_time
-            t_search = r_time + 0.1 # Advance
-            
-        # If loop didn't run well (rare), fallback calculate from scratch
-        if sunrise_jd == 0:
-             # Fallback: Just calculate sunrise for the civil date
-             # (Previous implementation logic but offset)
-             # Let's try just searching from jd - 1.0 and taking the last one <= jd
-             rr = swe.rise_trans(jd - 1.1, swe.SUN, swe.CALC_RISE, geopos)
-             if rr[1][0] <= jd:
-                 sunrise_jd = rr[1][0]
-                 # Check if there is another one in betweeen?
-                 rr2 = swe.rise_trans(sunrise_jd + 0.01, swe.SUN, swe.CALC_RISE, geopos)
-                 if rr2[1][0] <= jd:
-                     sunrise_jd = rr2[1][0]
-             else:
-                 # This shouldn't happen if we start 1.1 days back
-                 sunrise_jd = rr[1][0] # Future sunrise? Error.
-                 
-        # Now find the sunset AFTER this sunrise (to define the day)
-        ss_res = swe.rise_trans(sunrise_jd, swe.SUN, swe.CALC_SET, geopos)
-        sunset_jd = ss_res[1][0]
-        
-        # Verification Strings
-        sr_utc = jd_to_time(sunrise_jd)
-        ss_utc = jd_to_time(sunset_jd)
-        sr_local = convert_utc_to_local(sr_utc, tz_str)
-        ss_local = convert_utc_to_local(ss_utc, tz_str)
-        
-        # ────────────────────────────────────────────────────────────────
-        # MANDHI
-        # ────────────────────────────────────────────────────────────────
-        mandhi_data, mandhi_debug_time = calculate_mandhi_enhanced(
-            jd, jd_midnight_utc, sunrise_jd, sunset_jd, 
-            geopos, ayanamsa, ascendant_degree
-        )
-        if mandhi_data:
-            # Calculate House for Mandhi relative to Ascendant
-            m_lon = mandhi_data.longitude
-            m_sign_idx = int(m_lon / 30) % 12
-            m_house = ((m_sign_idx - asc_sign_idx + 12) % 12) + 1
-            mandhi_data.house = m_house
-            planets.append(mandhi_data)
+        sr_local = ss_local = mandhi_jd = None
+        if "mandhi" in sections:
+            geopos = (details.longitude, details.latitude, 0)
+        
+            # Define UTC Midnight for reference
+            jd_midnight_utc = swe.julday(birth_utc.year, birth_utc.month, birth_utc.day, 0)
+        
+            # Sunrise preceding birth and the sunset after it (the Vedic day of birth)
+            birth_day = vedic_day(jd, details.latitude, details.longitude)
+            sunrise_jd, sunset_jd = birth_day.sunrise, birth_day.sunset
+        
+            # Verification Strings
+            sr_local = format_local(sunrise_jd, tz_str)
+            ss_local = format_local(sunset_jd, tz_str)
+        
+            # ────────────────────────────────────────────────────────────────
+            # MANDHI
+            # ────────────────────────────────────────────────────────────────
+            mandhi_data, mandhi_jd = calculate_mandhi_enhanced(
+                jd, jd_midnight_utc, sunrise_jd, sunset_jd, 
+                geopos, ayanamsa, ascendant_degree
+            )
+            if mandhi_data:
+                # Calculate House for Mandhi relative to Ascendant
+                m_lon = mandhi_data.longitude
+                m_sign_idx = int(m_lon / 30) % 12
+                m_house = ((m_sign_idx - asc_sign_idx + 12) % 12) + 1
+                mandhi_data.house = m_house
+                planets.append(mandhi_data)
         
         # ────────────────────────────────────────────────────────────────
         # VARGAS & OTHER CALCULATIONS
         # ────────────────────────────────────────────────────────────────
         
-        # Divisional Charts
-        varga_nums = [1, 2, 3, 4, 7, 9, 10, 12, 16, 20, 24, 27, 30, 40, 45, 60]
-        divisional_charts = {}
-        for v_num in varga_nums:
-            v_planets = []
-            asc_sign_v = calculate_varga(ascendant_degree, v_num)
-            for p in planets:
-                v_sign = calculate_varga(p.longitude, v_num)
-                # House in Varga
-                a_idx = SIGNS.index(asc_sign_v)
-                s_idx = SIGNS.index(v_sign)
-                h_num = ((s_idx - a_idx + 12) % 12) + 1
-                v_planets.append(VargaPosition(planet=p.name, sign=v_sign, house=h_num))
-            
-            divisional_charts[f"D{v_num}"] = VargaChart(name=f"D{v_num}", planets=v_planets, ascendant_sign=asc_sign_v)
-            
-        # Update D9/D10 legacy fields
-        for p in planets:
-            if d9 := divisional_charts.get("D9"):
-                if found := next((vp for vp in d9.planets if vp.planet == p.name), None):
-                    p.d9_sign = found.sign
-            if d10 := divisional_charts.get("D10"):
-                if found := next((vp for vp in d10.planets if vp.planet == p.name), None):
-                    p.d10_sign = found.sign
-
-        # Dashas, Panchanga, Strengths
+        # Divisional Charts: every varga for every body (ascendant last) in one lookup.
+        # Only the requested charts (plus the Shadvarga for strengths) become models.
+        divisional_charts = None
+        strengths = None
+        if sections & {"planets", "vargas", "strengths"}:
+            varga_signs = calculate_varga_matrix([p.longitude for p in planets] + [ascendant_degree]).tolist()
+            wanted = set(include.vargas) if "vargas" in sections else set()
+            if "strengths" in sections:
+                wanted.update(SHADVARGA_WEIGHTS)
+            charts = {}
+            for v_num, v_signs in zip(VARGA_NUMS, varga_signs):
+                if v_num not in wanted:
+                    continue
+                a_idx = v_signs[-1]
+                v_planets = [
+                    VargaPosition(planet=p.name, sign=SIGNS[s_idx], house=(s_idx - a_idx) % 12 + 1)
+                    for p, s_idx in zip(planets, v_signs)
+                ]
+                charts[f"D{v_num}"] = VargaChart(name=f"D{v_num}", planets=v_planets, ascendant_sign=SIGNS[a_idx])
+
+            # Update D9/D10 legacy fields
+            d9_signs, d10_signs = varga_signs[VARGA_ROWS[9]], varga_signs[VARGA_ROWS[10]]
+            for p, d9_idx, d10_idx in zip(planets, d9_signs, d10_signs):
+                p.d9_sign = SIGNS[d9_idx]
+                p.d10_sign = SIGNS[d10_idx]
+
+            if "strengths" in sections:
+                strengths = calculate_vimsopaka_strength(charts)
+            if "vargas" in sections:
+                divisional_charts = {f"D{v}": charts[f"D{v}"] for v in include.vargas}
+
+        # Dashas, Panchanga
         moon = next(p for p in planets if p.name == 'Moon')
         sun = next(p for p in planets if p.name == 'Sun')
         
-        dashas = calculate_dashas(moon.longitude, details.date)
-        panchanga = calculate_panchanga(moon.longitude, sun.longitude, jd, details)
-        strengths = calculate_vimsopaka_strength(divisional_charts)
+        dashas = calculate_dashas(moon.longitude, details.date) if "dashas" in sections else None
+        panchanga = calculate_panchanga(moon.longitude, sun.longitude, jd, details) if "panchanga" in sections else None
         
         # Calculate Special Timings (Muhurta)
-        special_timings = calculate_special_times(
-            details.date, 
-            details.latitude, 
-            details.longitude, 
-            tz_str
-        )
-        # Convert dicts to SpecialTime objects
-        special_times = [SpecialTime(**st) for st in special_timings]
+        special_times = None
+        if "special_times" in sections:
+            special_timings = calculate_special_times(
+                details.date, 
+                details.latitude, 
+                details.longitude, 
+                tz_str
+            )
+            # Convert dicts to SpecialTime objects
+            special_times = [SpecialTime(**st) for st in special_timings]
 
         return ChartResponse(
             ascendant=ascendant_degree,
             ascendant_sign=ascendant_sign,
-            planets=planets,
-            houses=houses,
+            planets=planets if "planets" in sections else None,
+            houses=houses if "houses" in sections else None,
             dashas=dashas,
             panchanga=panchanga,
             strengths=strengths,
@@ -879,7 +803,8 @@ def calculate_chart(details: BirthDetails) -> ChartResponse:
             special_times=special_times,
             ayanamsa=ayanamsa,
             sunrise_time=sr_local,
-            mandhi_time_local=convert_utc_to_local(mandhi_debug_time, tz_str) if mandhi_debug_time else None
+            sunset_time=ss_local,
+            mandhi_time_local=format_local(mandhi_jd, tz_str) if mandhi_jd else None
         )
 
     except Exception as e:
@@ -895,10 +820,10 @@ def calculate_mandhi_enhanced(
     geopos: Tuple[float, float, float],
     ayanamsa: float,
     ascendant_sidereal: float
-) -> Tuple[Optional[PlanetPosition], Optional[str]]:
+) -> Tuple[Optional[PlanetPosition], Optional[float]]:
     """
     Enhanced Mandhi calculation.
-    Returns (PlanetPosition, mandhi_time_utc_str)
+    Returns (PlanetPosition, mandhi_jd)
     """
     try:
         is_day = sunrise_jd <= jd_birth <= sunset_jd
@@ -932,8 +857,6 @@ def calculate_mandhi_enhanced(
         mandhi_trop = ascmc[0]
         mandhi_sid = (mandhi_trop - ayanamsa) % 360
         
-        mandhi_time_str = jd_to_time(mandhi_jd)
-        
         pos = PlanetPosition(
             name="Maandi",
             longitude=mandhi_sid,
@@ -945,7 +868,7 @@ def calculate_mandhi_enhanced(
             nakshatra=get_nakshatra(mandhi_sid)[0],
             nakshatra_lord=get_nakshatra(mandhi_sid)[1]
         )
-        return pos, mandhi_time_str
+        return pos, mandhi_jd
         
     except Exception as e:
         logger.error(f"Mandhi calc failed: {e}")
@@ -988,90 +911,83 @@ def calculate_jaimini_karakas(planets: List[dict]) -> dict:
             
     return result
 
-def get_current_transits_extended():
+def get_current_transits_extended(at: Optional[datetime] = None):
     """
-    Get current transits including outer planets and special points.
+    Get transits at `at` (aware; default now, UTC) including outer planets and special points.
     """
-    with swe_lock:
-        now = datetime.utcnow()
-        # Default visual location (e.g. Ujjain or Greenwich? Using Greenwich for universal transits logic, 
-        # but strictly Ascendant depends on location. For purely planetary, location minimal effect except Moon.
-        # Using 0,0 for generic "current sky" or User's location?
-        # Prompt didn't specify location, so we assume generic "Sky Now".
-        # Ideally should use a default location like Greenwich or allow param.
-        # We will use 0,0 for simplicity, assuming geocentric/topocentric diff is minimal for display.
-        
-        jd = swe.julday(now.year, now.month, now.day, now.hour + now.minute/60.0)
-        
-        # Ayanamsa (Lahiri)
-        swe.set_sid_mode(swe.SIDM_LAHIRI)
-        ayanamsa = swe.get_ayanamsa_ut(jd)
-        
-        bodies = []
+    # Default visual location (e.g. Ujjain or Greenwich? Using Greenwich for universal transits logic, 
+    # but strictly Ascendant depends on location. For purely planetary, location minimal effect except Moon.
+    # Using 0,0 for generic "current sky" or User's location?
+    # Prompt didn't specify location, so we assume generic "Sky Now".
+    # Ideally should use a default location like Greenwich or allow param.
+    # We will use 0,0 for simplicity, assuming geocentric/topocentric diff is minimal for display.
+    
+    jd = datetime_to_jd(at or datetime.now(timezone.utc))
+    
+    bodies = []
+    
+    # 1. Planets (Main + Outer)
+    planet_ids = {
+        **PLANET_MAP, # Includes Sun-Saturn + Rahu + Outer
+    }
+    # Ensure Key names match prompt requirements
+    
+    for name, pid in planet_ids.items():
+        if pid is None: continue
         
-        # 1. Planets (Main + Outer)
-        planet_ids = {
-            **PLANET_MAP, # Includes Sun-Saturn + Rahu + Outer
-        }
-        # Ensure Key names match prompt requirements
+        xx = ephemeris.calc_ut(jd, pid, "LAHIRI")
+        lon = xx[0]
+        speed = xx[3]
         
-        for name, pid in planet_ids.items():
-            if pid is None: continue
-            
-            flags = swe.FLG_SWIEPH | swe.FLG_SPEED | swe.FLG_SIDEREAL
-            xx, _ = swe.calc_ut(jd, pid, flags)
-            lon = xx[0]
-            speed = xx[3]
-            
-            bodies.append({
-                'name': name,
-                'type': 'planet',
-                'sign': get_sign_from_longitude(lon),
-                'degree': format_degree(lon),
-                'longitude': lon,
-                'nakshatra': get_nakshatra(lon)[0],
-                'pada': int((lon % (360/27)) / (360/108)) + 1,
-                'speed': speed,
-                'retrograde': speed < 0
-            })
-            
-        # Ketu
-        rahu = next(b for b in bodies if b['name'] == 'Rahu')
-        ketu_lon = (rahu['longitude'] + 180) % 360
         bodies.append({
-            'name': 'Ketu',
+            'name': name,
             'type': 'planet',
-            'sign': get_sign_from_longitude(ketu_lon),
-            'degree': format_degree(ketu_lon),
-            'longitude': ketu_lon,
-            'nakshatra': get_nakshatra(ketu_lon)[0],
-            'pada': int((ketu_lon % (360/27)) / (360/108)) + 1,
-            'speed': -rahu['speed'],
-            'retrograde': rahu['retrograde']
+            'sign': get_sign_from_longitude(lon),
+            'degree': format_degree(lon),
+            'longitude': lon,
+            'nakshatra': get_nakshatra(lon)[0],
+            'pada': int((lon % (360/27)) / (360/108)) + 1,
+            'speed': speed,
+            'retrograde': speed < 0
         })
         
-        # 2. Special Points (Maandi/Gulika)
-        # Skipped for Global Transits as they are strictly location-dependent (Sunrise/Sunset).
+    # Ketu
+    rahu = next(b for b in bodies if b['name'] == 'Rahu')
+    ketu_lon = (rahu['longitude'] + 180) % 360
+    bodies.append({
+        'name': 'Ketu',
+        'type': 'planet',
+        'sign': get_sign_from_longitude(ketu_lon),
+        'degree': format_degree(ketu_lon),
+        'longitude': ketu_lon,
+        'nakshatra': get_nakshatra(ketu_lon)[0],
+        'pada': int((ketu_lon % (360/27)) / (360/108)) + 1,
+        'speed': -rahu['speed'],
+        'retrograde': rahu['retrograde']
+    })
+    
+    # 2. Special Points (Maandi/Gulika)
+    # Skipped for Global Transits as they are strictly location-dependent (Sunrise/Sunset).
+        
+    # 3. Jaimini Karakas
+    karakas = calculate_jaimini_karakas(bodies)
+    for k_name, p_name in karakas.items():
+        # Find the planet data
+        p_data = next((b for b in bodies if b['name'] == p_name), None)
+        if p_data:
+            bodies.append({
+                'name': f"{k_name} ({p_name})",
+                'type': 'karaka',
+                'sign': p_data['sign'],
+                'degree': p_data['degree'],
+                'longitude': p_data['longitude'],
+                'nakshatra': p_data['nakshatra'],
+                'pada': p_data['pada'],
+                'speed': 0,
+                'retrograde': False
+            })
             
-        # 3. Jaimini Karakas
-        karakas = calculate_jaimini_karakas(bodies)
-        for k_name, p_name in karakas.items():
-            # Find the planet data
-            p_data = next((b for b in bodies if b['name'] == p_name), None)
-            if p_data:
-                bodies.append({
-                    'name': f"{k_name} ({p_name})",
-                    'type': 'karaka',
-                    'sign': p_data['sign'],
-                    'degree': p_data['degree'],
-                    'longitude': p_data['longitude'],
-                    'nakshatra': p_data['nakshatra'],
-                    'pada': p_data['pada'],
-                    'speed': 0,
-                    'retrograde': False
-                })
-                
-        return bodies
+    return bodies
 
 def format_degree(lon: float) -> str:
     d = int(lon % 30)
@@ -1080,225 +996,131 @@ def format_degree(lon: float) -> str:
     return f"{d}° {m}' {s}\""
 
 
-def calculate_d9(lon: float) -> str:
+# ============================================================================
+# DIVISIONAL CHARTS (VARGAS)
+# ============================================================================
+# Each varga splits a sign into `varga_num` equal parts and maps
+# (sign index, part index) to a varga sign index. The maps are precomputed into
+# one lookup table so any number of longitudes resolve to every varga in a
+# single NumPy indexing pass. D30's unequal Trimshamsha spans fall on whole
+# degrees, so its 30 one-degree parts fit the same scheme.
+
+VARGA_NUMS = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 16, 20, 24, 27, 30, 40, 45, 60, 81, 108, 144, 150]
+
+# Panchamsha: odd signs Mars, Saturn, Jupiter, Mercury, Venus; even signs reversed
+PANCHAMSHA_ODD = [0, 10, 8, 2, 6]    # Aries, Aquarius, Sagittarius, Gemini, Libra
+PANCHAMSHA_EVEN = [1, 5, 11, 9, 7]   # Taurus, Virgo, Pisces, Capricorn, Scorpio
+
+# Trimshamsha by whole degree: odd signs 5-5-8-7-5, even signs 5-7-8-5-5
+TRIMSHAMSHA_ODD = [0] * 5 + [10] * 5 + [8] * 8 + [2] * 7 + [6] * 5
+TRIMSHAMSHA_EVEN = [1] * 5 + [5] * 7 + [11] * 8 + [9] * 5 + [7] * 5
+
+def _varga_sign(varga_num: int, s: int, p: int) -> int:
     """
-    Calculate Navamsha (D9) sign from ecliptic longitude.
-    
-    Navamsha divides each sign into 9 parts (3.33° each).
-    Signs are arranged by element (Fire, Earth, Air, Water).
+    Varga sign index for part `p` of sign index `s` (Parashara rules).
+    `s` even means an odd sign (Aries = 0).
     """
-    sign_index = int(lon / 30) % 12
-    degree_in_sign = lon % 30
-    pada = int(degree_in_sign / (30/9))
-    
-    # Determine starting sign by element
-    current_sign_num = sign_index + 1
-    rem = current_sign_num % 4
-    if rem == 1:      # Fire: Aries, Leo, Sagittarius
-        start = 0
-    elif rem == 2:    # Earth: Taurus, Virgo, Capricorn
-        start = 9
-    elif rem == 3:    # Air: Gemini, Libra, Aquarius
-        start = 6
-    else:             # Water: Cancer, Scorpio, Pisces
-        start = 3
-    
-    d9_sign_index = (start + pada) % 12
-    return SIGNS[d9_sign_index]
+    odd = s % 2 == 0
+    if varga_num == 1:
+        return s
+    if varga_num == 2:       # Hora: odd signs Leo then Cancer, even signs reversed
+        return (4 if p == 0 else 3) if odd else (3 if p == 0 else 4)
+    if varga_num == 3:       # Drekkana: 1st, 5th, 9th
+        return (s + 4 * p) % 12
+    if varga_num == 4:       # Chaturthamsha: 1st, 4th, 7th, 10th
+        return (s + 3 * p) % 12
+    if varga_num == 5:
+        return (PANCHAMSHA_ODD if odd else PANCHAMSHA_EVEN)[p]
+    if varga_num == 30:
+        return (TRIMSHAMSHA_ODD if odd else TRIMSHAMSHA_EVEN)[p]
+
+    if varga_num == 6:       # Shashtamsha: odd from Aries, even from Libra
+        start = 0 if odd else 6
+    elif varga_num == 7:     # Saptamsha: odd from the sign, even from the 7th
+        start = s if odd else s + 6
+    elif varga_num == 8:     # Ashtamsha: movable Aries, fixed Sagittarius, dual Leo
+        start = [0, 8, 4][s % 3]
+    elif varga_num == 9:     # Navamsha: by element
+        start = [0, 9, 6, 3][s % 4]
+    elif varga_num == 10:    # Dasamsha: odd from the sign, even from the 9th
+        start = s if odd else s + 8
+    elif varga_num in (12, 60):
+        start = s
+    elif varga_num in (16, 45):  # movable Aries, fixed Leo, dual Sagittarius
+        start = [0, 4, 8][s % 3]
+    elif varga_num == 20:    # movable Aries, fixed Sagittarius, dual Leo
+        start = [0, 8, 4][s % 3]
+    elif varga_num == 24:    # odd from Leo, even from Cancer
+        start = 4 if odd else 3
+    elif varga_num == 27:    # fire Aries, earth Cancer, air Libra, water Capricorn
+        start = [0, 3, 6, 9][s % 4]
+    elif varga_num == 40:    # odd from Aries, even from Libra
+        start = 0 if odd else 6
+    else:
+        # D11, D81, D108, D144, D150: parivritti (cyclic) count from Aries,
+        # continuing through the zodiac sign after sign
+        start = s * varga_num
+    return (start + p) % 12
+
+def _build_varga_table() -> np.ndarray:
+    table = np.full((len(VARGA_NUMS), 12, max(VARGA_NUMS)), -1, dtype=np.int64)
+    for row, v in enumerate(VARGA_NUMS):
+        for s in range(12):
+            for p in range(v):
+                table[row, s, p] = _varga_sign(v, s, p)
+    return table
+
+VARGA_TABLE = _build_varga_table()
+VARGA_ROWS = {v: row for row, v in enumerate(VARGA_NUMS)}
+VARGA_SPANS = np.array([30 / v for v in VARGA_NUMS])
+VARGA_LOOKUP = {v: VARGA_TABLE[row, :, :v].tolist() for v, row in VARGA_ROWS.items()}
+
+# Every section of calculate_chart with every divisional chart
+FULL_CHART = ChartSections(frozenset(CHART_SECTIONS), tuple(VARGA_NUMS))
+
+def calculate_varga_matrix(lons: np.ndarray) -> np.ndarray:
+    """
+    Sign indexes (0-11) of every varga in VARGA_NUMS for an array of longitudes.
+    Returns shape (len(VARGA_NUMS),) + lons.shape.
+    """
+    lons = np.asarray(lons, dtype=float)
+    sign_index = (lons // 30).astype(np.int64) % 12
+    degree_in_sign = lons % 30
+    expand = (slice(None),) + (None,) * lons.ndim
+    parts = (degree_in_sign[None] / VARGA_SPANS[expand]).astype(np.int64)
+    parts = np.minimum(parts, np.array(VARGA_NUMS)[expand] - 1)
+    return VARGA_TABLE[np.arange(len(VARGA_NUMS))[expand], sign_index[None], parts]
+
+def calculate_varga_indices(lons: np.ndarray, varga_num: int) -> np.ndarray:
+    """
+    Vectorized counterpart of `calculate_varga` for a single varga.
+    Takes an array of longitudes and returns sign indexes (0-11) of the same shape.
+    """
+    sign_index = (lons // 30).astype(np.int64) % 12
+    if varga_num not in VARGA_ROWS:
+        return sign_index
+    parts = np.minimum((lons % 30 / (30 / varga_num)).astype(np.int64), varga_num - 1)
+    return VARGA_TABLE[VARGA_ROWS[varga_num], sign_index, parts]
 
 def calculate_varga(lon: float, varga_num: int) -> str:
     """
     Calculate sign for a given Varga (Divisional Chart).
-    Supports D1 to D60 standard Parashara rules.
+    Supports every varga in VARGA_NUMS; others fall back to the Rashi sign.
     """
     sign_index = int(lon / 30) % 12
-    degree_in_sign = lon % 30
-    
-    # D1 (Rashi)
-    if varga_num == 1:
+    lookup = VARGA_LOOKUP.get(varga_num)
+    if lookup is None:
         return SIGNS[sign_index]
-        
-    # D2 (Hora) - Parashara
-    if varga_num == 2:
-        # Odd sign: 1st half=Leo(Sun), 2nd half=Cancer(Moon)? 
-        # Parashara: Odd=Sun(5), Even=Moon(4). 
-        # Actually usually: OddSign->Sun(Leo), EvenSign->Moon(Cancer)
-        # But wait, Hora implies 2 parts. 
-        # Standard Parashara:
-        # Odd Sign: 0-15=Sun(Leo e.g. 5th sign i.e. index 4), 15-30=Moon(Cancer i.e. index 3)
-        # Even Sign: 0-15=Moon(Cancer), 15-30=Sun(Leo)
-        is_odd = (sign_index + 1) % 2 != 0
-        is_first_half = degree_in_sign < 15
-        
-        if is_odd:
-            return "Leo" if is_first_half else "Cancer"
-        else:
-            return "Cancer" if is_first_half else "Leo"
-
-    # D3 (Drekkana)
-    if varga_num == 3:
-        part = int(degree_in_sign / 10) # 0, 1, 2
-        # 1, 5, 9 rule
-        start_idx = sign_index # 1st part starts at sign itself
-        if part == 1: start_idx = (sign_index + 4) % 12 # 5th
-        if part == 2: start_idx = (sign_index + 8) % 12 # 9th
-        return SIGNS[start_idx]
-        
-    # D4 (Chaturthamsha)
-    if varga_num == 4:
-        part = int(degree_in_sign / (30/4))
-        # 1, 4, 7, 10 rule
-        start_idx = sign_index
-        if part == 1: start_idx = (sign_index + 3) % 12 # 4th
-        if part == 2: start_idx = (sign_index + 6) % 12 # 7th
-        if part == 3: start_idx = (sign_index + 9) % 12 # 10th
-        return SIGNS[start_idx]
-
-    # D7 (Saptamsha)
-    if varga_num == 7:
-        part = int(degree_in_sign / (30/7))
-        is_odd = (sign_index + 1) % 2 != 0
-        if is_odd:
-            # Start from sign itself
-            start_idx = sign_index
-        else:
-            # Start from 7th from sign
-            start_idx = (sign_index + 6) % 12
-        return SIGNS[(start_idx + part) % 12]
-
-    # D9 (Navamsha)
-    if varga_num == 9:
-        return calculate_d9(lon) # Use existing helper
-
-    # D10 (Dasamsha)
-    if varga_num == 10:
-        return calculate_d10(lon) # Use existing helper
-
-    # D12 (Dwadashamsha)
-    if varga_num == 12:
-        part = int(degree_in_sign / (30/12))
-        # Starts from sign itself
-        return SIGNS[(sign_index + part) % 12]
-        
-    # D16 (Shodashamsha)
-    if varga_num == 16:
-        part = int(degree_in_sign / (30/16))
-        # Movable(1,4,7,10): Aries(0)
-        # Fixed(2,5,8,11): Leo(4)
-        # Dual(3,6,9,12): Sag(8)
-        sign_quality = (sign_index + 1 - 1) % 3 # 0=Movable, 1=Fixed, 2=Dual
-        starts = [0, 4, 8]
-        start_idx = starts[sign_quality]
-        return SIGNS[(start_idx + part) % 12]
-
-    # D20 (Vimshamsha)
-    if varga_num == 20:
-        part = int(degree_in_sign / (30/20))
-        # Movable: Aries(0), Fixed: Sag(8), Dual: Leo(4) (Wait, verify rule)
-        # Actually usually: Movable->Aries(from Narayana), Fixed->Sag, Dual->Leo is NOT standard?
-        # Standard: Movable->Aries, Fixed->Sag, Dual->Leo is correct for D20 per BPHS?
-        # Let's assume: Movable->Aries, Fixed->Sagittarius, Dual->Leo.
-        sign_quality = (sign_index) % 3 # 0=Movable(1), 1=Fixed(2), 2=Dual(3)
-        # Note: (sign_index) % 3: 0(Aries)->0, 1(Taurus)->1, 2(Gemini)->2
-        # Movable=0, Fixed=1, Dual=2
-        if sign_quality == 0: start_idx = 0 # Aries
-        elif sign_quality == 1: start_idx = 8 # Sag
-        else: start_idx = 4 # Leo
-        return SIGNS[(start_idx + part) % 12]
-
-    # D24 (Chaturvimshamsha)
-    if varga_num == 24:
-        part = int(degree_in_sign / (30/24))
-        # Odd: Leo(4), Even: Cancer(3)
-        is_odd = (sign_index + 1) % 2 != 0
-        start_idx = 4 if is_odd else 3
-        return SIGNS[(start_idx + part) % 12]
-
-    # D27 (Saptavimshamsha)
-    if varga_num == 27:
-        part = int(degree_in_sign / (30/27))
-        # Like Nakshatras 1,4,7,10 cycle
-        # Fire: Aries, Earth: Cap, Air: Lib, Water: Cancer
-        # Element logic
-        element = (sign_index) % 4 # 0=Fire, 1=Earth, 2=Air, 3=Water
-        if element == 0: start_idx = 0 # Aries
-        elif element == 1: start_idx = 3 # Cancer
-        elif element == 2: start_idx = 6 # Libra
-        else: start_idx = 9 # Capricorn (Wait, check standard)
-        # Standard: 
-        # Fiery signs start from Aries.
-        # Earthy signs start from Cancer.
-        # Airy signs start from Libra.
-        # Watery signs start from Capricorn.
-        starts = [0, 3, 6, 9]
-        start_idx = starts[element]
-        return SIGNS[(start_idx + part) % 12]
-
-    # D30 (Trimshamsha) - Special Logic
-    if varga_num == 30:
-        # D30 is based on degrees assigned to planets 5-5-8-7-5 rule usually
-        # Odd Signs: 0-5 Mars(Aries), 5-10 Saturn(Aq), 10-18 Jup(Sag), 18-25 Merc(Gem), 25-30 Ven(Lib)
-        # Even Signs: 0-5 Ven(Tau), 5-12 Merc(Vir), 12-20 Jup(Pis), 20-25 Sat(Cap), 25-30 Mars(Sco)
-        is_odd = (sign_index + 1) % 2 != 0
-        deg = degree_in_sign
-        
-        if is_odd:
-            if deg < 5: return "Aries"
-            elif deg < 10: return "Aquarius"
-            elif deg < 18: return "Sagittarius"
-            elif deg < 25: return "Gemini"
-            else: return "Libra"
-        else:
-            if deg < 5: return "Taurus"
-            elif deg < 12: return "Virgo"
-            elif deg < 20: return "Pisces"
-            elif deg < 25: return "Capricorn"
-            else: return "Scorpio"
-
-    # D40 (Khavedamsha)
-    if varga_num == 40:
-        part = int(degree_in_sign / (30/40))
-        # Odd: Aries, Even: Libra
-        is_odd = (sign_index + 1) % 2 != 0
-        start_idx = 0 if is_odd else 6
-        return SIGNS[(start_idx + part) % 12]
-
-    # D45 (Akshavedamsha)
-    if varga_num == 45:
-        part = int(degree_in_sign / (30/45))
-        # Movable: Aries, Fixed: Leo, Dual: Sag
-        sign_quality = (sign_index) % 3
-        if sign_quality == 0: start_idx = 0
-        elif sign_quality == 1: start_idx = 4
-        else: start_idx = 8
-        return SIGNS[(start_idx + part) % 12]
-
-    # D60 (Shashtyamsha)
-    if varga_num == 60:
-        part = int(degree_in_sign / (30/60))
-        # Start from sign itself
-        return SIGNS[(sign_index + part) % 12]
-
-    # Default / Fallback
-    return SIGNS[sign_index]
+    part = min(int(lon % 30 / (30 / varga_num)), varga_num - 1)
+    return SIGNS[lookup[sign_index][part]]
+
+def calculate_d9(lon: float) -> str:
+    """Calculate Navamsha (D9) sign from ecliptic longitude."""
+    return calculate_varga(lon, 9)
 
 def calculate_d10(lon: float) -> str:
-    """
-    Calculate Dasamsha (D10) sign from ecliptic longitude.
-    """
-    sign_index = int(lon / 30) % 12
-    degree_in_sign = lon % 30
-    part = int(degree_in_sign / (30/10))
-    
-    is_odd = (sign_index + 1) % 2 != 0
-    
-    if is_odd:
-        start = sign_index
-    else:
-        start = (sign_index + 8) % 12
-        
-    d10_sign_index = (start + part) % 12
-    return SIGNS[d10_sign_index]
+    """Calculate Dasamsha (D10) sign from ecliptic longitude."""
+    return calculate_varga(lon, 10)
 
 # ============================================================================
 # DASHA CALCULATION HELPERS
@@ -1311,17 +1133,7 @@ MAHADASHA_YEARS = {
 
 PLANET_SEQUENCE = ["Ketu", "Venus", "Sun", "Moon", "Mars", "Rahu", "Jupiter", "Saturn", "Mercury"]
 
-def add_years_precise(d: datetime, years: float) -> datetime:
-    """
-    Add years to date using exact solar days (365.242199 or 365.25 approx).
-    Standard Vedic often uses 360 day years (Sura) or 365.25. 
-    Vimshottari is generally 365.25 (Julian year) or Sidereal year.
-    Let's use 365.25 for consistency with standard software like JHouse.
-    """
-    days = years * 365.25
-    return d + timedelta(days=days)
-
-def get_dasha_start_point(moon_lon: float, birth_date: datetime) -> Tuple[str, float, float]:
+def get_dasha_start_point(moon_lon: float) -> Tuple[str, float, float]:
     """
     Calculate the starting point of the Vimshottari Dasha.
     Returns: (birth_lord, balance_years, passed_years_in_current_md)
@@ -1344,175 +1156,543 @@ def get_dasha_start_point(moon_lon: float, birth_date: datetime) -> Tuple[str, f
     
     return birth_lord, balance_years, passed_years
 
-def generate_sub_periods(parent_lord: str, parent_start: datetime, parent_duration_years: float, level: str) -> List[Dict]:
+DASHA_LEVELS = ("Mahadasha", "Antardasha", "Pratyantardasha", "Sookshma", "Prana")
+DASHA_YEAR_DAYS = 365.25  # Julian year, as in JHora
+DASHA_CYCLE_DAYS = 120 * DASHA_YEAR_DAYS
+
+# Sub-period layout for each parent lord: the nine lords in order (starting from
+# the parent) and their cumulative boundaries as fractions of the parent period.
+# A Mahadasha cycle is laid out the same way from the birth lord.
+DASHA_SPLITS = {
+    lord: (
+        tuple(PLANET_SEQUENCE[(idx + i) % 9] for i in range(9)),
+        np.cumsum([0] + [MAHADASHA_YEARS[PLANET_SEQUENCE[(idx + i) % 9]] for i in range(9)]).tolist()
+    )
+    for idx, lord in enumerate(PLANET_SEQUENCE)
+}
+
+class DashaNode(NamedTuple):
+    lords: Tuple[str, ...]  # ("Jupiter", "Saturn", ...) from Mahadasha down
+    start_jd: float         # JD (UT)
+    end_jd: float
+    years: float
+
+    @property
+    def level(self) -> str:
+        return DASHA_LEVELS[len(self.lords) - 1]
+
+    @property
+    def lord(self) -> str:
+        return self.lords[-1]
+
+    @property
+    def label(self) -> str:
+        return "-".join(self.lords)
+
+def _split_period(lords: Tuple[str, ...], start_jd: float, end_jd: float, years: float, first_lord: str) -> List[DashaNode]:
+    """The nine sub-periods of a period, starting from `first_lord`."""
+    seq, cum = DASHA_SPLITS[first_lord]
+    span = end_jd - start_jd
+    return [
+        DashaNode(lords + (lord,), start_jd + span * cum[i] / 120.0, start_jd + span * cum[i + 1] / 120.0,
+                  years * (MAHADASHA_YEARS[lord] / 120.0))
+        for i, lord in enumerate(seq)
+    ]
+
+class VimshottariDasha:
     """
-    Generic generator for sub-periods (Antardasha, Pratyantardasha).
-    level: 'AD' (Antardasha) or 'PD' (Pratyantardasha)
+    Vimshottari dasha tree in float JD, expanded lazily.
+    Periods are computed on demand from the birth lord and the theoretical start
+    of the birth Mahadasha, so `dasha_at` walks one path of the tree instead of
+    materializing every period.
     """
-    sub_periods = []
-    
-    # Sequence starts from the Parent Lord
-    start_index = PLANET_SEQUENCE.index(parent_lord)
-    current_start = parent_start
-    
-    parent_md_years = MAHADASHA_YEARS[parent_lord] if level == 'AD' else 0 # Logic differs slightly
-    # Wait, generic logic:
-    # AD Duration = (MD_Years * AD_Lord_Years) / 120
-    # PD Duration = (AD_Duration_Years * PD_Lord_Years) / 120 (Relative to AD?)
-    # Actually: PD = (MD_Years * AD_Years * PD_Years) / (120 * 120) ?
-    # Let's keep it simple: Sub-period is proportional to its lord's share of 120.
-    
-    # For Antardasha: Proportion of the Mahadasha.
-    # AD_Duration = Parent_Duration * (Lord_Years / 120) -> Correct.
-    
-    for i in range(9):
-        idx = (start_index + i) % 9
-        lord = PLANET_SEQUENCE[idx]
-        lord_years = MAHADASHA_YEARS[lord]
-        
-        # Duration proportional to the lord's cycle share
-        duration = parent_duration_years * (lord_years / 120.0)
-        
-        end_date = add_years_precise(current_start, duration)
-        
-        sub_periods.append({
-            "lord": lord,
-            "start_date": current_start,
-            "end_date": end_date,
-            "duration": duration
-        })
-        current_start = end_date
-        
-    return sub_periods
+
+    def __init__(self, moon_lon: float, birth_jd: float):
+        self.birth_jd = birth_jd
+        self.birth_lord, self.balance_years, passed_years = get_dasha_start_point(moon_lon)
+        self.start_jd = birth_jd - passed_years * DASHA_YEAR_DAYS
+
+    def _cycle(self, cycle: int) -> Tuple[float, float]:
+        start = self.start_jd + cycle * DASHA_CYCLE_DAYS
+        return start, start + DASHA_CYCLE_DAYS
+
+    def children(self, node: DashaNode) -> List[DashaNode]:
+        """Sub-periods of `node` (empty below the deepest level)."""
+        if len(node.lords) >= len(DASHA_LEVELS):
+            return []
+        return _split_period(node.lords, node.start_jd, node.end_jd, node.years, node.lord)
+
+    def periods(self, depth: int, start_jd: Optional[float] = None, end_jd: Optional[float] = None) -> Iterator[DashaNode]:
+        """
+        Periods of level `depth` (1 = Mahadasha) overlapping [start_jd, end_jd), in order.
+        Defaults to one 120-year cycle from the theoretical start. Only the
+        branches overlapping the range are expanded.
+        """
+        if not 1 <= depth <= len(DASHA_LEVELS):
+            raise ValueError(f"Dasha depth must be 1-{len(DASHA_LEVELS)}")
+        start_jd = self.start_jd if start_jd is None else start_jd
+        end_jd = self._cycle(0)[1] if end_jd is None else end_jd
+        first = math.floor((start_jd - self.start_jd) / DASHA_CYCLE_DAYS)
+        last = math.floor((end_jd - self.start_jd) / DASHA_CYCLE_DAYS)
+
+        def expand(nodes):
+            for node in nodes:
+                if node.end_jd <= start_jd or node.start_jd >= end_jd:
+                    continue
+                if len(node.lords) == depth:
+                    yield node
+                else:
+                    yield from expand(self.children(node))
+
+        for cycle in range(first, last + 1):
+            cycle_start, cycle_end = self._cycle(cycle)
+            yield from expand(_split_period((), cycle_start, cycle_end, 120.0, self.birth_lord))
+
+    def dasha_at(self, jd: float, depth: int = 3) -> List[DashaNode]:
+        """Running periods at `jd`, Mahadasha first, down to level `depth` (1-5)."""
+        if not 1 <= depth <= len(DASHA_LEVELS):
+            raise ValueError(f"Dasha depth must be 1-{len(DASHA_LEVELS)}")
+        start, end = self._cycle(math.floor((jd - self.start_jd) / DASHA_CYCLE_DAYS))
+        lords: Tuple[str, ...] = ()
+        first_lord, years = self.birth_lord, 120.0
+        path = []
+        for _ in range(depth):
+            seq, cum = DASHA_SPLITS[first_lord]
+            span = end - start
+            i = min(max(bisect.bisect_right(cum, (jd - start) / span * 120.0) - 1, 0), 8)
+            # Settle rounding at a boundary with the same arithmetic as _split_period
+            while i > 0 and jd < start + span * cum[i] / 120.0:
+                i -= 1
+            while i < 8 and jd >= start + span * cum[i + 1] / 120.0:
+                i += 1
+            start, end = start + span * cum[i] / 120.0, start + span * cum[i + 1] / 120.0
+            first_lord = seq[i]
+            lords += (first_lord,)
+            years *= MAHADASHA_YEARS[first_lord] / 120.0
+            path.append(DashaNode(lords, start, end, years))
+        return path
+
+J2000_UTC = datetime(2000, 1, 1, 12, tzinfo=timezone.utc)  # JD 2451545.0
+
+def datetime_to_jd(dt: datetime) -> float:
+    """JD (UT) of an aware datetime; naive datetimes are taken as UTC."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return 2451545.0 + (dt - J2000_UTC) / timedelta(days=1)
+
+def jd_to_utc_datetime(jd: float) -> datetime:
+    """Aware UTC datetime of a JD (UT), to the second (the resolution of a float JD is ~40 us)."""
+    return J2000_UTC + timedelta(seconds=round((jd - 2451545.0) * 86400.0))
+
+def dasha_epoch_jd(birth_date: date) -> float:
+    """
+    JD (UT) every dasha calculation counts from: 00:00 UT of the birth date. The
+    balance comes from the Moon at the birth moment; the chart's dasha table, the
+    dasha tree, the batch charts and the Daily Energy Score all share this anchor.
+    """
+    return swe.julday(birth_date.year, birth_date.month, birth_date.day, 0.0)
+
+def calculate_dasha_tree(details: BirthDetails) -> VimshottariDasha:
+    """Dasha tree from the birth Moon in the chart's ayanamsa, anchored at `dasha_epoch_jd`."""
+    tz_str = details.location_timezone or timezone_name(details.latitude, details.longitude)
+    birth_utc, _ = convert_to_utc(details.date, details.time, tz_str)
+    jd = swe.julday(birth_utc.year, birth_utc.month, birth_utc.day,
+                    birth_utc.hour + birth_utc.minute / 60.0 + birth_utc.second / 3600.0)
+    moon_lon = ephemeris.calc_ut(jd, swe.MOON, details.ayanamsa_mode)[0]
+    return VimshottariDasha(moon_lon, dasha_epoch_jd(details.date))
 
 def calculate_dashas(moon_lon: float, birth_date: date) -> list:
     """
-    Calculate Vimshottari Dasha sequence (Mahadasha-Antardasha).
-    Uses 'Theoretical Start' logic for precise alignment.
+    Vimshottari Mahadasha-Antardasha table for one 120-year cycle.
+    Uses 'Theoretical Start' logic, counted from `dasha_epoch_jd` of the birth date;
+    periods that ended before birth are dropped and the first one is clipped to birth.
     """
-    # Convert birth_date to datetime for calculation
-    birth_dt = datetime.combine(birth_date, time.min)
-    
-    # 1. Get Start Point
-    birth_lord, balance_years, passed_years = get_dasha_start_point(moon_lon, birth_dt)
-    
-    # 2. Determine Theoretical Start of Birth Mahadasha
-    # The date the current MD *would have* started if the native was born earlier.
-    # Start = Birth - Passed Years
-    current_md_start_theoretical = add_years_precise(birth_dt, -passed_years)
-    
-    all_dashas_flat = []
-    
-    # 3. Generate Cycle (Starting from Birth Lord)
-    # Generate enough Mahadashas to cover 120 years from birth
-    
-    start_lord_idx = PLANET_SEQUENCE.index(birth_lord)
-    current_md_start = current_md_start_theoretical
-    
-    # We generate a full 120y cycle (9 planets)
-    for i in range(9):
-        idx = (start_lord_idx + i) % 9
-        md_lord = PLANET_SEQUENCE[idx]
-        md_duration = MAHADASHA_YEARS[md_lord]
-        
-        md_end = add_years_precise(current_md_start, md_duration)
-        
-        # Generate Antardashas for this MD
-        ads = generate_sub_periods(md_lord, current_md_start, md_duration, 'AD')
-        
-        # Flatten and Filter
-        for ad in ads:
-            # We only care about periods that end AFTER birth (or allow a little overlap)
-            if ad['end_date'] > birth_dt:
-                
-                # Check for Pratyantardashas (Level 3) - Optional
-                # pds = generate_sub_periods(ad['lord'], ad['start_date'], ad['duration'], 'PD')
-                # For now, sticking to Antardashas as requested for the UI table fix.
-                
-                # Clip start date if it's the very first period overlapping birth
-                # But kept cleanly, the UI might prefer to see the full period and "Balance".
-                # Standard practice: Show the full sub-period dates, but note the balance?
-                # The user's screenshot showed precise dates.
-                # If we clip, we match the "Balance" concept.
-                
-                final_start = ad['start_date']
-                # if final_start < birth_dt:
-                #    final_start = birth_dt 
-                # Calculating "Balance" usually implies the first period starts AT birth.
-                # Let's clip to birth_dt for the first displayed entry.
-                
-                display_start = max(final_start, birth_dt)
-                
-                all_dashas_flat.append({
-                    "lord": f"{md_lord}-{ad['lord']}",
-                    "start_date": display_start.isoformat().split('T')[0],
-                    "end_date": ad['end_date'].isoformat().split('T')[0],
-                    "duration": float(ad['duration']) # Precise duration
-                })
-        
-        current_md_start = md_end
+    birth_jd = dasha_epoch_jd(birth_date)
+    birth_ordinal = birth_date.toordinal()
+    tree = VimshottariDasha(moon_lon, birth_jd)
+
+    def day(jd: float) -> str:
+        return date.fromordinal(birth_ordinal + math.floor(jd - birth_jd)).isoformat()
+
+    return [
+        {
+            "lord": ad.label,
+            "start_date": day(max(ad.start_jd, birth_jd)),
+            "end_date": day(ad.end_jd),
+            "duration": ad.years,
+        }
+        for ad in tree.periods(2, birth_jd)
+    ]
+
+def current_dasha(dashas: List[DashaPeriod], on: date) -> Optional[DashaPeriod]:
+    """The period of a chart's dasha table running on `on` (the last one after the table ends)."""
+    if not dashas:
+        return None
+    i = bisect.bisect_right([d.end_date for d in dashas], on)
+    return dashas[min(i, len(dashas) - 1)]
+
+# ============================================================================
+# BATCH CHART CALCULATION (Vectorized)
+# ============================================================================
+
+BATCH_CHUNK_SIZE = 256
+
+NAKSHATRA_LORDS = ['Ketu', 'Venus', 'Sun', 'Moon', 'Mars', 'Rahu', 'Jupiter', 'Saturn', 'Mercury']
+VIMSOPAKA_PLANETS = ['Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn']
+SHADVARGA_WEIGHTS = {1: 6, 2: 2, 3: 4, 9: 5, 12: 2, 30: 1}
+
+# Dignity score lookup: [planet, sign index] -> Vimsopaka points
+DIGNITY_TABLE = np.array(
+    [[calculate_dignity_score(p, s) for s in SIGNS] for p in VIMSOPAKA_PLANETS]
+)
 
-    return all_dashas_flat
+# Bodies of a batch chart, in column order
+BATCH_BODIES = list(PLANET_MAP) + ['Ketu']
+
+# Object arrays, so fancy indexing hands back the shared name strings
+SIGN_NAMES = np.array(SIGNS, dtype=object)
+NAKSHATRA_NAMES = np.array(NAKSHATRAS, dtype=object)
+NAKSHATRA_LORD_NAMES = np.array(NAKSHATRA_LORDS, dtype=object)
+
+def _build_varga_entries() -> np.ndarray:
+    """Divisional chart planet entries by [body, sign, house - 1]; batch results share these read-only dicts."""
+    entries = np.empty((len(BATCH_BODIES), 12, 12), dtype=object)
+    for b, name in enumerate(BATCH_BODIES):
+        for s, sign in enumerate(SIGNS):
+            for h in range(12):
+                entries[b, s, h] = {"planet": name, "sign": sign, "house": h + 1}
+    return entries
+
+VARGA_ENTRIES = _build_varga_entries()
+VARGA_KEYS = [(f"D{v}", v) for v in VARGA_NUMS]
+
+# Karana name per 6-degree slot of the Moon-Sun elongation (60 slots)
+KARANA_BY_SLOT = (
+    ["Kimstughna"]
+    + [KARANAS[(k - 1) % 7] for k in range(1, 57)]
+    + ["Shakuni", "Chatushpada", "Naga"]
+)
 
-def get_current_transits() -> list[dict]:
+def _build_dasha_offsets() -> Dict[str, Tuple[np.ndarray, np.ndarray, List[str]]]:
     """
-    Calculate current planetary positions (Transits) for now (UTC).
+    Precompute the Mahadasha-Antardasha layout for each possible birth lord.
+    Returns lord -> (start offsets in years, durations in years, "MD-AD" labels),
+    with offsets measured from the theoretical start of the birth Mahadasha.
     """
-    try:
-        # Current UTC time
-        now_utc = datetime.now(pytz.UTC)
-        
-        # Calculate Julian Day
-        decimal_hour = now_utc.hour + now_utc.minute / 60.0 + now_utc.second / 3600.0
-        jd = swe.julday(now_utc.year, now_utc.month, now_utc.day, decimal_hour)
-        
-        # Ayanamsa (Lahiri default for transits)
-        with swe_lock:
-            swe.set_sid_mode(swe.SIDM_LAHIRI)
-            ayanamsa = swe.get_ayanamsa_ut(jd)
-            
-            transits = []
-            
-            # Planets to track
-            planet_ids = {
-                'Sun': swe.SUN, 'Moon': swe.MOON, 'Mars': swe.MARS, 
-                'Mercury': swe.MERCURY, 'Jupiter': swe.JUPITER, 
-                'Venus': swe.VENUS, 'Saturn': swe.SATURN, 'Rahu': swe.TRUE_NODE
+    layouts = {}
+    for birth_idx, birth_lord in enumerate(PLANET_SEQUENCE):
+        starts, durations, labels = [], [], []
+        md_start = 0.0
+        for i in range(9):
+            md_lord = PLANET_SEQUENCE[(birth_idx + i) % 9]
+            md_years = MAHADASHA_YEARS[md_lord]
+            ad_start = md_start
+            ad_idx = PLANET_SEQUENCE.index(md_lord)
+            for j in range(9):
+                ad_lord = PLANET_SEQUENCE[(ad_idx + j) % 9]
+                duration = md_years * (MAHADASHA_YEARS[ad_lord] / 120.0)
+                starts.append(ad_start)
+                durations.append(duration)
+                labels.append(f"{md_lord}-{ad_lord}")
+                ad_start += duration
+            md_start += md_years
+        layouts[birth_lord] = (np.array(starts), np.array(durations), labels)
+    return layouts
+
+DASHA_OFFSETS = _build_dasha_offsets()
+
+def _batch_julian_days(details_list: List[BirthDetails]) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """Resolve timezones and convert local birth times to UT Julian days."""
+    jds = np.full(len(details_list), np.nan)
+    errors: List[Optional[str]] = [None] * len(details_list)
+    for i, details in enumerate(details_list):
+        try:
+            tz_str = details.location_timezone or timezone_name(details.latitude, details.longitude)
+            try:
+                local_tz = get_zone(tz_str)
+            except pytz.UnknownTimeZoneError:
+                local_tz = pytz.UTC
+            birth_utc = local_tz.localize(datetime.combine(details.date, details.time)).astimezone(timezone.utc)
+            jds[i] = swe.julday(
+                birth_utc.year, birth_utc.month, birth_utc.day,
+                birth_utc.hour + birth_utc.minute / 60.0 + birth_utc.second / 3600.0
+            )
+        except Exception as e:
+            errors[i] = str(e)
+    return jds, errors
+
+def _calculate_chart_group(details_list: List[BirthDetails], mode_name: str) -> List[dict]:
+    """
+    Calculate charts sharing one ayanamsa mode.
+    Planet positions are evaluated per body across the group (vectorized when
+    ephemeris tables are installed); everything derived from the longitudes
+    (signs, nakshatras, houses, vargas, strengths, panchanga and dashas) is
+    computed over NumPy arrays for the whole group.
+    """
+    n = len(details_list)
+    jds, errors = _batch_julian_days(details_list)
+    valid = ~np.isnan(jds)
+
+    body_names = BATCH_BODIES
+    lons = np.zeros((n, len(body_names)))
+    lats = np.zeros((n, len(body_names)))
+    speeds = np.zeros((n, len(body_names)))
+    asc = np.zeros(n)
+    ayanamsas = np.zeros(n)
+
+    valid_idx = np.flatnonzero(valid)
+    for b, pid in enumerate(PLANET_MAP.values()):
+        xx = ephemeris.calc_ut_array(jds[valid_idx], pid, mode_name)
+        lons[valid_idx, b], lats[valid_idx, b], speeds[valid_idx, b] = xx[:, 0], xx[:, 1], xx[:, 3]
+
+    for i in valid_idx:
+        jd = jds[i]
+        details = details_list[i]
+        ayanamsas[i] = ephemeris.get_ayanamsa(jd, mode_name)
+        asc[i] = swe.houses(jd, details.latitude, details.longitude, b'W')[1][0]
+
+    # Vara: weekday of the sunrise that precedes birth. Away from the polar circles the
+    # Sun rises before local noon, so only births before noon need the sunrise itself.
+    birth_days = np.array([d.date for d in details_list], dtype='datetime64[D]')
+    civil_midnights = birth_days.astype(np.int64) + 2440587.5
+    latitudes = np.array([d.latitude for d in details_list], dtype=float)
+    longitudes = np.array([d.longitude for d in details_list], dtype=float)
+    after_noon = (jds >= civil_midnights - longitudes / 360.0 + 0.52) & (np.abs(latitudes) < 60.0)
+    before_sunrise = np.zeros(n, dtype=bool)
+    for i in np.flatnonzero(valid & ~after_noon):
+        details = details_list[i]
+        before_sunrise[i] = jds[i] < sunrise(details.date, details.latitude, details.longitude)
+    vara_idx = (civil_midnights + np.where(before_sunrise, 0.5, 1.5)).astype(np.int64) % 7
+
+    rahu_col = body_names.index('Rahu')
+    lons[:, -1] = (lons[:, rahu_col] + 180) % 360
+    lats[:, -1] = -lats[:, rahu_col]
+    speeds[:, -1] = -speeds[:, rahu_col]
+
+    asc = (asc - ayanamsas) % 360
+    asc_sign = (asc // 30).astype(np.int64) % 12
+
+    # Signs, nakshatras, houses
+    nak_len = 360.0 / 27.0
+    sign_idx = (lons // 30).astype(np.int64) % 12
+    nak_idx = (lons / nak_len).astype(np.int64) % 27
+    house_num = (sign_idx - asc_sign[:, None]) % 12 + 1
+
+    # Divisional charts (ascendant stacked as the last column)
+    all_lons = np.concatenate([lons, asc[:, None]], axis=1)
+    varga_signs = dict(zip(VARGA_NUMS, calculate_varga_matrix(all_lons)))
+
+    # Vimsopaka strengths (Shadvarga)
+    planet_cols = [body_names.index(p) for p in VIMSOPAKA_PLANETS]
+    planet_rows = np.arange(len(VIMSOPAKA_PLANETS))
+    strength_totals = np.zeros((n, len(VIMSOPAKA_PLANETS)))
+    for v_num, weight in SHADVARGA_WEIGHTS.items():
+        strength_totals += DIGNITY_TABLE[planet_rows, varga_signs[v_num][:, planet_cols]] * weight
+    strengths = np.round(strength_totals / 20.0, 2)
+
+    # Panchanga
+    sun_lon = lons[:, body_names.index('Sun')]
+    moon_lon = lons[:, body_names.index('Moon')]
+    elong = (moon_lon - sun_lon) % 360
+    tithi_idx = (elong / 12).astype(np.int64)
+    tithi_completion = np.round((elong % 12) / 12 * 100, 2)
+    moon_nak = (moon_lon / nak_len).astype(np.int64) % 27
+    moon_pada = ((moon_lon % nak_len) / (nak_len / 4)).astype(np.int64) + 1
+    moon_nak_completion = np.round((moon_lon % nak_len) / nak_len * 100, 2)
+    yoga_idx = (((moon_lon + sun_lon) % 360) / (360 / 27)).astype(np.int64)
+    karana_idx = (elong / 6).astype(np.int64)
+
+    # Dashas: every Mahadasha-Antardasha period laid out in days from `dasha_epoch_jd`
+    birth_lords = moon_nak % 9
+    passed_years = np.array([MAHADASHA_YEARS[PLANET_SEQUENCE[l]] for l in birth_lords]) * ((moon_lon % nak_len) / nak_len)
+    dasha_starts = np.stack([DASHA_OFFSETS[PLANET_SEQUENCE[l]][0] for l in birth_lords]) if n else np.zeros((0, 81))
+    dasha_durations = np.stack([DASHA_OFFSETS[PLANET_SEQUENCE[l]][1] for l in birth_lords]) if n else np.zeros((0, 81))
+    start_days = (dasha_starts - passed_years[:, None]) * 365.25
+    end_days = start_days + dasha_durations * 365.25
+    birth_days = birth_days[:, None]
+    dasha_start_dates = np.datetime_as_string(birth_days + np.floor(np.maximum(start_days, 0)).astype('timedelta64[D]')).tolist()
+    dasha_end_dates = np.datetime_as_string(birth_days + np.floor(end_days).astype('timedelta64[D]')).tolist()
+    dasha_keep = (end_days > 0).tolist()
+    dasha_durations = dasha_durations.tolist()
+
+    # Convert to Python lists once; per-chart assembly below only does dict building
+    sign_names = SIGN_NAMES[sign_idx].tolist()
+    nak_names = NAKSHATRA_NAMES[nak_idx].tolist()
+    nak_lords = NAKSHATRA_LORD_NAMES[nak_idx % 9].tolist()
+    house_list = house_num.tolist()
+    lon_list, lat_list, speed_list = lons.tolist(), lats.tolist(), speeds.tolist()
+    retro_list = (speeds < 0).tolist()
+    d9_names, d10_names = SIGN_NAMES[varga_signs[9]].tolist(), SIGN_NAMES[varga_signs[10]].tolist()
+    body_rows = np.arange(len(body_names))
+    varga_planets = {v: VARGA_ENTRIES[body_rows, s[:, :-1], (s[:, :-1] - s[:, -1:]) % 12].tolist()
+                     for v, s in varga_signs.items()}
+    varga_asc_names = {v: SIGN_NAMES[s[:, -1]].tolist() for v, s in varga_signs.items()}
+    vara_list = vara_idx.tolist()
+    strength_list = strengths.tolist()
+    asc_list, asc_sign_list, ayanamsa_list = asc.tolist(), asc_sign.tolist(), ayanamsas.tolist()
+
+    results = []
+    for i in range(n):
+        if not valid[i]:
+            results.append({"error": errors[i]})
+            continue
+        details = details_list[i]
+
+        retro = retro_list[i]
+        retro[-1] = retro[rahu_col]
+        planets = [
+            {
+                "name": name, "longitude": lon, "latitude": lat, "speed": speed,
+                "retrograde": is_retro, "house": house, "sign": sign,
+                "nakshatra": nak, "nakshatra_lord": nak_lord, "d9_sign": d9, "d10_sign": d10,
             }
-            
-            flags = swe.FLG_SWIEPH | swe.FLG_SPEED | swe.FLG_SIDEREAL
-            
-            for name, pid in planet_ids.items():
-                xx, _ = swe.calc_ut(jd, pid, flags)
-                lon = xx[0]
-                sign = get_sign_from_longitude(lon)
-                degree = lon % 30
-                nak, _ = get_nakshatra(lon)
-                
-                transits.append({
-                    "name": name,
-                    "sign": sign,
-                    "degree": round(degree, 2),
-                    "nakshatra": nak,
-                    "retrograde": xx[3] < 0
-                })
-                
-            # Ketu (Opposite Rahu)
-            rahu = next(p for p in transits if p["name"] == 'Rahu')
-            ketu_lon = (swe.calc_ut(jd, swe.TRUE_NODE, flags)[0][0] + 180) % 360
-            transits.append({
-                "name": "Ketu",
-                "sign": get_sign_from_longitude(ketu_lon),
-                "degree": round(ketu_lon % 30, 2),
-                "nakshatra": get_nakshatra(ketu_lon)[0],
-                "retrograde": rahu["retrograde"]
-            })
-            
-            return transits
-        
-    except Exception as e:
-        logger.error(f"Error calculating transits: {e}")
-        return []
+            for name, lon, lat, speed, is_retro, house, sign, nak, nak_lord, d9, d10 in zip(
+                body_names, lon_list[i], lat_list[i], speed_list[i], retro, house_list[i],
+                sign_names[i], nak_names[i], nak_lords[i], d9_names[i], d10_names[i]
+            )
+        ]
+
+        divisional_charts = {
+            key: {"name": key, "planets": varga_planets[v_num][i], "ascendant_sign": varga_asc_names[v_num][i]}
+            for key, v_num in VARGA_KEYS
+        }
+
+
+        t_idx = int(tithi_idx[i])
+        tithi_name = TITHIS[t_idx % 15]
+        if t_idx == 14: tithi_name = "Purnima"
+        if t_idx == 29: tithi_name = "Amavasya"
+        m_nak = int(moon_nak[i])
+        panchanga = {
+            "tithi": {
+                "name": tithi_name, "number": t_idx + 1,
+                "paksha": "Shukla" if t_idx < 15 else "Krishna",
+                "completion": float(tithi_completion[i]),
+            },
+            "nakshatra": {
+                "name": NAKSHATRAS[m_nak], "number": m_nak + 1, "pada": int(moon_pada[i]),
+                "lord": NAKSHATRA_LORDS[m_nak % 9], "completion": float(moon_nak_completion[i]),
+            },
+            "yoga": {"name": YOGAS[yoga_idx[i]], "number": int(yoga_idx[i] + 1)},
+            "karana": {"name": KARANA_BY_SLOT[karana_idx[i]], "number": int(karana_idx[i] + 1)},
+            "vara": WEEKDAYS[vara_list[i]],
+        }
+
+        labels = DASHA_OFFSETS[PLANET_SEQUENCE[birth_lords[i]]][2]
+        keep, durations = dasha_keep[i], dasha_durations[i]
+        starts, ends = dasha_start_dates[i], dasha_end_dates[i]
+        dashas = [
+            {"lord": label, "duration": duration, "start_date": start, "end_date": end}
+            for label, duration, start, end in compress(zip(labels, durations, starts, ends), keep)
+        ]
+
+        a_sign = asc_sign_list[i]
+        results.append({
+            "ascendant": asc_list[i],
+            "ascendant_sign": SIGNS[a_sign],
+            "planets": planets,
+            "houses": [
+                {"number": h + 1, "sign": SIGNS[(a_sign + h) % 12],
+                 "ascendant_degree": asc_list[i] if h == 0 else None}
+                for h in range(12)
+            ],
+            "dashas": dashas,
+            "panchanga": panchanga,
+            "strengths": dict(zip(VIMSOPAKA_PLANETS, strength_list[i])),
+            "divisional_charts": divisional_charts,
+            "ayanamsa": ayanamsa_list[i],
+        })
+    return results
+
+def calculate_natal_points(details_list: List[BirthDetails], mode_name: str) -> np.ndarray:
+    """
+    Sidereal Moon, ascendant, Saturn and Mars longitudes, shape (n, 4), for charts
+    sharing one ayanamsa mode; rows whose birth time cannot be resolved are NaN.
+    """
+    jds, _ = _batch_julian_days(details_list)
+    points = np.full((len(details_list), 4), np.nan)
+    valid_idx = np.flatnonzero(~np.isnan(jds))
+    points[valid_idx, 0] = ephemeris.calc_ut_array(jds[valid_idx], swe.MOON, mode_name)[:, 0]
+    points[valid_idx, 2] = ephemeris.calc_ut_array(jds[valid_idx], swe.SATURN, mode_name)[:, 0]
+    points[valid_idx, 3] = ephemeris.calc_ut_array(jds[valid_idx], swe.MARS, mode_name)[:, 0]
+    for i in valid_idx:
+        details = details_list[i]
+        asc = swe.houses(jds[i], details.latitude, details.longitude, b'W')[1][0]
+        points[i, 1] = (asc - ephemeris.get_ayanamsa(jds[i], mode_name)) % 360
+    return points
+
+def calculate_charts_batch(details_list: List[BirthDetails]) -> Iterator[dict]:
+    """
+    Calculate many birth charts in one pass.
+
+    Inputs are processed in chunks; within a chunk they are grouped by ayanamsa
+    so each body is evaluated once per group over all its birth times, and all
+    derived placements are computed over NumPy arrays. Results are yielded in input order as plain
+    JSON-ready dicts shaped like `ChartResponse` (special times, Maandi and the
+    sunrise verification fields are omitted). Each result carries its input
+    `index`; inputs that fail carry an `error` message instead of chart data.
+    Divisional chart planet entries are shared between results and must not be mutated.
+    """
+    for chunk_start in range(0, len(details_list), BATCH_CHUNK_SIZE):
+        chunk = details_list[chunk_start:chunk_start + BATCH_CHUNK_SIZE]
+        groups: Dict[str, List[int]] = {}
+        for i, details in enumerate(chunk):
+            groups.setdefault(details.ayanamsa_mode, []).append(i)
+
+        results: List[Optional[dict]] = [None] * len(chunk)
+        for mode, indexes in groups.items():
+            group_results = _calculate_chart_group([chunk[i] for i in indexes], mode)
+            for i, result in zip(indexes, group_results):
+                results[i] = result
+
+        for offset, result in enumerate(results):
+            yield {"index": chunk_start + offset, **result}
+
+def get_current_transits(at: Optional[datetime] = None) -> list[dict]:
+    """
+    Calculate planetary positions (Transits) at `at` (aware; default now, UTC).
+    Errors propagate, so a failed calculation is never served as an empty list.
+    """
+    jd = datetime_to_jd(at or datetime.now(timezone.utc))
+
+    transits = []
+
+    # Planets to track
+    planet_ids = {
+        'Sun': swe.SUN, 'Moon': swe.MOON, 'Mars': swe.MARS, 
+        'Mercury': swe.MERCURY, 'Jupiter': swe.JUPITER, 
+        'Venus': swe.VENUS, 'Saturn': swe.SATURN, 'Rahu': swe.TRUE_NODE
+    }
+
+    for name, pid in planet_ids.items():
+        xx = ephemeris.calc_ut(jd, pid, "LAHIRI")
+        lon = xx[0]
+        if name == 'Rahu':
+            rahu_lon = lon
+        sign = get_sign_from_longitude(lon)
+        degree = lon % 30
+        nak, _ = get_nakshatra(lon)
+
+        transits.append({
+            "name": name,
+            "sign": sign,
+            "degree": round(degree, 2),
+            "nakshatra": nak,
+            "retrograde": xx[3] < 0
+        })
+
+    # Ketu (Opposite Rahu)
+    rahu = next(p for p in transits if p["name"] == 'Rahu')
+    ketu_lon = (rahu_lon + 180) % 360
+    transits.append({
+        "name": "Ketu",
+        "sign": get_sign_from_longitude(ketu_lon),
+        "degree": round(ketu_lon % 30, 2),
+        "nakshatra": get_nakshatra(ketu_lon)[0],
+        "retrograde": rahu["retrograde"]
+    })
+
+    return transits
 
 # ============================================================================
 # SPECIAL TIMING CALCULATIONS (Muhurta/Kalam)
@@ -1526,51 +1706,14 @@ def calculate_special_times(
 ) -> List[Dict]:
     """
     Calculate special timing periods like Rahu Kalam, Yamagandam, Gulika Kalam,
-    and Abhijit Muhurta for the given day.
+    and Abhijit Muhurta for the given day, in `timezone_str`.
+    All periods come from the day's shared `DayContext`.
     """
-    
-    # 1. Get Sunrise/Sunset using the robust helper
-    try:
-        from .utils.timezone_helper import get_sunrise_sunset
-        sunrise_dt, sunset_dt = get_sunrise_sunset(lat, lon, date_obj)
-    except Exception as e:
-        logger.warning(f"Sunrise calculation failed, using fallback: {e}")
-        tz = pytz.timezone(timezone_str)
-        sunrise_dt = datetime.combine(date_obj, time(6, 0), tz)
-        sunset_dt = datetime.combine(date_obj, time(18, 0), tz)
+    ctx = day_context(date_obj, lat, lon)
 
-    
-    day_duration = (sunset_dt - sunrise_dt).total_seconds()
-    segment_duration = day_duration / 8.0 # 8 parts for Kalams
-    
-    weekday = date_obj.weekday() # 0=Mon, 6=Sun
-    
-    # Mappings (Segment Index 1-8)
-    
-    # RAHU KALAM (Inauspicious)
-    # Mon:2, Tue:7, Wed:5, Thu:6, Fri:4, Sat:3, Sun:8
-    rahu_map = {0: 2, 1: 7, 2: 5, 3: 6, 4: 4, 5: 3, 6: 8}
-    
-    # YAMAGANDAM (Inauspicious)
-    # Mon:4, Tue:3, Wed:2, Thu:1, Fri:7, Sat:6, Sun:5
-    yama_map = {0: 4, 1: 3, 2: 2, 3: 1, 4: 7, 5: 6, 6: 5}
-    
-    # GULIKA KALAM (Inauspicious for new beginnings, good for repeated events)
-    # Mon:6, Tue:5, Wed:4, Thu:3, Fri:2, Sat:1, Sun:7
-    gulika_map = {0: 6, 1: 5, 2: 4, 3: 3, 4: 2, 5: 1, 6: 7}
-    
-    results = []
-    
-    # Helper
-    def add_period(name, seg_idx, quality, desc):
-        # seg_idx is 1-based (1..8)
-        start_sec = (seg_idx - 1) * segment_duration
-        end_sec = seg_idx * segment_duration
-        
-        start = sunrise_dt + timedelta(seconds=start_sec)
-        end = sunrise_dt + timedelta(seconds=end_sec)
-        
-        results.append({
+    def period(name, span, quality, desc):
+        start, end = (jd_to_local(jd, timezone_str).replace(microsecond=0) for jd in span)
+        return {
             "name": name,
             "start_time": start.strftime("%I:%M %p"),
             "end_time": end.strftime("%I:%M %p"),
@@ -1578,54 +1721,23 @@ def calculate_special_times(
             "description": desc,
             "start_dt": start.isoformat(),
             "end_dt": end.isoformat()
-        })
+        }
 
-    # Add Kalams
-    add_period("Rahu Kalam", rahu_map[weekday], "Inauspicious", "Avoid new beginnings or travels.")
-    add_period("Yamagandam", yama_map[weekday], "Inauspicious", "Death-like time. Avoid auspicious acts.")
-    add_period("Gulika Kalam", gulika_map[weekday], "Neutral/Mixed", "Good for repeating actions, bad for start.")
-    
-    # ABHIJIT MUHURTA (Auspicious)
-    # Midday (local noon) +/- 24 mins (approx 1 muhurta centered)
-    # Actually it is the 8th Muhurta of 15 Muhurtas of daytime.
-    muhurta_len = day_duration / 15.0
-    abhijit_start = sunrise_dt + timedelta(seconds=muhurta_len * 7) # Start of 8th
-    abhijit_end = sunrise_dt + timedelta(seconds=muhurta_len * 8)   # End of 8th
-    
-    qual = "Auspicious"
-    desc = "Golden Moment. Good for all auspicious works."
-    if weekday == 2: # Wednesday
-        qual = "Neutral" # Weaker on Wed
-        desc += " (Weaker on Wednesday)"
-        
-    results.append({
-        "name": "Abhijit Muhurta",
-        "start_time": abhijit_start.strftime("%I:%M %p"),
-        "end_time": abhijit_end.strftime("%I:%M %p"),
-        "quality": qual,
-        "description": desc,
-        "start_dt": abhijit_start.isoformat(),
-        "end_dt": abhijit_end.isoformat()
-    })
-    
-    # BRAHMA MUHURTA (Pre-dawn)
-    # 2 Muhurtas before Sunrise -> 1.5h
-    # Note: Requires yesterday's sunset or just approx 96 mins before today's sunrise.
-    # We'll use approx relative to today's sunrise for simplicity in this function context.
-    brahma_start = sunrise_dt - timedelta(minutes=96)
-    brahma_end = sunrise_dt - timedelta(minutes=48)
-    
-    results.append({
-        "name": "Brahma Muhurta",
-        "start_time": brahma_start.strftime("%I:%M %p"),
-        "end_time": brahma_end.strftime("%I:%M %p"),
-        "quality": "Spiritual",
-        "description": "Best time for meditation and learning.",
-        "start_dt": brahma_start.isoformat(),
-        "end_dt": brahma_end.isoformat()
-    })
+    abhijit_quality, abhijit_desc = "Auspicious", "Golden Moment. Good for all auspicious works."
+    if ctx.weekday == 3: # Wednesday
+        abhijit_quality = "Neutral" # Weaker on Wed
+        abhijit_desc += " (Weaker on Wednesday)"
+
+    return [
+        period("Rahu Kalam", ctx.rahu_kalam(), "Inauspicious", "Avoid new beginnings or travels."),
+        period("Yamagandam", ctx.yamagandam(), "Inauspicious", "Death-like time. Avoid auspicious acts."),
+        period("Gulika Kalam", ctx.gulika_kalam(), "Neutral/Mixed", "Good for repeating actions, bad for start."),
+        # 8th of the 15 day muhurtas
+        period("Abhijit Muhurta", ctx.abhijit(), abhijit_quality, abhijit_desc),
+        # 14th of the 15 night muhurtas, ending one muhurta before sunrise
+        period("Brahma Muhurta", ctx.brahma_muhurta(), "Spiritual", "Best time for meditation and learning."),
+    ]
 
-    return results
 # --- ENHANCED DAILY PANCHANGA ENGINE ---
 
 def calculate_daily_panchanga_extended(
@@ -1633,40 +1745,26 @@ def calculate_daily_panchanga_extended(
     time_val: time,
     latitude: float,
     longitude: float,
-    ayanamsa_mode: str = "LAHIRI"
+    ayanamsa_mode: str = "LAHIRI",
+    jd: Optional[float] = None
 ) -> PanchangaExtended:
     """
-    Calculate complete daily Panchanga with end times for each element.
+    Calculate complete daily Panchanga with start and end times for each element.
     This is more detailed than birth chart Panchanga.
+    The moment used is `jd` (UT) when given, otherwise date_val + time_val taken as UT;
+    the weekday always comes from date_val.
     """
-    jd = get_julian_day(date_val, time_val)
-    
-    # Set ayanamsa
-    sid_mode = AYANAMSA_MAP.get(ayanamsa_mode, swe.SIDM_LAHIRI)
-    if ayanamsa_mode != "SAYANA":
-        swe.set_sid_mode(sid_mode)
-    
-    # Calculate planet positions
-    with swe_lock:
-        is_tropical = ayanamsa_mode == "SAYANA"
-        flags = swe.FLG_SWIEPH | (0 if is_tropical else swe.FLG_SIDEREAL)
-        sun_data, _ = swe.calc_ut(jd, swe.SUN, flags)
-        moon_data, _ = swe.calc_ut(jd, swe.MOON, flags)
-    
-    sun_lon = sun_data[0]
-    moon_lon = moon_data[0]
-    
-    # Calculate Tithi with end time
-    tithi_data = calculate_tithi_with_end_time(sun_lon, moon_lon, jd, latitude, longitude)
+    if jd is None:
+        jd = get_julian_day(date_val, time_val)
     
-    # Calculate Nakshatra with end time
-    nakshatra_data = calculate_nakshatra_with_end_time(moon_lon, jd, latitude, longitude)
+    # Element boundaries from the transition index (solved exactly where it does not cover jd)
+    limbs = lookup_panchanga(jd, ayanamsa_mode)
+    sun_lon, moon_lon = limbs.sun_lon, limbs.moon_lon
     
-    # Calculate Yoga with end time
-    yoga_data = calculate_yoga_with_end_time(sun_lon, moon_lon, jd, latitude, longitude)
-    
-    # Calculate Karana with end time
-    karana_data = calculate_karana_with_end_time(sun_lon, moon_lon, jd, latitude, longitude)
+    tithi_data = calculate_tithi_with_end_time(limbs.tithi, latitude, longitude)
+    nakshatra_data = calculate_nakshatra_with_end_time(limbs.nakshatra, latitude, longitude)
+    yoga_data = calculate_yoga_with_end_time(limbs.yoga, latitude, longitude)
+    karana_data = calculate_karana_with_end_time(limbs.karana, latitude, longitude)
     
     # Calculate Vara
     weekday_idx = date_val.weekday()
@@ -1688,97 +1786,146 @@ def calculate_daily_panchanga_extended(
         moon_rasi=moon_rasi
     )
 
-def calculate_tithi_with_end_time(sun_lon: float, moon_lon: float, jd: float, lat: float, lon: float) -> TithiDataExtended:
-    diff = (moon_lon - sun_lon) % 360
-    tithi_index = int(diff / 12)
-    degree_in_tithi = diff % 12
-    tithi_completion = (degree_in_tithi / 12) * 100
-    degrees_remaining = 12 - degree_in_tithi
-    hours_remaining = (degrees_remaining / 12) * 24
-    end_jd = jd + (hours_remaining / 24)
-    end_dt = jd_to_datetime(end_jd, lat, lon)
+def _transition_times(transition: Transition, lat: float, lon: float) -> dict:
+    start_dt = jd_to_datetime(transition.start_jd, lat, lon)
+    end_dt = jd_to_datetime(transition.end_jd, lat, lon)
+    return dict(start_time=start_dt.strftime("%H:%M:%S"), end_time=end_dt.strftime("%H:%M:%S"),
+                start_jd=transition.start_jd, end_jd=transition.end_jd)
+
+def tithi_name(index: int) -> str:
+    """Name of tithi `index` (0-29)."""
+    if index == 14: return "Purnima"
+    if index == 29: return "Amavasya"
+    return TITHIS[index % 15]
+
+def karana_name(index: int) -> str:
+    """Name of karana `index` (0-59): Kimstughna, 7 movable karanas x 8, then the 3 fixed ones."""
+    if index == 0: return "Kimstughna"
+    if index >= 57: return ["Shakuni", "Chatushpada", "Naga"][index - 57]
+    return KARANAS[(index - 1) % 7]
+
+def calculate_tithi_with_end_time(tithi: Transition, lat: float, lon: float) -> TithiDataExtended:
+    tithi_index = tithi.index
     is_shukla = tithi_index < 15
-    tithi_name = TITHIS[tithi_index % 15]
-    if tithi_index == 14: tithi_name = "Purnima"
-    if tithi_index == 29: tithi_name = "Amavasya"
-    return TithiDataExtended(name=tithi_name, number=tithi_index + 1, paksha="Shukla" if is_shukla else "Krishna", completion=round(tithi_completion, 2), end_time=end_dt.strftime("%H:%M:%S"))
+    return TithiDataExtended(name=tithi_name(tithi_index), number=tithi_index + 1, paksha="Shukla" if is_shukla else "Krishna", completion=round(tithi.completion(12), 2), **_transition_times(tithi, lat, lon))
 
-def calculate_nakshatra_with_end_time(moon_lon: float, jd: float, lat: float, lon: float) -> NakshatraDataExtended:
+def calculate_nakshatra_with_end_time(nakshatra: Transition, lat: float, lon: float) -> NakshatraDataExtended:
     nak_len = 360.0 / 27.0
-    nak_index = int(moon_lon / nak_len) % 27
-    degree_in_nak = moon_lon % nak_len
+    nak_index = nakshatra.index
+    degree_in_nak = nakshatra.angle % nak_len
     pada = int(degree_in_nak / (nak_len / 4)) + 1
-    nak_completion = (degree_in_nak / nak_len) * 100
-    degrees_remaining = nak_len - degree_in_nak
-    hours_remaining = (degrees_remaining / 13.176) * 24
-    end_jd = jd + (hours_remaining / 24)
-    end_dt = jd_to_datetime(end_jd, lat, lon)
-    lords = ['Ketu', 'Venus', 'Sun', 'Moon', 'Mars', 'Rahu', 'Jupiter', 'Saturn', 'Mercury']
-    return NakshatraDataExtended(name=NAKSHATRAS[nak_index], number=nak_index + 1, pada=pada, lord=lords[nak_index % 9], completion=round(nak_completion, 2), end_time=end_dt.strftime("%H:%M:%S"))
+    return NakshatraDataExtended(name=NAKSHATRAS[nak_index], number=nak_index + 1, pada=pada, lord=NAKSHATRA_LORDS[nak_index % 9], completion=round(nakshatra.completion(nak_len), 2), **_transition_times(nakshatra, lat, lon))
 
-def calculate_yoga_with_end_time(sun_lon: float, moon_lon: float, jd: float, lat: float, lon: float) -> YogaDataExtended:
-    total = (moon_lon + sun_lon) % 360
-    yoga_unit = 360 / 27
-    yoga_index = int(total / yoga_unit)
-    degree_in_yoga = total % yoga_unit
-    degrees_remaining = yoga_unit - degree_in_yoga
-    hours_remaining = (degrees_remaining / 14.176) * 24
-    end_jd = jd + (hours_remaining / 24)
-    end_dt = jd_to_datetime(end_jd, lat, lon)
-    return YogaDataExtended(name=YOGAS[yoga_index], number=yoga_index + 1, end_time=end_dt.strftime("%H:%M:%S"))
-
-def calculate_karana_with_end_time(sun_lon: float, moon_lon: float, jd: float, lat: float, lon: float) -> KaranaDataExtended:
-    diff = (moon_lon - sun_lon) % 360
-    k_index = int(diff / 6)
-    if k_index == 0: karana_name = "Kimstughna"
-    elif k_index >= 57:
-        rem = k_index - 57
-        karana_name = ["Shakuni", "Chatushpada", "Naga"][rem]
-    else:
-        rem = (k_index - 1) % 7
-        karana_name = KARANAS[rem]
-    degree_in_karana = diff % 6
-    degrees_remaining = 6 - degree_in_karana
-    hours_remaining = (degrees_remaining / 12) * 24
-    end_jd = jd + (hours_remaining / 24)
-    end_dt = jd_to_datetime(end_jd, lat, lon)
-    return KaranaDataExtended(name=karana_name, number=k_index + 1, end_time=end_dt.strftime("%H:%M:%S"))
-
-def calculate_auspicious_timings_extended(sunrise: datetime, sunset: datetime, lat: float, lon: float) -> AuspiciousTimings:
+def calculate_yoga_with_end_time(yoga: Transition, lat: float, lon: float) -> YogaDataExtended:
+    return YogaDataExtended(name=YOGAS[yoga.index], number=yoga.index + 1, **_transition_times(yoga, lat, lon))
+
+def calculate_karana_with_end_time(karana: Transition, lat: float, lon: float) -> KaranaDataExtended:
+    return KaranaDataExtended(name=karana_name(karana.index), number=karana.index + 1, **_transition_times(karana, lat, lon))
+
+MAX_CALENDAR_DAYS = int(os.getenv("MAX_CALENDAR_DAYS", "732"))
+
+def _limb_periods(solver: TransitionSolver, limb: str, current: Transition, day_end: float) -> Tuple[List[Transition], Transition]:
+    """Transitions of `limb` from `current` up to the one running at `day_end`, which is also returned."""
+    periods = [current]
+    while current.end_jd <= day_end:
+        current = solver.following(limb, current)
+        periods.append(current)
+    return periods, current
+
+def calculate_panchanga_calendar(
+    start: date,
+    end: date,
+    latitude: float,
+    longitude: float,
+    tz_name: Optional[str] = None,
+    ayanamsa_mode: str = "LAHIRI"
+) -> Iterator[dict]:
+    """
+    Panchanga for every day from `start` to `end` (inclusive), one JSON-ready dict per day.
+
+    A day runs from sunrise to the next sunrise and lists every tithi, nakshatra,
+    yoga and karana that overlaps it, in order, with local start and end times.
+    Moonrise and moonset are those of the civil date (None when there is none).
+    Each day starts from the previous day's next sunrise. Elements come from the
+    transition index; where it does not cover a day, the solver continues from
+    the elements running at the previous next sunrise, so only boundaries not
+    seen before are solved.
+    """
+    tz_name = tz_name or timezone_name(latitude, longitude)
+    index = get_index()
+    solver = TransitionSolver(ayanamsa_mode)
+    limbs = {"tithi": None, "nakshatra": None, "yoga": None}
+    karanas: List[Transition] = []
+    day = None
+
+    def local(jd: float) -> str:
+        return jd_to_local(jd, tz_name).replace(microsecond=0).isoformat()
+
+    def period(name: str, number: int, t: Transition) -> dict:
+        return {"name": name, "number": number, "start": local(t.start_jd), "end": local(t.end_jd)}
+
+    def calendar_day(d: date, day, day_periods: Dict[str, List[Transition]]) -> dict:
+        vedic_day_idx = (d.weekday() + 1) % 7
+        moon = moon_day(d, latitude, longitude, tz_name)
+        return {
+            "date": d.isoformat(),
+            "vara": WEEKDAYS[vedic_day_idx],
+            "sunrise": local(day.sunrise),
+            "sunset": local(day.sunset),
+            "next_sunrise": local(day.next_sunrise),
+            "moonrise": local(moon.moonrise) if moon.moonrise is not None else None,
+            "moonset": local(moon.moonset) if moon.moonset is not None else None,
+            "tithi": [{**period(tithi_name(t.index), t.index + 1, t), "paksha": "Shukla" if t.index < 15 else "Krishna"}
+                      for t in day_periods["tithi"]],
+            "nakshatra": [{**period(NAKSHATRAS[t.index], t.index + 1, t), "lord": NAKSHATRA_LORDS[t.index % 9]}
+                          for t in day_periods["nakshatra"]],
+            "yoga": [period(YOGAS[t.index], t.index + 1, t) for t in day_periods["yoga"]],
+            "karana": [period(karana_name(t.index), t.index + 1, t) for t in day_periods["karana"]],
+        }
+
+    for ordinal in range(start.toordinal(), end.toordinal() + 1):
+        d = date.fromordinal(ordinal)
+        if day is not None:
+            day = following_day(day, latitude, longitude)
+        # Fall back to a fresh search when the carried sunrise is not on this date (polar days)
+        if day is None or math.floor(day.sunrise + longitude / 360.0 - 1721424.5) != ordinal:
+            day = solar_day(d, latitude, longitude)
+            limbs = dict.fromkeys(limbs)
+            karanas = []
+
+        if index is not None and all(index.covers(limb, jd, ayanamsa_mode) for limb in LIMBS for jd in (day.sunrise, day.next_sunrise)):
+            yield calendar_day(d, day, {limb: index.between(limb, day.sunrise, day.next_sunrise, ayanamsa_mode) for limb in LIMBS})
+            continue
+
+        day_periods = {}
+        for limb, current in limbs.items():
+            if current is None or not current.start_jd <= day.sunrise < current.end_jd:
+                current = solver.transition(limb, day.sunrise)
+            day_periods[limb], limbs[limb] = _limb_periods(solver, limb, current, day.next_sunrise)
+
+        # Karanas come in pairs per tithi; drop the ones that ended before sunrise
+        for tithi in day_periods["tithi"]:
+            if not karanas or karanas[-1].end_jd < tithi.end_jd:
+                karanas.extend(solver.karanas(tithi))
+        karanas = [k for k in karanas if k.end_jd > day.sunrise]
+        day_periods["karana"] = [k for k in karanas if k.start_jd <= day.next_sunrise]
+        yield calendar_day(d, day, day_periods)
+
+def calculate_auspicious_timings_extended(ctx: DayContext, tz_name: str) -> AuspiciousTimings:
     """
     A more detailed version used for the main Panchanga dashboard.
-    Unified with calculate_special_times to prevent drift.
+    Derived from the same `DayContext` as calculate_special_times, in `tz_name`.
     """
-    day_duration = sunset - sunrise
-    
-    # Abhijit: 8th Muhurta out of 15
-    muhurta_len = day_duration / 15.0
-    abhijit_start = sunrise + (muhurta_len * 7)
-    abhijit_end = sunrise + (muhurta_len * 8)
-    
-    # Brahma: Approx 96 mins before sunrise (end 48 mins before)
-    brahma_start = sunrise - timedelta(minutes=96)
-    brahma_end = sunrise - timedelta(minutes=48)
-    
-    weekday_idx = sunrise.weekday() # 0=Mon, 6=Sun
-    segment_len = day_duration / 8.0
-    
-    # Sunday is 6 in Python
-    rahu_map = {0: 2, 1: 7, 2: 5, 3: 6, 4: 4, 5: 3, 6: 8}
-    yamaganda_map = {0: 4, 1: 3, 2: 2, 3: 1, 4: 7, 5: 6, 6: 5}
-    gulika_map = {0: 6, 1: 5, 2: 4, 3: 3, 4: 2, 5: 1, 6: 7}
-    
-    def get_seg(seg_num):
-        start = sunrise + (segment_len * (seg_num - 1))
-        end = sunrise + (segment_len * seg_num)
+    def timing(span):
+        start, end = (jd_to_local(jd, tz_name) for jd in span)
         return AuspiciousTiming(start=start.strftime("%I:%M %p"), end=end.strftime("%I:%M %p"))
 
     return AuspiciousTimings(
-        abhijit_muhurta=AuspiciousTiming(start=abhijit_start.strftime("%I:%M %p"), end=abhijit_end.strftime("%I:%M %p")),
-        brahma_muhurta=AuspiciousTiming(start=brahma_start.strftime("%I:%M %p"), end=brahma_end.strftime("%I:%M %p")),
-        rahu_kaal=get_seg(rahu_map[weekday_idx]),
-        yamaganda_kaal=get_seg(yamaganda_map[weekday_idx]),
-        gulika_kaal=get_seg(gulika_map[weekday_idx])
+        abhijit_muhurta=timing(ctx.abhijit()),
+        brahma_muhurta=timing(ctx.brahma_muhurta()),
+        rahu_kaal=timing(ctx.rahu_kalam()),
+        yamaganda_kaal=timing(ctx.yamagandam()),
+        gulika_kaal=timing(ctx.gulika_kalam())
     )
 
 
@@ -1788,13 +1935,10 @@ def get_hindu_calendar_info(target_date: date, p_data: PanchangaExtended) -> Hin
     return HinduCalendar(month=months[m_idx], paksha=p_data.tithi.paksha, year=f"{target_date.year + 57} Vikrama", samvat=f"Vikrama Samvat {target_date.year + 57}")
 
 def get_planetary_positions_small(jd: float, ayanamsa_mode: str) -> dict[str, PlanetaryPositionSmall]:
-    is_tropical = ayanamsa_mode == "SAYANA"
-    flags = swe.FLG_SWIEPH | (0 if is_tropical else swe.FLG_SIDEREAL)
     planets = {}
     for name in ["Sun", "Moon"]:
         pid = PLANET_MAP[name]
-        xx, _ = swe.calc_ut(jd, pid, flags)
-        lon = xx[0]
+        lon = ephemeris.calc_ut(jd, pid, ayanamsa_mode, swe.FLG_SWIEPH)[0]
         sign = get_sign_from_longitude(lon)
         nak, _ = get_nakshatra(lon)
         planets[name.lower()] = PlanetaryPositionSmall(sign=sign, degree=round(lon % 30, 2), nakshatra=nak)
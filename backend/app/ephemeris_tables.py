@@ -0,0 +1,235 @@
+"""
+Precomputed Chebyshev ephemeris tables.
+
+The build step samples Swiss Ephemeris at Chebyshev nodes and stores, for every
+body, piecewise Chebyshev coefficients of tropical longitude (unwrapped),
+latitude and distance in one memory-mapped file (see `utils.mmap_tables`).
+Evaluating a position is then a polynomial evaluation over read-only arrays:
+no Swiss Ephemeris call, no lock, and it vectorizes over many JDs at once.
+
+Build / verify (from backend/, with EPHEME_PATH set):
+    python -m app.ephemeris_tables build [--out PATH] [--start YEAR] [--end YEAR]
+    python -m app.ephemeris_tables report [--samples N]
+
+At runtime the tables are loaded from EPHEMERIS_TABLES (default
+`$EPHEME_PATH/chebyshev.bin`) if the file exists; otherwise, and outside the
+covered range, callers fall back to `swe.calc_ut`.
+"""
+import os
+import sys
+import math
+import time
+import logging
+import argparse
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import swisseph as swe
+
+from .utils.mmap_tables import MappedTables, write_tables
+
+logger = logging.getLogger(__name__)
+
+TABLE_VERSION = 1
+TABLE_FLAGS = swe.FLG_SWIEPH
+
+# body id -> (name, segment length in days, polynomial degree)
+# RMS longitude error against Swiss Ephemeris stays under 0.15" (see `report`).
+# The worst case, a few arcseconds for the outer planets, is set by small jumps
+# in the Swiss Ephemeris data itself, which shorter segments do not remove.
+TABLE_BODIES = {
+    swe.SUN: ("Sun", 16, 12),
+    swe.MOON: ("Moon", 4, 13),
+    swe.MERCURY: ("Mercury", 4, 10),
+    swe.VENUS: ("Venus", 4, 10),
+    swe.MARS: ("Mars", 16, 12),
+    swe.JUPITER: ("Jupiter", 32, 12),
+    swe.SATURN: ("Saturn", 32, 12),
+    swe.URANUS: ("Uranus", 64, 12),
+    swe.NEPTUNE: ("Neptune", 64, 12),
+    swe.PLUTO: ("Pluto", 32, 12),
+    swe.TRUE_NODE: ("Rahu", 4, 13),
+}
+
+DEFAULT_START_YEAR = 1900
+DEFAULT_END_YEAR = 2100
+
+def default_tables_path() -> str:
+    return os.getenv("EPHEMERIS_TABLES") or os.path.join(os.getenv("EPHEME_PATH", "/app/ephemeris"), "chebyshev.bin")
+
+def _chebyshev_nodes(degree: int) -> np.ndarray:
+    k = np.arange(degree + 1)
+    return np.cos(np.pi * (k + 0.5) / (degree + 1))
+
+def build_tables(path: str, start_jd: float, end_jd: float, bodies: Optional[Dict[int, tuple]] = None):
+    """Sample Swiss Ephemeris over [start_jd, end_jd) and write the coefficient file."""
+    bodies = bodies or TABLE_BODIES
+    header = {"version": TABLE_VERSION, "start_jd": start_jd, "end_jd": end_jd, "flags": TABLE_FLAGS, "bodies": {}}
+    arrays = {}
+    for body, (name, seg_days, degree) in bodies.items():
+        started = time.perf_counter()
+        n_seg = math.ceil((end_jd - start_jd) / seg_days)
+        nodes = _chebyshev_nodes(degree)
+        fit = np.linalg.pinv(np.polynomial.chebyshev.chebvander(nodes, degree))
+
+        jds = start_jd + seg_days * (np.arange(n_seg)[:, None] + (nodes[None, :] + 1) / 2)
+        values = np.empty((n_seg, 3, degree + 1))
+        for i in range(n_seg):
+            for k in range(degree + 1):
+                xx, _ = swe.calc_ut(float(jds[i, k]), body, TABLE_FLAGS)
+                values[i, 0, k], values[i, 1, k], values[i, 2, k] = xx[0], xx[1], xx[2]
+        # Unwrap longitude within each segment so the polynomial is smooth
+        values[:, 0, :] = np.degrees(np.unwrap(np.radians(values[:, 0, :]), axis=1))
+
+        key = f"body_{body}"
+        arrays[key] = values @ fit.T
+        header["bodies"][str(body)] = {"name": name, "segment_days": seg_days, "degree": degree, "array": key}
+        logger.info(f"Built {name}: {n_seg} segments in {time.perf_counter() - started:.1f}s")
+
+    write_tables(path, header, arrays)
+
+class ChebyshevEphemeris:
+    """Reader over a table file. Positions are tropical, like `swe.calc_ut(jd, body, FLG_SWIEPH | FLG_SPEED)`."""
+
+    def __init__(self, path: str):
+        self._tables = MappedTables(path)
+        header = self._tables.header
+        self.start_jd = header["start_jd"]
+        self.end_jd = header["end_jd"]
+        self._bodies = {}
+        for body, spec in header["bodies"].items():
+            self._bodies[int(body)] = (spec["segment_days"], spec["degree"], self._tables[spec["array"]])
+
+    def covers(self, jd: float, body: int) -> bool:
+        return body in self._bodies and self.start_jd <= jd < self.end_jd
+
+    def calc(self, jd: float, body: int) -> Optional[Tuple[float, ...]]:
+        """`xx`-shaped tuple for one JD, or None when the tables do not cover it."""
+        if not self.covers(jd, body):
+            return None
+        seg_days, degree, coefs = self._bodies[body]
+        pos = (jd - self.start_jd) / seg_days
+        seg = int(pos)
+        t = 2.0 * (pos - seg) - 1.0
+
+        # Chebyshev T_k(t) and dT_k/dt = k * U_{k-1}(t), summed term by term in
+        # the same order as `calc_array` so both paths give identical results.
+        lon_row, lat_row, dist_row = coefs[seg].tolist()
+        t_prev, t_k = 1.0, t
+        u_prev, u = 1.0, 2.0 * t
+        lon, lat, dist = lon_row[0] + lon_row[1] * t, lat_row[0] + lat_row[1] * t, dist_row[0] + dist_row[1] * t
+        d_lon, d_lat, d_dist = lon_row[1], lat_row[1], dist_row[1]
+        for k in range(2, degree + 1):
+            t_prev, t_k = t_k, 2.0 * t * t_k - t_prev
+            dt_k = k * u
+            u_prev, u = u, 2.0 * t * u - u_prev
+            lon += lon_row[k] * t_k
+            lat += lat_row[k] * t_k
+            dist += dist_row[k] * t_k
+            d_lon += lon_row[k] * dt_k
+            d_lat += lat_row[k] * dt_k
+            d_dist += dist_row[k] * dt_k
+        scale = 2.0 / seg_days
+        return (lon % 360.0, lat, dist, d_lon * scale, d_lat * scale, d_dist * scale)
+
+    def calc_array(self, jds: np.ndarray, body: int) -> Optional[np.ndarray]:
+        """Positions for many JDs as an (n, 6) array, or None if any JD is not covered."""
+        jds = np.asarray(jds, dtype=float)
+        if body not in self._bodies or jds.size == 0:
+            return None
+        if jds.min() < self.start_jd or jds.max() >= self.end_jd:
+            return None
+        seg_days, degree, coefs = self._bodies[body]
+        pos = (jds - self.start_jd) / seg_days
+        seg = pos.astype(np.int64)
+        t = 2.0 * (pos - seg) - 1.0
+
+        c = coefs[seg]  # (n, 3, degree + 1)
+        values = c[:, :, 0] + c[:, :, 1] * t[:, None]
+        rates = c[:, :, 1].copy()
+        t_prev, t_k = np.ones_like(t), t
+        u_prev, u = np.ones_like(t), 2.0 * t
+        for k in range(2, degree + 1):
+            t_prev, t_k = t_k, 2.0 * t * t_k - t_prev
+            dt_k = k * u
+            u_prev, u = u, 2.0 * t * u - u_prev
+            values += c[:, :, k] * t_k[:, None]
+            rates += c[:, :, k] * dt_k[:, None]
+
+        out = np.empty((jds.size, 6))
+        out[:, :3] = values
+        out[:, 3:] = rates * (2.0 / seg_days)
+        out[:, 0] %= 360.0
+        return out
+
+_tables_lock = threading.Lock()
+_tables: Optional[ChebyshevEphemeris] = None
+_tables_loaded = False
+
+def get_tables() -> Optional[ChebyshevEphemeris]:
+    """The process-wide table reader, or None if no table file is installed."""
+    global _tables, _tables_loaded
+    if _tables_loaded:
+        return _tables
+    with _tables_lock:
+        if not _tables_loaded:
+            path = default_tables_path()
+            if os.path.exists(path):
+                try:
+                    _tables = ChebyshevEphemeris(path)
+                    logger.info(f"Loaded ephemeris tables from {path}")
+                except Exception as e:
+                    logger.warning(f"Could not load ephemeris tables {path}: {e}")
+            _tables_loaded = True
+    return _tables
+
+def accuracy_report(tables: ChebyshevEphemeris, samples: int = 2000, seed: int = 0) -> Dict[str, dict]:
+    """Max / RMS differences against `swe.calc_ut` at random JDs (arcseconds, arcseconds/day)."""
+    rng = np.random.default_rng(seed)
+    report = {}
+    for body, (seg_days, degree, _) in tables._bodies.items():
+        jds = rng.uniform(tables.start_jd, tables.end_jd, samples)
+        ours = tables.calc_array(jds, body)
+        ref = np.array([swe.calc_ut(float(jd), body, TABLE_FLAGS | swe.FLG_SPEED)[0] for jd in jds])
+        lon_err = np.abs((ours[:, 0] - ref[:, 0] + 180.0) % 360.0 - 180.0) * 3600
+        lat_err = np.abs(ours[:, 1] - ref[:, 1]) * 3600
+        speed_err = np.abs(ours[:, 3] - ref[:, 3]) * 3600
+        report[TABLE_BODIES.get(body, (str(body),))[0]] = {
+            "segment_days": seg_days,
+            "degree": degree,
+            "lon_max_arcsec": float(lon_err.max()),
+            "lon_rms_arcsec": float(np.sqrt((lon_err ** 2).mean())),
+            "lat_max_arcsec": float(lat_err.max()),
+            "speed_max_arcsec_per_day": float(speed_err.max()),
+        }
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or verify Chebyshev ephemeris tables")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("--out", default=default_tables_path())
+    build.add_argument("--start", type=int, default=DEFAULT_START_YEAR)
+    build.add_argument("--end", type=int, default=DEFAULT_END_YEAR)
+    report = sub.add_parser("report")
+    report.add_argument("--tables", default=default_tables_path())
+    report.add_argument("--samples", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    swe.set_ephe_path(os.getenv("EPHEME_PATH", "/app/ephemeris"))
+
+    if args.command == "build":
+        build_tables(args.out, swe.julday(args.start, 1, 1, 0.0), swe.julday(args.end, 1, 1, 0.0))
+        print(f"Wrote {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB)")
+    else:
+        tables = ChebyshevEphemeris(args.tables)
+        columns = ("seg", "deg", 'lon max"', 'lon rms"', 'lat max"', 'speed max"/d')
+        print("body".ljust(10) + "".join(c.rjust(w) for c, w in zip(columns, (5, 5, 12, 12, 12, 14))))
+        for name, r in accuracy_report(tables, args.samples).items():
+            print(f"{name:<10}{r['segment_days']:>5}{r['degree']:>5}{r['lon_max_arcsec']:>12.5f}"
+                  f"{r['lon_rms_arcsec']:>12.5f}{r['lat_max_arcsec']:>12.5f}{r['speed_max_arcsec_per_day']:>14.4f}")
+
+if __name__ == "__main__":
+    sys.exit(main())
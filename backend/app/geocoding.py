@@ -4,6 +4,7 @@ import requests
 from datetime import datetime
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
+from .services.timezones import timezone_name
 
 load_dotenv()
 
@@ -230,11 +231,9 @@ def _details_nominatim(osm_id: str) -> Optional[Dict]:
         
         # Timezone lookup (since Nominatim doesn't provide it directly usually, unless extratags?)
         # We will use `timezonefinder` which we already have!
-        from timezonefinder import TimezoneFinder
-        tf = TimezoneFinder()
         lat = float(place['lat'])
         lng = float(place['lon'])
-        tz = tf.timezone_at(lng=lng, lat=lat) or 'UTC'
+        tz = timezone_name(lat, lng)
 
         return {
             'place_id': f"nominatim_{osm_id}",
@@ -1,7 +1,9 @@
 import os
 import logging
 from google import genai
+from datetime import date
 from ..models import ChartResponse, BirthDetails
+from ..engine import current_dasha
 
 logger = logging.getLogger(__name__)
 
@@ -191,9 +193,9 @@ class AIService:
                 summary.append(f"- {planet}: {score}")
                 
         if chart.dashas:
-            current_dasha = chart.dashas[0] # Simplification: just taking the first one for context
+            current = current_dasha(chart.dashas, date.today())
             # Handle if dasha is dict or object
-            lord = current_dasha.get('lord') if isinstance(current_dasha, dict) else getattr(current_dasha, 'lord', 'Unknown')
+            lord = current.get('lord') if isinstance(current, dict) else getattr(current, 'lord', 'Unknown')
             summary.append(f"\nCurrent Dasha Cycle: {lord}")
             
         return "\n".join(summary)
@@ -4,6 +4,7 @@ import logging
 import requests
 from typing import Optional, Dict, Any
 from ..models import BirthDetails
+from ..services.timezones import zone_at
 
 logger = logging.getLogger(__name__)
 
@@ -94,12 +95,8 @@ class VedicAstroService:
         # Re-using the logic from get_daily_prediction if needed
         # But let's reuse the tz logic I wrote earlier or simplify
         try:
-           from timezonefinder import TimezoneFinder
-           import pytz
            from datetime import datetime
-           tf = TimezoneFinder()
-           tz_str = tf.timezone_at(lng=details.longitude, lat=details.latitude) or 'UTC'
-           local_tz = pytz.timezone(tz_str)
+           local_tz = zone_at(details.latitude, details.longitude)
            dt = datetime.combine(details.date, details.time)
            offset = local_tz.utcoffset(dt).total_seconds() / 3600.0
            params['tz'] = offset
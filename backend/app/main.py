@@ -2,24 +2,38 @@ from fastapi import FastAPI, HTTPException
 # Reload trigger
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from dotenv import load_dotenv
 
 # Load environment variables first
 load_dotenv()
-from .models import BirthDetails, ChartResponse, PlanetPosition, House, Panchanga, DailyPanchangaRequest, DailyPanchangaResponse, MentorRequest, MentorResponse, InsightsResponse
-from .engine import calculate_chart, get_current_transits, calculate_daily_panchanga_extended, calculate_auspicious_timings_extended, get_hindu_calendar_info, get_planetary_positions_small, get_current_transits_extended
+from .models import BirthDetails, ChartResponse, TransitEvent, TransitEventsResponse, MatchGroupRequest, MatchGroupResponse, MatchProfile, MatchResult, MatchSearchRequest, MatchSearchResponse, DashaAtResponse, DashaLevel, PlanetPosition, House, Panchanga, DailyPanchangaRequest, DailyPanchangaResponse, MentorRequest, MentorResponse, InsightsResponse
+from .engine import calculate_chart, calculate_charts_batch, parse_chart_include, calculate_dasha_tree, datetime_to_jd, jd_to_utc_datetime, calculate_daily_panchanga_extended, calculate_auspicious_timings_extended, get_hindu_calendar_info, get_planetary_positions_small
 from .database import init_db, save_chart, list_charts, delete_chart, SavedChart
 from .integrations.vedic_astro_api import VedicAstroService
 from .utils.timezone_helper import get_local_datetime, get_sunrise_sunset, get_timezone_for_coordinates
+from .services.ephemeris_executor import ephemeris_executor, EphemerisBusyError
+from .services.transit_snapshot import transit_snapshots
+from .transit_events import BODIES, EVENT_TYPES, find_transit_events
+from .services.chart_cache import get_chart
+from .services.day_context import day_context
+from .services.transit_hits import HIT_BODIES, find_transit_hits, load_natal_library, sync_natal, sync_natal_library
+from .services.timezones import get_zone
+from .services.daily_energy import cluster_panchangas, daily_energy_rows, load_energy_cohort, score_cohort
+from .services.matching import DOSHA_STATES, birth_profile, describe, group_matrix, load_match_library, search_matches, select
+import numpy as np
 import logging
 import requests
 import os
-from .routes import auth, daily, panchang_complete
+import threading
+from datetime import date, datetime, timedelta, timezone
+from .routes import auth, daily, panchang_complete, festivals, muhurta, admin
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-from fastapi import Request, Depends
+from fastapi import Request, Depends, Query
+from fastapi.responses import Response, StreamingResponse
+from pydantic_core import to_json
 from sqlalchemy.orm import Session
 from .database import get_db
 
@@ -58,6 +72,9 @@ app.add_middleware(
 app.include_router(auth.router)
 app.include_router(daily.router)
 app.include_router(panchang_complete.router)
+app.include_router(festivals.router)
+app.include_router(muhurta.router)
+app.include_router(admin.router)
 
 # Initialize External Services
 vedic_service = VedicAstroService()
@@ -117,7 +134,7 @@ async def get_daily_panchanga(request: DailyPanchangaRequest):
         import pytz
         
         tz_str = request.timezone_str or "UTC"
-        tz = pytz.timezone(tz_str)
+        tz = get_zone(tz_str)
         
         # Create timezone-aware datetime for the target date's noon (safe middle of day)
         # `get_sunrise_sunset` in engine/utils expects a date or datetime
@@ -130,26 +147,28 @@ async def get_daily_panchanga(request: DailyPanchangaRequest):
         )
         
         # 3. Calculate Panchanga for sunrise time
-        panchanga_data = calculate_daily_panchanga_extended(
+        panchanga_data = await ephemeris_executor.run_async(
+            calculate_daily_panchanga_extended,
             date_val=target_date,
             time_val=sunrise.time(),
             latitude=request.latitude,
             longitude=request.longitude,
-            ayanamsa_mode=request.ayanamsa_mode
+            ayanamsa_mode=request.ayanamsa_mode,
+            jd=datetime_to_jd(sunrise)
         )
         
         # 4. Calculate auspicious timings
         auspicious_timings = calculate_auspicious_timings_extended(
-            sunrise, sunset, request.latitude, request.longitude
+            day_context(target_date, request.latitude, request.longitude),
+            get_timezone_for_coordinates(request.latitude, request.longitude)
         )
         
         # 5. Get Hindu calendar info
         hindu_calendar = get_hindu_calendar_info(target_date, panchanga_data)
         
         # 6. Planet positions
-        # Use Julian Day for sunrise
-        import swisseph as swe
-        jd_sunrise = swe.julday(sunrise.year, sunrise.month, sunrise.day, sunrise.hour + sunrise.minute/60.0 + sunrise.second/3600.0)
+        # Use Julian Day (UT) for sunrise
+        jd_sunrise = datetime_to_jd(sunrise)
         planetary_positions = get_planetary_positions_small(jd_sunrise, request.ayanamsa_mode)
         
         return DailyPanchangaResponse(
@@ -172,13 +191,29 @@ async def get_daily_panchanga(request: DailyPanchangaRequest):
             planetary_positions=planetary_positions
         )
         
+    except EphemerisBusyError:
+        raise
     except Exception as e:
         logger.error(f"Daily Panchanga error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sync_natal_library():
+    try:
+        sync_natal_library()
+    except Exception as e:
+        logger.error(f"Natal points sync failed: {e}", exc_info=True)
+
 @app.on_event("startup")
 async def startup_event():
     init_db()
+    transit_snapshots.start()
+    # Catch up on charts written while the app was down, without delaying startup
+    threading.Thread(target=_sync_natal_library, name="natal-sync", daemon=True).start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await transit_snapshots.stop()
+    ephemeris_executor.shutdown()
 
 
 
@@ -250,55 +285,173 @@ def health_check():
         "message": "Vedic Astrology API is operational"
     }
 
-from .engine import calculate_chart, get_current_transits, get_current_transits_extended
-        
+def _transit_response(request: Request, document, expires: datetime) -> Response:
+    max_age = max(0, int((expires - datetime.now(timezone.utc)).total_seconds()))
+    headers = {"ETag": document.etag, "Cache-Control": f"public, max-age={max_age}"}
+    if document.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(document.body, media_type="application/json", headers=headers)
+
 @app.get("/api/transits/current", tags=["Tools"])
-def get_current_transits_endpoint():
-    """Get current real-time planetary positions."""
-    return get_current_transits()
+def get_current_transits_endpoint(request: Request):
+    """Get current planetary positions (shared snapshot, refreshed every TRANSIT_REFRESH_SECONDS)."""
+    snapshot = transit_snapshots.get()
+    return _transit_response(request, snapshot.current, snapshot.expires)
 
 @app.get("/api/transits/current/extended", tags=["Tools"])
-def get_extended_transits_endpoint():
+def get_extended_transits_endpoint(request: Request):
     """
     Get current transits including outer planets and special points.
-    Updates every 5 minutes.
+    Served from the shared snapshot; `next_update` is the end of its time bucket.
     """
     try:
-        from datetime import datetime, timedelta
-        transits = get_current_transits_extended()
-        return {
-            "timestamp": datetime.utcnow().isoformat(),
-            "bodies": transits,
-            "next_update": (datetime.utcnow() + timedelta(minutes=5)).isoformat()
-        }
+        snapshot = transit_snapshots.get()
     except Exception as e:
+        if isinstance(e, EphemerisBusyError):
+            raise
         logger.error(f"Extended transits error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+    return _transit_response(request, snapshot.extended, snapshot.expires)
+
+
+MAX_TRANSIT_EVENT_DAYS = int(os.getenv("MAX_TRANSIT_EVENT_DAYS", "7306"))
+
+def _parse_names(value: Optional[str], allowed: tuple, what: str) -> tuple:
+    if not value:
+        return allowed
+    lookup = {name.lower(): name for name in allowed}
+    names = [n.strip() for n in value.split(",") if n.strip()]
+    unknown = [n for n in names if n.lower() not in lookup]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown {what}: {', '.join(unknown)} (expected {', '.join(allowed)})")
+    return tuple(lookup[n.lower()] for n in names)
+
+@app.get("/api/transits/events", response_model=TransitEventsResponse, tags=["Tools"])
+@limiter.limit("30/minute")
+def get_transit_events(
+    request: Request,
+    from_date: date = Query(..., alias="from", description="First date (YYYY-MM-DD, UTC)"),
+    to_date: date = Query(..., alias="to", description="Last date (YYYY-MM-DD, UTC), inclusive"),
+    bodies: Optional[str] = Query(None, description="Comma-separated bodies, e.g. Mercury,Venus (default all)"),
+    types: Optional[str] = Query(None, description="Comma-separated: sign_ingress,nakshatra_ingress,station,combustion (default all)"),
+    ayanamsa_mode: str = Query("LAHIRI", description="Ayanamsa")
+):
+    """
+    Sign and nakshatra ingresses, retrograde/direct stations and combustion
+    windows between two dates, sorted by time.
+    """
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (to_date - from_date).days + 1 > MAX_TRANSIT_EVENT_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range limited to {MAX_TRANSIT_EVENT_DAYS} days")
+    body_names = _parse_names(bodies, BODIES, "body")
+    type_names = _parse_names(types, EVENT_TYPES, "event type")
+
+    start = datetime(from_date.year, from_date.month, from_date.day, tzinfo=timezone.utc)
+    end = datetime(to_date.year, to_date.month, to_date.day, tzinfo=timezone.utc) + timedelta(days=1)
+    found = ephemeris_executor.run(find_transit_events, datetime_to_jd(start), datetime_to_jd(end),
+                                   body_names, type_names, ayanamsa_mode)
+
+    def moment(jd):
+        return jd_to_utc_datetime(jd) if jd is not None else None
+
+    events = [
+        TransitEvent(
+            type=e["type"],
+            body=e["body"],
+            time=jd_to_utc_datetime(e["jd"]),
+            sign=e.get("sign"),
+            nakshatra=e.get("nakshatra"),
+            direction=e.get("direction"),
+            start=moment(e.get("start_jd")),
+            end=moment(e.get("end_jd")),
+        )
+        for e in found
+    ]
+    return TransitEventsResponse(start=from_date, end=to_date, ayanamsa_mode=ayanamsa_mode, events=events)
 
 
 
 @app.post("/chart", response_model=ChartResponse, tags=["Charts"])
 @limiter.limit("20/minute")
-def create_chart(request: Request, details: BirthDetails, db: Session = Depends(get_db)):
+def create_chart(
+    request: Request,
+    details: BirthDetails,
+    include: Optional[str] = Query(None, description="Sections to compute, e.g. planets,houses,vargas:D1,D9,dashas"),
+    db: Session = Depends(get_db)
+):
     """
     Calculate Vedic Chart with high precision.
     Includes rate limiting to prevent abuse.
+    With `include`, only the listed sections are computed and serialized.
     """
     try:
-        # Check cache/database first
-        # ... logic ...
-        
-        # Calculate fresh
-        chart = calculate_chart(details)
+        sections = parse_chart_include(include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        # Served from the chart cache when the same birth data was seen recently
+        chart = get_chart(details, sections)
         
         # Save to DB
         # ... logic ...
         
+        if sections is not None:
+            # Leave the skipped sections out of the body instead of sending nulls
+            return Response(chart.model_dump_json(include=sections.response_fields()), media_type="application/json")
         return chart
+    except EphemerisBusyError:
+        raise
     except Exception as e:
         logger.error(f"Chart calculation error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/chart/dasha", response_model=DashaAtResponse, tags=["Charts"])
+@limiter.limit("60/minute")
+def get_dasha_at(
+    request: Request,
+    details: BirthDetails = Depends(),
+    at: Optional[datetime] = Query(None, description="Moment to query (ISO 8601, naive = UTC); default now"),
+    depth: int = Query(3, ge=1, le=5, description="1 = Mahadasha ... 5 = Prana")
+):
+    """
+    Running Vimshottari periods at a moment, from Mahadasha down to `depth`.
+    Birth details are passed as query parameters (date, time, latitude, longitude, ...).
+    """
+    at = at or datetime.now(timezone.utc)
+    tree = calculate_dasha_tree(details)
+    periods = [
+        DashaLevel(
+            level=node.level,
+            lord=node.lord,
+            lords=node.label,
+            start=jd_to_utc_datetime(node.start_jd),
+            end=jd_to_utc_datetime(node.end_jd),
+            duration=node.years
+        )
+        for node in tree.dasha_at(datetime_to_jd(at), depth)
+    ]
+    return DashaAtResponse(at=at, periods=periods)
+
+MAX_BATCH_CHARTS = int(os.getenv("MAX_BATCH_CHARTS", "5000"))
+
+@app.post("/charts/batch", tags=["Charts"])
+@limiter.limit("5/minute")
+def create_charts_batch(request: Request, details_list: List[BirthDetails]):
+    """
+    Calculate many charts in one request.
+    Results are streamed back as NDJSON, one chart per line in input order.
+    """
+    if len(details_list) > MAX_BATCH_CHARTS:
+        raise HTTPException(status_code=413, detail=f"Batch size limited to {MAX_BATCH_CHARTS} charts")
+
+    def generate():
+        for result in calculate_charts_batch(details_list):
+            yield to_json(result) + b"\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 @app.post("/insights/generate", response_model=InsightsResponse, tags=["Insights"])
 @limiter.limit("5/hour")
 def generate_insights(request: Request, details: BirthDetails):
@@ -308,7 +461,7 @@ def generate_insights(request: Request, details: BirthDetails):
     """
     try:
         # 1. Calculate the chart first (AI service needs planetary positions)
-        chart = calculate_chart(details)
+        chart = get_chart(details, parse_chart_include("planets,mandhi,strengths,dashas"))
         
         # 2. Generate insights using the chart context
         insights_dict = ai_service.generate_core_insights(chart, details)
@@ -352,6 +505,14 @@ async def ask_mentor(request: Request, body: MentorRequest):
 from fastapi.responses import JSONResponse
 
 # Error handlers
+@app.exception_handler(EphemerisBusyError)
+async def ephemeris_busy_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"}
+    )
+
 @app.exception_handler(ValueError)
 async def value_error_handler(request, exc):
     return JSONResponse(
@@ -364,7 +525,7 @@ class SaveChartRequest(BaseModel):
     details: BirthDetails
 
 @app.post("/charts/save")
-def save_chart_endpoint(req: SaveChartRequest):
+def save_chart_endpoint(req: SaveChartRequest, db: Session = Depends(get_db)):
     try:
         result = save_chart(
             req.name,
@@ -378,6 +539,11 @@ def save_chart_endpoint(req: SaveChartRequest):
             req.details.location_country,
             req.details.location_timezone
         )
+        try:
+            sync_natal(db, [result["id"]])
+        except Exception as e:
+            # The chart is saved; its natal points are picked up by the next full sync
+            logger.warning(f"Natal points of chart {result['id']} not synced: {e}")
         return {
             "status": "success", 
             "message": f"Chart {result['action']} successfully",
@@ -391,6 +557,116 @@ def save_chart_endpoint(req: SaveChartRequest):
 def get_charts():
     return list_charts()
 
+MAX_TRANSIT_HIT_DAYS = int(os.getenv("MAX_TRANSIT_HIT_DAYS", "1827"))
+
+@app.get("/charts/transit-hits", tags=["Charts"])
+@limiter.limit("10/minute")
+def get_transit_hits(
+    request: Request,
+    from_date: date = Query(..., alias="from", description="First date (YYYY-MM-DD, UTC)"),
+    to_date: date = Query(..., alias="to", description="Last date (YYYY-MM-DD, UTC), inclusive"),
+    bodies: Optional[str] = Query(None, description="Comma-separated transiting bodies: Jupiter,Saturn,Rahu,Ketu (default all)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Saved charts that get a transit hit in the window: Jupiter, Saturn, Rahu or
+    Ketu conjoining the natal Moon or ascendant, and Saturn returns.
+    Streamed as NDJSON, one hit per line in time order.
+    """
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (to_date - from_date).days + 1 > MAX_TRANSIT_HIT_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range limited to {MAX_TRANSIT_HIT_DAYS} days")
+    body_names = _parse_names(bodies, HIT_BODIES, "body")
+
+    library = load_natal_library(db)
+    start = datetime(from_date.year, from_date.month, from_date.day, tzinfo=timezone.utc)
+    end = datetime(to_date.year, to_date.month, to_date.day, tzinfo=timezone.utc) + timedelta(days=1)
+    hits = ephemeris_executor.run(find_transit_hits, library, datetime_to_jd(start), datetime_to_jd(end), body_names)
+
+    def generate():
+        for hit in hits:
+            hit["time"] = jd_to_utc_datetime(hit["jd"])
+            yield to_json(hit) + b"\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@app.get("/charts/daily-energy", tags=["Charts"])
+@limiter.limit("10/minute")
+def get_daily_energy_batch(
+    request: Request,
+    on: date = Query(..., alias="date", description="Day to score (YYYY-MM-DD)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Daily Energy Score of every saved chart for `date`, with the panchanga of
+    each chart's birth location (as /daily/mentor uses it). Streamed as NDJSON,
+    one chart per line; the vibe and theme texts are left to the per-user endpoint.
+    """
+    cohort = load_energy_cohort(db)
+    panchangas = ephemeris_executor.run(cluster_panchangas, cohort, on)
+    scores = score_cohort(cohort, on, panchangas)
+
+    def generate():
+        for row in daily_energy_rows(cohort, scores):
+            yield to_json(row) + b"\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+MAX_MATCH_GROUP = int(os.getenv("MAX_MATCH_GROUP", "200"))
+
+@app.post("/match/search", response_model=MatchSearchResponse, tags=["Charts"])
+@limiter.limit("30/minute")
+def match_search(request: Request, body: MatchSearchRequest, db: Session = Depends(get_db)):
+    """
+    Ashtakoota (Guna Milan) scores of a saved chart, or of `birth`, against the
+    saved chart library (or `candidate_ids`), best first, with the koota
+    breakdown and the pair's Mangal dosha state.
+    """
+    if (body.chart_id is None) == (body.birth is None):
+        raise HTTPException(status_code=400, detail="Give exactly one of 'chart_id' and 'birth'")
+    library = load_match_library(db)
+    if body.chart_id is not None:
+        found = np.flatnonzero(library.chart_ids == body.chart_id)
+        if found.size == 0:
+            raise HTTPException(status_code=404, detail="Chart not found")
+        seeker = select(library, found)
+    else:
+        try:
+            seeker = ephemeris_executor.run(birth_profile, body.birth)
+        except EphemerisBusyError:
+            raise
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    candidates = library
+    if body.candidate_ids is not None:
+        candidates = select(library, np.flatnonzero(np.isin(library.chart_ids, body.candidate_ids)))
+
+    matches = search_matches(seeker, body.role, candidates, body.min_score, body.exclude_mangal_dosha, body.limit)
+    return MatchSearchResponse(seeker=MatchProfile(**describe(seeker, 0)), role=body.role,
+                               candidates=int(candidates.chart_ids.size),
+                               matches=[MatchResult(**m) for m in matches])
+
+@app.post("/match/group", response_model=MatchGroupResponse, tags=["Charts"])
+@limiter.limit("30/minute")
+def match_group(request: Request, body: MatchGroupRequest, db: Session = Depends(get_db)):
+    """Scores of every pair in a group of saved charts: row = groom, column = bride."""
+    chart_ids = list(dict.fromkeys(body.chart_ids))
+    if len(chart_ids) > MAX_MATCH_GROUP:
+        raise HTTPException(status_code=400, detail=f"Group limited to {MAX_MATCH_GROUP} charts")
+    library = load_match_library(db)
+    position = {chart_id: i for i, chart_id in enumerate(library.chart_ids.tolist())}
+    missing = [c for c in chart_ids if c not in position]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Charts not found: {', '.join(map(str, missing))}")
+    group = select(library, [position[c] for c in chart_ids])
+    matrix = group_matrix(group)
+    return MatchGroupResponse(
+        charts=[MatchProfile(**describe(group, i)) for i in range(len(chart_ids))],
+        scores=[[None if np.isnan(s) else s for s in row] for row in matrix["scores"].tolist()],
+        mangal_dosha=[[None if s < 0 else DOSHA_STATES[s] for s in row] for row in matrix["mangal_dosha"].tolist()],
+    )
+
 @app.delete("/charts/{chart_id}")
 def delete_chart_endpoint(chart_id: int):
     try:
@@ -1,6 +1,6 @@
 import datetime
 from pydantic import BaseModel, Field
-from typing import List, Optional, Any
+from typing import Dict, List, Literal, Optional, Any
 from enum import Enum
 
 class AyanamsaMode(str, Enum):
@@ -96,12 +96,76 @@ class DashaPeriod(BaseModel):
     start_date: Optional[datetime.date] = None
     end_date: Optional[datetime.date] = None
 
+class DashaLevel(BaseModel):
+    level: str = Field(..., description="Mahadasha, Antardasha, Pratyantardasha, Sookshma or Prana")
+    lord: str
+    lords: str = Field(..., description="Lords from Mahadasha down, e.g. Jupiter-Saturn-Mercury")
+    start: datetime.datetime
+    end: datetime.datetime
+    duration: float = Field(..., description="Duration in years")
+
+class DashaAtResponse(BaseModel):
+    at: datetime.datetime
+    periods: List[DashaLevel]
+
+class TransitEvent(BaseModel):
+    type: str = Field(..., description="sign_ingress, nakshatra_ingress, station or combustion")
+    body: str
+    time: datetime.datetime = Field(..., description="UTC; for combustion, the start of the window (or of the range)")
+    sign: Optional[str] = None
+    nakshatra: Optional[str] = None
+    direction: Optional[str] = Field(None, description="retrograde or direct (stations)")
+    start: Optional[datetime.datetime] = Field(None, description="Combustion start; None if before the range")
+    end: Optional[datetime.datetime] = Field(None, description="Combustion end; None if after the range")
+
+class TransitEventsResponse(BaseModel):
+    start: datetime.date
+    end: datetime.date
+    ayanamsa_mode: str
+    events: List[TransitEvent]
+
+class MatchProfile(BaseModel):
+    chart_id: Optional[int] = None
+    name: Optional[str] = None
+    nakshatra: str = Field(..., description="Moon nakshatra")
+    moon_sign: str
+    manglik: bool = Field(..., description="Mars in the 1st, 2nd, 4th, 7th, 8th or 12th from the ascendant or Moon")
+
+class MatchResult(MatchProfile):
+    score: float = Field(..., description="Guna score out of 36")
+    kootas: Dict[str, float]
+    mangal_dosha: str = Field(..., description="none, cancelled or present")
+
+class MatchSearchRequest(BaseModel):
+    chart_id: Optional[int] = Field(None, description="Saved chart to match; or give `birth`")
+    birth: Optional[BirthDetails] = None
+    role: Literal["groom", "bride"] = Field(..., description="Role of the seeker; candidates take the other")
+    candidate_ids: Optional[List[int]] = Field(None, description="Saved charts to consider (default: all)")
+    min_score: float = Field(0.0, ge=0, le=36)
+    exclude_mangal_dosha: bool = Field(False, description="Drop pairs with an uncancelled Mangal dosha")
+    limit: int = Field(100, ge=1, le=1000)
+
+class MatchSearchResponse(BaseModel):
+    seeker: MatchProfile
+    role: str
+    candidates: int = Field(..., description="Candidates scored")
+    matches: List[MatchResult]
+
+class MatchGroupRequest(BaseModel):
+    chart_ids: List[int] = Field(..., min_length=2)
+
+class MatchGroupResponse(BaseModel):
+    charts: List[MatchProfile]
+    scores: List[List[Optional[float]]] = Field(..., description="[groom][bride] guna scores, in `charts` order; null on the diagonal")
+    mangal_dosha: List[List[Optional[str]]]
+
 class ChartResponse(BaseModel):
     ascendant: float
     ascendant_sign: str
-    planets: List[PlanetPosition]
-    houses: List[House]
-    dashas: List[DashaPeriod]
+    # Sections left out via include= are None
+    planets: Optional[List[PlanetPosition]] = None
+    houses: Optional[List[House]] = None
+    dashas: Optional[List[DashaPeriod]] = None
     panchanga: Optional[Panchanga] = None
     special_times: Optional[List[SpecialTime]] = None
     ayanamsa: Optional[float] = None
@@ -145,6 +209,12 @@ class Hora(BaseModel):
     quality: str # "Good", "Average", "Bad" (or specific energy)
     color: Optional[str] = None
     activity_suggestion: Optional[str] = None
+    start_jd: Optional[float] = None # Julian Day (UT)
+    end_jd: Optional[float] = None
+
+class CurrentHora(Hora):
+    next_change_at: datetime.datetime
+    next_ruler: str
 
 class DailyTimeline(BaseModel):
     date: str
@@ -152,6 +222,8 @@ class DailyTimeline(BaseModel):
     sunrise: str
     sunset: str
     horas: List[Hora]
+    # All 12 night Horas of the previous Vedic day, from the previous sunset until this sunrise
+    previous_night_horas: Optional[List[Hora]] = None
 
 
 
@@ -183,6 +255,9 @@ class TithiDataExtended(BaseModel):
     paksha: str
     completion: float
     end_time: str
+    start_time: Optional[str] = None
+    start_jd: Optional[float] = None # Julian Day (UT)
+    end_jd: Optional[float] = None
 
 class NakshatraDataExtended(BaseModel):
     name: str
@@ -191,16 +266,25 @@ class NakshatraDataExtended(BaseModel):
     lord: str
     completion: float
     end_time: str
+    start_time: Optional[str] = None
+    start_jd: Optional[float] = None
+    end_jd: Optional[float] = None
 
 class YogaDataExtended(BaseModel):
     name: str
     number: int
     end_time: str
+    start_time: Optional[str] = None
+    start_jd: Optional[float] = None
+    end_jd: Optional[float] = None
 
 class KaranaDataExtended(BaseModel):
     name: str
     number: int
     end_time: str
+    start_time: Optional[str] = None
+    start_jd: Optional[float] = None
+    end_jd: Optional[float] = None
 
 class VaraData(BaseModel):
     name: str
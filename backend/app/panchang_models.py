@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict
-from datetime import datetime
+from datetime import date, datetime
 
 class TimeRange(BaseModel):
     start: str
@@ -41,6 +41,16 @@ class GowriPanchangam(BaseModel):
     day_periods: List[GowriPeriod]
     night_periods: List[GowriPeriod]
 
+class ChoghadiyaPeriod(BaseModel):
+    name: str  # Amrit, Shubh, Labh, Char, Udveg, Kaal, Rog
+    quality: str  # "Good", "Neutral" or "Bad"
+    start_time: str
+    end_time: str
+
+class Choghadiya(BaseModel):
+    day_periods: List[ChoghadiyaPeriod]
+    night_periods: List[ChoghadiyaPeriod]
+
 class VaaraSoolai(BaseModel):
     direction: str  # "West", "East", etc.
     remedy: str  # "Jaggery", etc.
@@ -117,3 +127,51 @@ class CompletePanchangResponse(BaseModel):
     
     # Gowri Panchangam
     gowri_panchangam: GowriPanchangam
+    choghadiya: Optional[Choghadiya] = None
+
+class FestivalDate(BaseModel):
+    name: str
+    category: str  # "vrata" or "festival"
+    date: str  # ISO date of observance
+    window: str  # part of the day the tithi/nakshatra must cover ("sunrise", "pradosh", ...)
+    tithi: Optional[str] = None
+    nakshatra: Optional[str] = None
+    lunar_month: Optional[str] = None  # Amanta month
+    adhika: Optional[bool] = None
+    start: str  # Local ISO time the tithi/nakshatra begins
+    end: str
+
+class FestivalsResponse(BaseModel):
+    year: int
+    latitude: float
+    longitude: float
+    timezone: str
+    festivals: List[FestivalDate]
+
+class MuhurtaSearchRequest(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    query: str = Field(..., description="Constraint expression, e.g. \"weekday in (Mon, Thu) and hora = Jupiter and not rahu_kalam\"")
+    start: date = Field(..., alias="from", description="First day (YYYY-MM-DD); the search starts at its sunrise")
+    end: date = Field(..., alias="to", description="Last day (YYYY-MM-DD), inclusive; the search ends at the next sunrise")
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    timezone: Optional[str] = Field(None, description="Timezone for local times (default: zone at the location)")
+    ayanamsa_mode: str = "LAHIRI"
+    min_duration_minutes: float = Field(0.0, ge=0)
+    limit: int = Field(1000, ge=1, le=10000, description="Max windows returned")
+
+class MuhurtaWindow(BaseModel):
+    start: str  # Local ISO time
+    end: str
+    duration_minutes: float
+
+class MuhurtaSearchResponse(BaseModel):
+    query: str
+    start: date
+    end: date
+    latitude: float
+    longitude: float
+    timezone: str
+    truncated: bool  # more windows matched than `limit`
+    windows: List[MuhurtaWindow]
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from typing import Optional
+import os
+
+from ..services.chart_cache import chart_cache
+from ..services import day_context, lunar_events, solar_events, timezones
+from ..services.transit_hits import sync_natal_library
+from ..services.transit_snapshot import transit_snapshots
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+ADMIN_OPEN = os.getenv("ADMIN_OPEN", "false").lower() == "true"
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    # Closed unless a token is configured, or ADMIN_OPEN=true for local development
+    if ADMIN_OPEN:
+        return
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)]
+)
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    """Cache sizes, hit ratios and eviction counts."""
+    return {
+        "chart_cache": chart_cache.stats(),
+        "solar_events": solar_events.cache_stats(),
+        "lunar_events": lunar_events.cache_stats(),
+        "day_context": day_context.cache_stats(),
+        "timezones": timezones.cache_stats(),
+        "transits": transit_snapshots.stats(),
+    }
+
+@router.post("/cache/clear")
+def clear_cache():
+    chart_cache.clear()
+    return {"status": "cleared"}
+
+@router.post("/natal/sync")
+def sync_natal_points():
+    """Recompute stale `chart_natal` rows, e.g. after charts were written outside the API."""
+    return {"computed": sync_natal_library()}
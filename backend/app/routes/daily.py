@@ -3,9 +3,12 @@ from sqlalchemy.orm import Session
 from .. import models, database, engine, advisor
 from ..database import get_db
 from ..models import BirthDetails
+from ..services.ephemeris_executor import ephemeris_executor, EphemerisBusyError
+from ..services.chart_cache import get_chart
+from ..services.daily_energy import load_natal_core
+from ..utils.local_time import jd_to_local
 from typing import Optional
-from datetime import date, datetime
-import pytz
+from datetime import date, datetime, timezone
 
 
 router = APIRouter(
@@ -15,9 +18,11 @@ router = APIRouter(
 
 @router.post("/mentor", response_model=dict)
 def get_daily_mentor(
-    birth_details: models.BirthDetails,
+    birth_details: Optional[models.BirthDetails] = None,
     current_date: str = Query(..., description="YYYY-MM-DD"),
-    timezone_str: str = Query("UTC")
+    timezone_str: Optional[str] = Query(None, description="Timezone ID (default: the saved chart's, else UTC)"),
+    chart_id: Optional[int] = Query(None, description="Saved chart to use instead of `birth_details`"),
+    db: Session = Depends(get_db)
 ):
     """
     Get comprehensive Daily Mentor guidance:
@@ -25,33 +30,43 @@ def get_daily_mentor(
     - Daily Theme
     - Full Hora Timeline
     - Life Area Advice
+
+    Pass either `birth_details` or the `chart_id` of a saved chart; a saved
+    chart's natal core is read from the database, so only the day-specific
+    work is done.
     """
+    if (chart_id is None) == (birth_details is None):
+        raise HTTPException(status_code=400, detail="Give exactly one of 'birth_details' and 'chart_id'")
+    core = None
+    if chart_id is not None:
+        core = load_natal_core(db, chart_id)
+        if core is None:
+            raise HTTPException(status_code=404, detail="Chart not found")
+        if core.moon is None or core.ascendant is None:
+            raise HTTPException(status_code=400, detail="Saved chart has unusable birth data")
+
     try:
-        # 1. Calculate Chart & Panchanga
-        # We need the Chart to get Moon/Ascendant
-        chart = engine.calculate_chart(birth_details)
-        
-        # 2. Get Panchanga for Current Date (Current Location)
-        # Note: Panchanga depends on Current Location (User's current GPS), not Birth Location.
-        # But `birth_details` has birth loc. 
-        # Ideally we pass `current_location` separately. 
-        # For MVP: Use Birth Location if Current not provided? 
-        # Let's assume user is broadly in same timezone or pass params.
-        # Actually, let's use the birth_details.latitude/longitude for now (Transit to Natal)
-        # OR better: Add `current_latitude` params.
-        # Sticking to valid MVP: Use Birth Lat/Lon for now (Chart-centric)
-        
         current_dt = date.fromisoformat(current_date)
-        # 3. Calculate Energy Score
-        # USE NEW WRAPPER
-        panchang = engine.calculate_daily_panchanga(
-            current_dt, 
-            birth_details.latitude, 
-            birth_details.longitude, 
-            timezone_str
-        )
-        
-        energy = advisor.calculate_daily_energy(chart, current_dt, panchang)
+
+        # Panchanga, horas and special times use the birth location (chart-centric MVP)
+        if core is not None:
+            latitude, longitude = core.latitude, core.longitude
+            timezone_str = timezone_str or core.timezone or "UTC"
+        else:
+            latitude, longitude = birth_details.latitude, birth_details.longitude
+            timezone_str = timezone_str or "UTC"
+
+        panchang = engine.calculate_daily_panchanga(current_dt, latitude, longitude, timezone_str)
+
+        # Energy Score: a saved chart needs only its natal core; otherwise the
+        # (cached) chart provides the Moon, ascendant and dashas
+        if core is not None:
+            energy = advisor.calculate_daily_energy_from_natal(
+                core.moon_nakshatra, core.ascendant_sign, core.mahadasha_lord(current_dt), panchang
+            )
+        else:
+            chart = get_chart(birth_details, engine.parse_chart_include("planets,dashas"))
+            energy = advisor.calculate_daily_energy(chart, current_dt, panchang)
         
         # 4. Generate AI Vibe & Theme
         # Prepare context
@@ -72,18 +87,19 @@ def get_daily_mentor(
         theme = ai_data.get('theme', "Embrace the cosmic energy today.")
         
         # 5. Get Hora Timeline
-        timeline = engine.calculate_horas(
+        timeline = ephemeris_executor.run(
+            engine.calculate_horas,
             current_dt, 
-            birth_details.latitude, 
-            birth_details.longitude, 
+            latitude, 
+            longitude, 
             timezone_str
         )
         
         # 6. Get Special Times (Rahu, Abhijit, etc.)
         special_times = engine.calculate_special_times(
             current_dt, 
-            birth_details.latitude, 
-            birth_details.longitude, 
+            latitude, 
+            longitude, 
             timezone_str
         )
         
@@ -102,6 +118,8 @@ def get_daily_mentor(
             }
         }
         
+    except EphemerisBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -114,69 +132,36 @@ def get_daily_horas(
 ):
     try:
         d = date.fromisoformat(date_str)
-        timeline = engine.calculate_horas(d, lat, lon, timezone_str)
+        timeline = ephemeris_executor.run(engine.calculate_horas, d, lat, lon, timezone_str)
         return timeline
+    except EphemerisBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/current", response_model=models.Hora)
+@router.get("/current", response_model=models.CurrentHora)
 def get_current_hora(
     lat: float = Query(..., ge=-90, le=90),
     lon: float = Query(..., ge=-180, le=180),
     timezone_str: str = Query("UTC")
 ):
     """
-    Get the specific Hora active RIGHT NOW at the provided location.
+    Get the specific Hora active RIGHT NOW at the provided location,
+    and when the next one starts.
     """
     try:
-        # 1. Get current time in target timezone
-        tz = pytz.timezone(timezone_str)
-        now_local = datetime.now(tz)
-        today_date = now_local.date()
-        
-        # 2. Calculate full timeline for "Today"
-        # Edge case: If it's early morning before sunrise, "Vedic Today" might be "Civil Yesterday"
-        # But `calculate_horas` uses the Civil Date's sunrise.
-        # If now < sunrise, we are technically in the "Night" of the previous Vedic Day.
-        # But visually, users expect to see the timeline for the Civil Day they are in.
-        # However, the Hora belongs to the PREVIOUS sequence if now < sunrise.
-        # Let's just calculate for the civil date first.
-        
-        timeline = engine.calculate_horas(today_date, lat, lon, timezone_str)
-        
-        # 3. Find which hora defines the current time
-        # Timestamps in timeline are strings formatted "HH:MM AM YYYY-MM-DD"?
-        # Re-parsing is expensive.
-        # Ideally `engine` returns objects with datetime/float attributes.
-        # For MVP, let's parse or improve engine return types later.
-        
-        # Quick check: Compare current time comparable string?
-        # Or better: `calculate_horas` returns objects. 
-        # But `Hora` model has string fields. 
-        # Let's parse string back to datetime for comparison.
-        
-        # Format "HH:MM AM YYYY-MM-DD" is what `convert_utc_to_local` returns?
-        # "06:30 AM 2024-01-01"
-        
-        target_dt = now_local.replace(second=0, microsecond=0)
-        
-        for h in timeline.horas:
-            # Parse start/end
-            # Format: "%I:%M %p %Y-%m-%d"
-            fmt = "%I:%M %p %Y-%m-%d"
-            start_dt = datetime.strptime(h.start_time, fmt)
-            end_dt = datetime.strptime(h.end_time, fmt)
-            
-            # Localize naive parse result
-            start_dt = tz.localize(start_dt)
-            end_dt = tz.localize(end_dt)
-            
-            if start_dt <= target_dt < end_dt:
-                return h
-                
-        # If not found (e.g. exact second overlap issues or next day boundary?), return 404
-        # Could be we are past the last hora of 'today'? (Next sunrise happened?)
-        return timeline.horas[0] # Fallback
+        # Hora boundaries are cached per location-day; before sunrise the
+        # previous day's night horas apply.
+        now_jd = engine.datetime_to_jd(datetime.now(timezone.utc))
+        current, following = ephemeris_executor.run(engine.hora_at, now_jd, lat, lon)
+        hora = engine.hora_models([current], timezone_str)[0]
+        return models.CurrentHora(
+            **hora.model_dump(),
+            next_change_at=jd_to_local(following.start_jd, timezone_str),
+            next_ruler=following.ruler
+        )
         
+    except EphemerisBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
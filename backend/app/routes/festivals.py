@@ -0,0 +1,46 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+import pytz
+
+from ..panchang_models import FestivalDate, FestivalsResponse
+from ..services.festivals import festival_dates
+from ..services.ephemeris_executor import ephemeris_executor, EphemerisBusyError
+from ..services.timezones import get_zone, timezone_name
+from ..utils.local_time import jd_to_local
+
+router = APIRouter(prefix="/api/festivals", tags=["Panchang"])
+
+@router.get("", response_model=FestivalsResponse)
+async def get_festivals(
+    year: int = Query(..., ge=1900, le=2100, description="Gregorian year"),
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude"),
+    tz: Optional[str] = Query(None, description="Timezone for local times (default: zone at the location)"),
+    ayanamsa_mode: str = Query("LAHIRI", description="Ayanamsa")
+):
+    """
+    Ekadashi, Pradosham, Sankashti, Amavasya, Purnima, Shivaratri and major
+    festival dates observed at the location in `year`.
+    """
+    tz = tz or timezone_name(lat, lon)
+    try:
+        get_zone(tz)
+    except pytz.UnknownTimeZoneError:
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {tz}")
+
+    try:
+        dates = await ephemeris_executor.run_async(festival_dates, year, lat, lon, ayanamsa_mode)
+    except EphemerisBusyError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Festival calculation failed: {str(e)}")
+
+    def local(jd: float) -> str:
+        return jd_to_local(jd, tz).replace(microsecond=0).isoformat()
+
+    festivals = [
+        FestivalDate(**{k: v for k, v in f.items() if k not in ("start_jd", "end_jd")},
+                     start=local(f["start_jd"]), end=local(f["end_jd"]))
+        for f in dates
+    ]
+    return FestivalsResponse(year=year, latitude=lat, longitude=lon, timezone=tz, festivals=festivals)
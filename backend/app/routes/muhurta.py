@@ -0,0 +1,56 @@
+from fastapi import APIRouter, HTTPException
+import os
+import pytz
+
+from ..panchang_models import MuhurtaSearchRequest, MuhurtaSearchResponse, MuhurtaWindow
+from ..services.muhurta import MuhurtaQueryError, parse_query, search_muhurta
+from ..services.ephemeris_executor import ephemeris_executor, EphemerisBusyError
+from ..services.timezones import get_zone, timezone_name
+from ..utils.local_time import jd_to_local
+
+router = APIRouter(prefix="/api/muhurta", tags=["Panchang"])
+
+MAX_MUHURTA_DAYS = int(os.getenv("MAX_MUHURTA_DAYS", "366"))
+
+@router.post("/search", response_model=MuhurtaSearchResponse)
+async def search(request: MuhurtaSearchRequest):
+    """
+    Windows between the sunrise of `from` and the sunrise after `to` where the
+    constraint expression holds (see `services.muhurta` for the grammar), e.g.
+    `weekday in (Mon, Thu) and nakshatra in (Rohini, Hasta) and hora in (Jupiter, Venus)
+    and karana != Vishti and not (rahu_kalam or yamagandam)`.
+    """
+    if request.end < request.start:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (request.end - request.start).days + 1 > MAX_MUHURTA_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range limited to {MAX_MUHURTA_DAYS} days")
+    tz = request.timezone or timezone_name(request.latitude, request.longitude)
+    try:
+        get_zone(tz)
+    except pytz.UnknownTimeZoneError:
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {tz}")
+    try:
+        # Syntax errors are reported before anything is computed
+        parse_query(request.query)
+    except MuhurtaQueryError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid query: {e}")
+
+    try:
+        found = await ephemeris_executor.run_async(
+            search_muhurta, request.query, request.start, request.end, request.latitude, request.longitude,
+            request.ayanamsa_mode, request.min_duration_minutes)
+    except EphemerisBusyError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Muhurta search failed: {str(e)}")
+
+    def local(jd: float) -> str:
+        return jd_to_local(jd, tz).replace(microsecond=0).isoformat()
+
+    windows = [
+        MuhurtaWindow(start=local(start), end=local(end), duration_minutes=round((end - start) * 1440.0, 1))
+        for start, end in found[:request.limit]
+    ]
+    return MuhurtaSearchResponse(query=request.query, start=request.start, end=request.end,
+                                 latitude=request.latitude, longitude=request.longitude, timezone=tz,
+                                 truncated=len(found) > request.limit, windows=windows)
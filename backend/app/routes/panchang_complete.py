@@ -1,6 +1,10 @@
 from fastapi import APIRouter, HTTPException, Query
-from datetime import datetime, date, timedelta
-from ..panchang_models import CompletePanchangResponse, TithiDetail, NakshatraDetail, KaranaDetail, YogaDetail, TimeRange, LunarMonthYear
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+import pytz
+from datetime import datetime, date
+from typing import Optional
+from ..panchang_models import CompletePanchangResponse, Choghadiya, ChoghadiyaPeriod, TithiDetail, NakshatraDetail, KaranaDetail, YogaDetail, TimeRange, LunarMonthYear
 from ..services.panchang_calculator import (
     calculate_gowri_panchangam,
     calculate_vaara_soolai,
@@ -11,10 +15,14 @@ from ..services.panchang_calculator import (
     NAKSHATRA_TAMIL,
     NAKSHATRA_LORDS
 )
-from ..utils.timezone_helper import get_sunrise_sunset
-from ..engine import calculate_daily_panchanga_extended, calculate_auspicious_timings_extended
+from ..utils.timezone_helper import get_timezone_for_coordinates
+from ..engine import calculate_daily_panchanga_extended, calculate_auspicious_timings_extended, datetime_to_jd, calculate_panchanga_calendar, MAX_CALENDAR_DAYS
+from ..services.ephemeris_executor import ephemeris_executor, EphemerisBusyError
+from ..utils.local_time import jd_to_local
+from ..services.timezones import get_zone
+from ..services.lunar_events import moon_day
+from ..services.day_context import day_context
 import swisseph as swe
-import pytz
 
 router = APIRouter(prefix="/api/panchang", tags=["Panchang"])
 
@@ -24,7 +32,7 @@ async def get_complete_panchang(
     latitude: float = Query(..., description="Latitude"),
     longitude: float = Query(..., description="Longitude"),
     location_name: str = Query("Unknown Location", description="Location name"),
-    timezone_str: str = Query("UTC", description="Timezone string")
+    timezone_str: str = Query("UTC", description="Unused; all times are given in the zone at the location")
 ):
     """
     Get complete Panchanga with all ProKerala features:
@@ -38,8 +46,10 @@ async def get_complete_panchang(
         # Parse date
         target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
         
-        # Get sunrise/sunset
-        sunrise, sunset = get_sunrise_sunset(latitude, longitude, target_date)
+        # One day context for sunrise/sunset and every period divided from them
+        ctx = await ephemeris_executor.run_async(day_context, target_date, latitude, longitude)
+        local_zone = get_timezone_for_coordinates(latitude, longitude)
+        sunrise, sunset = (jd_to_local(jd, local_zone).replace(microsecond=0) for jd in (ctx.sunrise, ctx.sunset))
         
         # Get weekday
         weekdays = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
@@ -59,87 +69,56 @@ async def get_complete_panchang(
         tamil_month, tamil_date_num, tamil_year = get_tamil_month_and_year(target_date)
         
         # Calculate Gowri Panchangam
-        gowri = calculate_gowri_panchangam(sunrise, sunset, weekday_idx)
+        gowri = calculate_gowri_panchangam(ctx, local_zone)
+        choghadiya = Choghadiya(**{
+            f"{half}_periods": [
+                ChoghadiyaPeriod(name=p.name, quality=p.quality,
+                                 start_time=format_time_12h(jd_to_local(p.start_jd, local_zone)),
+                                 end_time=format_time_12h(jd_to_local(p.end_jd, local_zone)))
+                for p in ctx.choghadiya(night=half == "night")
+            ]
+            for half in ("day", "night")
+        })
         
         # Calculate Vaara Soolai
         vaara_soolai = calculate_vaara_soolai(weekday)
         
         # Get existing panchanga calculation (re-using engine logic)
-        panchanga_basic = calculate_daily_panchanga_extended(
+        panchanga_basic = await ephemeris_executor.run_async(
+            calculate_daily_panchanga_extended,
             target_date, 
             sunrise.time(), 
             latitude, 
-            longitude
+            longitude,
+            jd=datetime_to_jd(sunrise)
         )
         
-        # Get Special Timings
-        timings = calculate_auspicious_timings_extended(sunrise, sunset, latitude, longitude)
-        
-        # --- Moonrise / Moonset Calculation ---
-        # Using swisseph to find next rise/set events
-        julian_day_start = swe.julday(target_date.year, target_date.month, target_date.day)
-        
-        # --- Moonrise / Moonset Calculation ---
-        # Search window: from midnight to midnight (local)
-        # Using the helper logic but more robustly
-        jd_base = swe.julday(target_date.year, target_date.month, target_date.day, 0.0) # Start of day UT
+        # Limb boundaries in the location's zone, dated when they fall on another day
+        def fmt_transition(jd):
+            dt_local = jd_to_local(jd, local_zone)
+            if dt_local.date() == target_date:
+                return format_time_12h(dt_local)
+            return dt_local.strftime("%b %d ") + format_time_12h(dt_local)
         
-        # We search for events within a large enough window (-12h to +36h) 
-        # to ensure we capture the rise/set that falls on the specific calendar day.
+        # Get Special Timings
+        timings = calculate_auspicious_timings_extended(ctx, local_zone)
         
-        def find_event_nearest_today(body, event_type, jd_search_start, tz_str):
-            # event_type: CALC_RISE or CALC_SET
-            # Correct signature: swe.rise_trans(jd, body, event_idx, geopos)
-            # where event_idx is swe.CALC_RISE | swe.CALC_SET
-            res = swe.rise_trans(jd_search_start - 0.5, body, event_type, (longitude, latitude, 0))
-            event_jd = res[1][0]
-            
-            # Check if this event falls on our target date in target timezone
-            def to_local(jd):
-                y, m, d, h_dec = swe.revjul(jd)
-                dt_utc = datetime(y, m, d, int(h_dec), int((h_dec % 1)*60), 0, tzinfo=pytz.UTC)
-                return dt_utc.astimezone(pytz.timezone(tz_str))
-            
-            # If the found event is too early, search forward
-            if to_local(event_jd).date() < target_date:
-                res = swe.rise_trans(event_jd + 0.01, body, event_type, (longitude, latitude, 0))
-                event_jd = res[1][0]
-            
-            # If the found event is too late, we might have missed one? 
-            # (Rare for Moon/Sun unless search start was wrong)
-            
-            dt_local = to_local(event_jd)
-            if dt_local.date() == target_date:
-                return dt_local.strftime("%b %d %I:%M %p").lstrip('0').replace(' 0', ' ')
-            return "--:--"
+        # --- Moonrise / Moonset (shared monthly tables) ---
+        moon = await ephemeris_executor.run_async(moon_day, target_date, latitude, longitude, local_zone)
+        def fmt_moon(jd):
+            if jd is None:
+                return "--:--"
+            return jd_to_local(jd, local_zone).strftime("%b %d %I:%M %p").lstrip('0').replace(' 0', ' ')
 
-        moonrise_str = find_event_nearest_today(swe.MOON, swe.CALC_RISE, jd_base, timezone_str)
-        moonset_str = find_event_nearest_today(swe.MOON, swe.CALC_SET, jd_base, timezone_str)
+        moonrise_str = fmt_moon(moon.moonrise)
+        moonset_str = fmt_moon(moon.moonset)
 
-        # --- Dur Muhurtham Calculation ---
-        # Daytime consists of 15 Muhurtas (Duration = DayLen / 15)
-        day_duration_sec = (sunset - sunrise).total_seconds()
-        muhurta_dur = day_duration_sec / 15.0
-        
-        dur_muhurtas = []
-        # Index 1-15
-        dm_map = {
-            0: [14],        # Sun: 14th
-            1: [9, 2],      # Mon: 9th, 2nd
-            2: [4, 12],     # Tue: 4th, 12th
-            3: [3],         # Wed: 3rd (Special: this is the only one in ProKerala list usually)
-            4: [6, 13],     # Thu: 6th, 13th
-            5: [4, 10],     # Fri: 4th, 10th
-            6: [1]          # Sat: 1st
-        }
-        
-        for m_idx in dm_map.get(weekday_idx, []):
-            m_start = sunrise + timedelta(seconds=muhurta_dur * (m_idx - 1))
-            m_end = sunrise + timedelta(seconds=muhurta_dur * m_idx)
-            dur_muhurtas.append(TimeRange(
-                start=m_start.strftime("%I:%M %p").lstrip('0'),
-                end=m_end.strftime("%I:%M %p").lstrip('0')
-            ))
+        # --- Dur Muhurtham (day muhurtas by weekday, from the day context) ---
+        dur_muhurtas = [
+            TimeRange(start=jd_to_local(start, local_zone).strftime("%I:%M %p").lstrip('0'),
+                      end=jd_to_local(end, local_zone).strftime("%I:%M %p").lstrip('0'))
+            for start, end in ctx.dur_muhurtham()
+        ]
 
         # --- Varjyam Calculation ---
         # Each Nakshatra has a Tyajya start point (in ghatis from start of Nakshatra)
@@ -156,18 +135,20 @@ async def get_complete_panchang(
         }
         
         varjyam_list = []
-        # Simplified: Calculate from current Nakshatra if end time is available
-        # But we need Start Time too. We'll use "--" for now or assume 24h duration approx.
-        # Real logic: Find when Nakshatra started.
+        # Tyajya points are in ghatis of a 60-ghati nakshatra, so scale them by
+        # the actual nakshatra duration; Varjyam lasts 4 such ghatis.
         nak_name = panchanga_basic.nakshatra.name
         t_point = tyajya_points.get(nak_name, 20) # Default 20 ghatis
-        
-        # If we had start_time, result = start + (t_point * 0.4 hours)
-        # Since we only have end_time, we'll placeholder this better or skip if no start.
-        # Let's assume Nakshatra is approx 24h for the MVP display.
+        nak_start_jd = panchanga_basic.nakshatra.start_jd
+        nak_end_jd = panchanga_basic.nakshatra.end_jd
+        if nak_start_jd is not None and nak_end_jd is not None:
+            ghati = (nak_end_jd - nak_start_jd) / 60.0
+            varjyam_start = nak_start_jd + t_point * ghati
+            varjyam_list.append(TimeRange(start=fmt_transition(varjyam_start), end=fmt_transition(varjyam_start + 4 * ghati)))
         
         # --- Chandrashtamam Calculation ---
-        moon_pos_raw = swe.calc_ut(julian_day_start, swe.MOON, swe.FLG_SWIEPH)[0][0]
+        julian_day_start = swe.julday(target_date.year, target_date.month, target_date.day)
+        moon_pos_raw = (await ephemeris_executor.run_async(swe.calc_ut, julian_day_start, swe.MOON, swe.FLG_SWIEPH))[0][0]
         moon_sign_idx = int(moon_pos_raw / 30)
         chandrashtamam_target_idx = (moon_sign_idx - 7) % 12
         
@@ -213,8 +194,8 @@ async def get_complete_panchang(
             TithiDetail(
                 name=panchanga_basic.tithi.name,
                 paksha=f"{panchanga_basic.tithi.paksha} Paksha",
-                start_time="Start",
-                end_time=format_time_12h(datetime.strptime(panchanga_basic.tithi.end_time, "%H:%M:%S")),
+                start_time=fmt_transition(panchanga_basic.tithi.start_jd),
+                end_time=fmt_transition(panchanga_basic.tithi.end_jd),
                 moon_phase=int(panchanga_basic.tithi.number)
             )
         ]
@@ -223,8 +204,8 @@ async def get_complete_panchang(
             NakshatraDetail(
                 name=panchanga_basic.nakshatra.name,
                 name_tamil=NAKSHATRA_TAMIL.get(panchanga_basic.nakshatra.name, "Tamil Name"),
-                start_time="Start", 
-                end_time=format_time_12h(datetime.strptime(panchanga_basic.nakshatra.end_time, "%H:%M:%S")),
+                start_time=fmt_transition(panchanga_basic.nakshatra.start_jd),
+                end_time=fmt_transition(panchanga_basic.nakshatra.end_jd),
                 lord=panchanga_basic.nakshatra.lord,
                 pada=panchanga_basic.nakshatra.pada
             )
@@ -249,8 +230,8 @@ async def get_complete_panchang(
             pirai="Theipirai",
             tithi=tithi_list,
             nakshatra=nak_list,
-            karana=[KaranaDetail(name=panchanga_basic.karana.name, start_time="--", end_time=format_time_12h(datetime.strptime(panchanga_basic.karana.end_time, "%H:%M:%S")))],
-            yoga=[YogaDetail(name=panchanga_basic.yoga.name, start_time="--", end_time=format_time_12h(datetime.strptime(panchanga_basic.yoga.end_time, "%H:%M:%S")))],
+            karana=[KaranaDetail(name=panchanga_basic.karana.name, start_time=fmt_transition(panchanga_basic.karana.start_jd), end_time=fmt_transition(panchanga_basic.karana.end_jd))],
+            yoga=[YogaDetail(name=panchanga_basic.yoga.name, start_time=fmt_transition(panchanga_basic.yoga.start_jd), end_time=fmt_transition(panchanga_basic.yoga.end_jd))],
             vaaram=weekday_tamil.get(weekday, weekday),
             rahu_kaalam=fmt_ks(timings.rahu_kaal),
             yamagandam=fmt_ks(timings.yamaganda_kaal),
@@ -277,10 +258,43 @@ async def get_complete_panchang(
             agnivasa="Prithvi (Earth)",
             chandra_vasa="North",
             rahukala_vasa="North",
-            gowri_panchangam=gowri
+            gowri_panchangam=gowri,
+            choghadiya=choghadiya
         )
         
         return response
         
+    except EphemerisBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Panchang calculation failed: {str(e)}")
+
+@router.get("/calendar")
+def get_panchang_calendar(
+    from_date: date = Query(..., alias="from", description="First date (YYYY-MM-DD)"),
+    to_date: date = Query(..., alias="to", description="Last date (YYYY-MM-DD), inclusive"),
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude"),
+    tz: Optional[str] = Query(None, description="Timezone for local times (default: zone at the location)"),
+    ayanamsa_mode: str = Query("LAHIRI", description="Ayanamsa")
+):
+    """
+    Panchanga for a range of days, streamed as NDJSON (one day per line).
+    Each day runs sunrise to next sunrise and lists every tithi, nakshatra,
+    yoga and karana that overlaps it with local start/end times.
+    """
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (to_date - from_date).days + 1 > MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range limited to {MAX_CALENDAR_DAYS} days")
+    if tz:
+        try:
+            get_zone(tz)
+        except pytz.UnknownTimeZoneError:
+            raise HTTPException(status_code=400, detail=f"Unknown timezone: {tz}")
+
+    def generate():
+        for day in calculate_panchanga_calendar(from_date, to_date, lat, lon, tz, ayanamsa_mode):
+            yield to_json(day) + b"\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -0,0 +1,145 @@
+"""
+In-process result cache for `calculate_chart`.
+
+Entries are content-addressed: the key is a SHA-256 of the canonical form of
+the `BirthDetails` fields that affect the calculation (display-only location
+names are ignored). Charts are stored as their serialized JSON, which gives an
+exact byte size for the cap and keeps cached results immune to callers mutating
+the returned model. Charts limited to some sections (`include=`) are cached
+under a key that also covers the canonical section list.
+
+Configuration (environment):
+    CHART_CACHE_MAX_ENTRIES  Max cached charts (default 2048, 0 disables the cache).
+    CHART_CACHE_MAX_BYTES    Max total size of cached charts (default 64 MiB).
+    CHART_CACHE_TTL          Seconds a cached chart stays valid (default 3600).
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from ..models import BirthDetails, ChartResponse
+from ..engine import ChartSections, calculate_chart
+from .ephemeris_executor import ephemeris_executor
+
+logger = logging.getLogger(__name__)
+
+# Fields of BirthDetails that change the calculated chart
+KEY_FIELDS = ("date", "time", "latitude", "longitude", "ayanamsa_mode", "location_timezone")
+
+def chart_key(details: BirthDetails, include: Optional[ChartSections] = None) -> str:
+    """Canonical content hash of the calculation inputs."""
+    payload = details.model_dump(mode="json", include=set(KEY_FIELDS))
+    if include is not None:
+        payload["include"] = include.canonical()
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class ChartCache:
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 64 * 1024 * 1024, ttl: float = 3600.0):
+        self.max_entries = max(0, max_entries)
+        self.max_bytes = max(0, max_bytes)
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_env(cls) -> "ChartCache":
+        return cls(
+            max_entries=int(os.getenv("CHART_CACHE_MAX_ENTRIES", "2048")),
+            max_bytes=int(os.getenv("CHART_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            ttl=float(os.getenv("CHART_CACHE_TTL", "3600")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def _drop(self, key: str):
+        _, blob = self._entries.pop(key)
+        self._bytes -= len(blob)
+
+    def get(self, key: str):
+        """Cached chart for `key`, or None on a miss or an expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            blob = entry[1]
+        return ChartResponse.model_validate_json(blob)
+
+    def put(self, key: str, chart: ChartResponse):
+        if not self.enabled:
+            return
+        blob = chart.model_dump_json().encode()
+        if len(blob) > self.max_bytes:
+            logger.warning(f"Chart of {len(blob)} bytes exceeds cache byte cap, not cached")
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, blob)
+            self._bytes += len(blob)
+            # Evict least recently used entries until both caps hold
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_compute(self, details: BirthDetails, compute: Callable[[], ChartResponse],
+                       include: Optional[ChartSections] = None) -> ChartResponse:
+        if not self.enabled:
+            return compute()
+        key = chart_key(details, include)
+        chart = self.get(key)
+        if chart is None:
+            chart = compute()
+            self.put(key, chart)
+        return chart
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+chart_cache = ChartCache.from_env()
+
+def get_chart(details: BirthDetails, include: Optional[ChartSections] = None) -> ChartResponse:
+    """
+    Chart for `details`, served from the cache or calculated on the ephemeris executor.
+    `include` (from `parse_chart_include`) limits the chart to some sections; None is the full chart.
+    """
+    return chart_cache.get_or_compute(
+        details, lambda: ephemeris_executor.run(calculate_chart, details, include), include
+    )
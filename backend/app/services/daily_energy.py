@@ -0,0 +1,192 @@
+"""
+Daily Energy Score for every saved chart at once.
+
+`advisor.calculate_daily_energy` needs a full chart and the day's panchanga per
+user, but the panchanga depends only on the (quantized) location, and the
+chart only contributes the natal Moon nakshatra, the ascendant sign and the
+running Mahadasha lord. The batch scorer therefore
+
+    - groups charts into clusters by quantized birth location (the panchanga
+      location `/daily/mentor` uses) and computes each cluster's panchanga once,
+      from the shared sunrise cache, with the Sun and Moon of all clusters in
+      one vectorized call;
+    - reads the natal Moon and ascendant from `chart_natal` (kept current by
+      `transit_hits.sync_natal`) into index arrays, and finds every chart's
+      Mahadasha lord on the day from the Moon and the birth date;
+    - turns the advisor's Tara Bala, dasha and vara rules into small lookup
+      tables built from the advisor functions themselves, so a score is a few
+      gathers and the results match the per-user path.
+
+The cost is one sunrise per cluster plus a few array operations per chart, so
+it grows with the number of distinct places rather than users.
+
+Configuration (environment):
+    ENERGY_CLUSTER_PRECISION  Decimal places of lat/lon that define a cluster
+                              (default 2, ~1 km: sunrise moves by seconds).
+"""
+import os
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import swisseph as swe
+from sqlalchemy.orm import Session
+
+from ..advisor import (ENERGY_LABELS, WEIGHT_DASHA, WEIGHT_MOON_TRANSIT, WEIGHT_PANCHANGA, WEIGHT_VARA,
+                       calculate_dasha_score, calculate_panchanga_score, calculate_tara_bala,
+                       get_friendship_score, get_lord_of_sign, get_lord_of_weekday)
+from ..database import DBChart, DBChartNatal
+from ..engine import (DASHA_YEAR_DAYS, MAHADASHA_YEARS, NAKSHATRAS, PLANET_SEQUENCE, SIGNS, WEEKDAYS,
+                      calculate_panchanga, dasha_epoch_jd)
+from .. import ephemeris
+from .solar_events import quantize, solar_day
+from .transit_hits import natal_source, sync_natal
+
+ENERGY_CLUSTER_PRECISION = int(os.getenv("ENERGY_CLUSTER_PRECISION", "2"))
+
+NAKSHATRA_SPAN = 360.0 / 27.0
+
+# Tara Bala by (transit nakshatra - natal nakshatra) % 9
+TARA_SCORES = np.array([calculate_tara_bala(NAKSHATRAS[0], NAKSHATRAS[k]) for k in range(9)])
+# Dasha score by [ascendant sign, Mahadasha lord (PLANET_SEQUENCE index)]
+DASHA_SCORES = np.array([[calculate_dasha_score(lord, sign) for lord in PLANET_SEQUENCE] for sign in SIGNS])
+# Vara score by [ascendant sign, Vedic weekday]
+VARA_SCORES = np.array([[get_friendship_score(get_lord_of_sign(sign), get_lord_of_weekday(day)) for day in WEEKDAYS]
+                        for sign in SIGNS])
+
+# Mahadasha end offsets in years from the theoretical start of the birth Mahadasha, per birth lord
+_MD_ENDS = np.array([np.cumsum([MAHADASHA_YEARS[PLANET_SEQUENCE[(b + i) % 9]] for i in range(9)]) for b in range(9)],
+                    dtype=float)
+
+class EnergyCohort(NamedTuple):
+    chart_ids: np.ndarray
+    names: List[str]
+    cluster: np.ndarray        # index into `locations`
+    locations: List[Tuple[float, float]]  # quantized (lat, lon) per cluster
+    moon: np.ndarray           # natal sidereal Moon longitude
+    asc_sign: np.ndarray       # 0-11
+    birth_jd: np.ndarray       # engine.dasha_epoch_jd of the birth date
+
+# JD (UT) of 1970-01-01 00:00: datetime64 day counts plus this give `engine.dasha_epoch_jd`
+_UNIX_EPOCH_JD = 2440587.5
+
+def build_cohort(chart_ids, names: List[str], latitudes, longitudes, birth_dates: List[str], moon, ascendant) -> EnergyCohort:
+    coords = np.round(np.column_stack([np.asarray(latitudes, dtype=float), np.asarray(longitudes, dtype=float)]),
+                      ENERGY_CLUSTER_PRECISION).reshape(-1, 2)
+    keys, cluster = np.unique(coords, axis=0, return_inverse=True)
+    birth_jd = np.array(birth_dates, dtype="datetime64[D]").astype(np.int64) + _UNIX_EPOCH_JD
+    return EnergyCohort(np.asarray(chart_ids), list(names), cluster.reshape(-1).astype(np.int64),
+                        [quantize(lat, lon) for lat, lon in keys.tolist()],
+                        np.asarray(moon, dtype=float), (np.asarray(ascendant, dtype=float) // 30).astype(np.int64) % 12,
+                        birth_jd.astype(float))
+
+def load_energy_cohort(db: Session) -> EnergyCohort:
+    """Every saved chart with known natal points in `chart_natal`."""
+    rows = (db.query(DBChart.id, DBChart.name, DBChart.latitude, DBChart.longitude, DBChart.date,
+                     DBChartNatal.moon, DBChartNatal.ascendant)
+            .join(DBChartNatal, DBChartNatal.chart_id == DBChart.id)
+            .filter(DBChartNatal.moon.isnot(None), DBChartNatal.ascendant.isnot(None))
+            .order_by(DBChart.id).all())
+    return build_cohort([r.id for r in rows], [r.name for r in rows], [r.latitude for r in rows],
+                        [r.longitude for r in rows], [r.date for r in rows],
+                        [r.moon for r in rows], [r.ascendant for r in rows])
+
+def mahadasha_lords(moon: np.ndarray, birth_jd: np.ndarray, on: date) -> np.ndarray:
+    """PLANET_SEQUENCE index of the Mahadasha running on `on`, as `engine.current_dasha` picks it."""
+    nak = (moon // NAKSHATRA_SPAN).astype(np.int64) % 27
+    birth_lord = nak % 9
+    years = np.array([MAHADASHA_YEARS[p] for p in PLANET_SEQUENCE], dtype=float)[birth_lord]
+    passed = years * ((moon % NAKSHATRA_SPAN) / NAKSHATRA_SPAN)
+    start_jd = birth_jd - passed * DASHA_YEAR_DAYS
+    # Dasha tables are in whole days from the birth date; a period ending on `on` is already over
+    end_days = np.floor(start_jd[:, None] + _MD_ENDS[birth_lord] * DASHA_YEAR_DAYS - birth_jd[:, None])
+    day = swe.julday(on.year, on.month, on.day, 0.0) - birth_jd
+    running = np.minimum((end_days <= day[:, None]).sum(axis=1), 8)
+    return (birth_lord + running) % 9
+
+class NatalCore(NamedTuple):
+    """What the Daily Energy Score needs of one saved chart."""
+    chart_id: int
+    name: str
+    latitude: float
+    longitude: float
+    timezone: Optional[str]
+    moon: Optional[float]       # natal sidereal longitude; None when the birth data is unusable
+    ascendant: Optional[float]
+    birth_jd: float             # engine.dasha_epoch_jd of the birth date
+
+    @property
+    def moon_nakshatra(self) -> str:
+        return NAKSHATRAS[int(self.moon // NAKSHATRA_SPAN) % 27]
+
+    @property
+    def ascendant_sign(self) -> str:
+        return SIGNS[int(self.ascendant // 30) % 12]
+
+    def mahadasha_lord(self, on: date) -> str:
+        return PLANET_SEQUENCE[int(mahadasha_lords(np.array([self.moon]), np.array([self.birth_jd]), on)[0])]
+
+def _natal_core_row(db: Session, chart_id: int):
+    return (db.query(DBChart.id, DBChart.name, DBChart.date, DBChart.time, DBChart.latitude, DBChart.longitude,
+                     DBChart.ayanamsa_mode, DBChart.location_timezone,
+                     DBChartNatal.source, DBChartNatal.moon, DBChartNatal.ascendant)
+            .outerjoin(DBChartNatal, DBChartNatal.chart_id == DBChart.id)
+            .filter(DBChart.id == chart_id).first())
+
+def load_natal_core(db: Session, chart_id: int) -> Optional[NatalCore]:
+    """
+    The natal core of a saved chart in one primary-key query, or None if there is no
+    such chart. A missing or stale `chart_natal` row is recomputed first.
+    """
+    row = _natal_core_row(db, chart_id)
+    if row is None:
+        return None
+    if row.source != natal_source(row):
+        sync_natal(db, [chart_id])
+        row = _natal_core_row(db, chart_id)
+    birth_jd = np.nan if row.moon is None else dasha_epoch_jd(date.fromisoformat(row.date))
+    return NatalCore(row.id, row.name, row.latitude, row.longitude, row.location_timezone,
+                     row.moon, row.ascendant, birth_jd)
+
+def cluster_panchangas(cohort: EnergyCohort, on: date) -> list:
+    """
+    The panchanga of `on` at each cluster location, as `engine.calculate_daily_panchanga`
+    gives it (Lahiri, at sunrise); runs in the ephemeris executor.
+    """
+    sunrises = np.array([solar_day(on, lat, lon).sunrise for lat, lon in cohort.locations], dtype=float)
+    suns = ephemeris.calc_ut_array(sunrises, swe.SUN, "LAHIRI")[:, 0].tolist()
+    moons = ephemeris.calc_ut_array(sunrises, swe.MOON, "LAHIRI")[:, 0].tolist()
+    vara = WEEKDAYS[(on.weekday() + 1) % 7]
+    return [calculate_panchanga(moon, sun, jd, vara=vara) for moon, sun, jd in zip(moons, suns, sunrises.tolist())]
+
+def score_cohort(cohort: EnergyCohort, on: date, panchangas: list) -> Dict[str, np.ndarray]:
+    """Total scores, the four components and ENERGY_LABELS indexes for every chart."""
+    panchanga_by_cluster = np.array([calculate_panchanga_score(p) for p in panchangas], dtype=float)
+    nakshatra_by_cluster = np.array([p.nakshatra.number - 1 for p in panchangas], dtype=np.int64)
+    weekday_by_cluster = np.array([WEEKDAYS.index(p.vara) for p in panchangas], dtype=np.int64)
+
+    natal_nak = (cohort.moon // NAKSHATRA_SPAN).astype(np.int64) % 27
+    panchanga = panchanga_by_cluster[cohort.cluster]
+    moon = TARA_SCORES[(nakshatra_by_cluster[cohort.cluster] - natal_nak) % 27 % 9]
+    dasha = DASHA_SCORES[cohort.asc_sign, mahadasha_lords(cohort.moon, cohort.birth_jd, on)]
+    vara = VARA_SCORES[cohort.asc_sign, weekday_by_cluster[cohort.cluster]]
+    total = panchanga * WEIGHT_PANCHANGA + moon * WEIGHT_MOON_TRANSIT + dasha * WEIGHT_DASHA + vara * WEIGHT_VARA
+
+    thresholds = np.array([entry[0] for entry in ENERGY_LABELS])
+    label = (total[:, None] < thresholds[None, :]).sum(axis=1)
+    return {"score": total, "panchanga": panchanga, "moon": moon, "dasha": dasha, "vara": vara, "label": label}
+
+def daily_energy_rows(cohort: EnergyCohort, scores: Dict[str, np.ndarray]):
+    """One JSON-ready dict per chart, shaped like the advisor's result (without vibe and theme)."""
+    columns = {k: np.round(v, 1).tolist() for k, v in scores.items() if k != "label"}
+    for i, label in enumerate(scores["label"].tolist()):
+        name, color, auspiciousness = ENERGY_LABELS[label][1:]
+        yield {
+            "chart_id": int(cohort.chart_ids[i]),
+            "name": cohort.names[i],
+            "score": columns["score"][i],
+            "label": name,
+            "color": color,
+            "auspiciousness": auspiciousness,
+            "breakdown": {k: columns[k][i] for k in ("panchanga", "moon", "dasha", "vara")},
+        }
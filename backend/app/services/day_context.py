@@ -0,0 +1,139 @@
+"""
+One Vedic day at a location, and every period divided from it.
+
+A `DayContext` holds the sunrise, sunset and next sunrise of a civil date
+(from the shared solar cache), the previous sunset, and the weekday with its
+lord. Day-based periods are equal parts of the day (sunrise..sunset) or the
+night (sunset..next sunrise):
+
+    8 parts    Rahu / Yama / Gulika kalam, Gowri, Choghadiya
+    12 parts   horas
+    15 parts   muhurtas: Abhijit (8th of the day), Dur Muhurtham, and
+               Brahma muhurta (14th of the previous night)
+    30 parts   ghatis of the day or the night
+
+Every caller derives its periods from the same context, so they agree with
+each other to the float, and the context is cached per (quantized location,
+date) so a request that needs several of them finds the sunrise once.
+All times are JD (UT); format them in the caller's zone.
+
+Configuration (environment):
+    DAY_CONTEXT_CACHE_SIZE  Max cached location-days (default 4096).
+"""
+import os
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Tuple
+
+from .solar_events import quantize, solar_day
+
+DAY_CONTEXT_CACHE_SIZE = int(os.getenv("DAY_CONTEXT_CACHE_SIZE", "4096"))
+
+# Vedic weekday order: 0 = Sunday
+WEEKDAY_LORDS = ['Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn']
+
+# Day eighths (1-8) by Vedic weekday, Sunday first
+RAHU_KALAM_PART = (8, 2, 7, 5, 6, 4, 3)
+YAMAGANDAM_PART = (5, 4, 3, 2, 1, 7, 6)
+GULIKA_KALAM_PART = (7, 6, 5, 4, 3, 2, 1)
+
+# Day muhurtas (1-15) of Dur Muhurtham by Vedic weekday, Sunday first
+DUR_MUHURTHAM_PARTS = ((14,), (9, 2), (4, 12), (3,), (6, 13), (4, 10), (1,))
+
+# Choghadiya follow the hora order of their lords; the day starts with the weekday
+# lord's, the night with the lord of the fifth weekday (and steps five at a time)
+CHOGHADIYA_CYCLE = (
+    ("Udveg", "Sun", "Bad"), ("Char", "Venus", "Neutral"), ("Labh", "Mercury", "Good"),
+    ("Amrit", "Moon", "Good"), ("Kaal", "Saturn", "Bad"), ("Shubh", "Jupiter", "Good"),
+    ("Rog", "Mars", "Bad"),
+)
+_CHOGHADIYA_BY_LORD = {lord: i for i, (_, lord, _) in enumerate(CHOGHADIYA_CYCLE)}
+
+class Period(NamedTuple):
+    name: str
+    quality: str
+    start_jd: float
+    end_jd: float
+
+class DayContext:
+    """Sunrise-based day at a (quantized) location; see the module docstring."""
+
+    def __init__(self, d: date, latitude: float, longitude: float):
+        self.date = d
+        self.latitude, self.longitude = quantize(latitude, longitude)
+        self.sunrise, self.sunset, self.next_sunrise = solar_day(d, self.latitude, self.longitude)
+        self.previous_sunset = solar_day(date.fromordinal(d.toordinal() - 1), self.latitude, self.longitude).sunset
+        self.weekday = (d.weekday() + 1) % 7
+        self.weekday_lord = WEEKDAY_LORDS[self.weekday]
+        self._parts: Dict[Tuple[int, bool], Tuple[float, ...]] = {}
+
+    @property
+    def day_length(self) -> float:
+        return self.sunset - self.sunrise
+
+    @property
+    def night_length(self) -> float:
+        return self.next_sunrise - self.sunset
+
+    def parts(self, n: int, night: bool = False) -> Tuple[float, ...]:
+        """The n + 1 boundaries dividing the day (or night) into n equal parts."""
+        bounds = self._parts.get((n, night))
+        if bounds is None:
+            start, end = (self.sunset, self.next_sunrise) if night else (self.sunrise, self.sunset)
+            bounds = tuple(start + (end - start) * k / n for k in range(n)) + (end,)
+            self._parts[(n, night)] = bounds
+        return bounds
+
+    def part(self, n: int, k: int, night: bool = False) -> Tuple[float, float]:
+        """(start, end) of the k-th (1-based) of n parts."""
+        bounds = self.parts(n, night)
+        return bounds[k - 1], bounds[k]
+
+    def rahu_kalam(self) -> Tuple[float, float]:
+        return self.part(8, RAHU_KALAM_PART[self.weekday])
+
+    def yamagandam(self) -> Tuple[float, float]:
+        return self.part(8, YAMAGANDAM_PART[self.weekday])
+
+    def gulika_kalam(self) -> Tuple[float, float]:
+        return self.part(8, GULIKA_KALAM_PART[self.weekday])
+
+    def abhijit(self) -> Tuple[float, float]:
+        return self.part(15, 8)
+
+    def dur_muhurtham(self) -> List[Tuple[float, float]]:
+        return [self.part(15, k) for k in DUR_MUHURTHAM_PARTS[self.weekday]]
+
+    def brahma_muhurta(self) -> Tuple[float, float]:
+        """The 14th of the 15 muhurtas of the night ending at this sunrise."""
+        muhurta = (self.sunrise - self.previous_sunset) / 15
+        return self.sunrise - 2 * muhurta, self.sunrise - muhurta
+
+    def choghadiya(self, night: bool = False) -> List[Period]:
+        first = _CHOGHADIYA_BY_LORD[WEEKDAY_LORDS[(self.weekday + 4) % 7 if night else self.weekday]]
+        step = 5 if night else 1
+        bounds = self.parts(8, night)
+        periods = []
+        for i in range(8):
+            name, _, quality = CHOGHADIYA_CYCLE[(first + step * i) % 7]
+            periods.append(Period(name, quality, bounds[i], bounds[i + 1]))
+        return periods
+
+@lru_cache(maxsize=DAY_CONTEXT_CACHE_SIZE)
+def _day_context(lat: float, lon: float, ordinal: int) -> DayContext:
+    return DayContext(date.fromordinal(ordinal), lat, lon)
+
+def day_context(d: date, lat: float, lon: float) -> DayContext:
+    """The shared context of civil date `d` at the location."""
+    return _day_context(*quantize(lat, lon), d.toordinal())
+
+def cache_stats() -> dict:
+    info = _day_context.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "entries": info.currsize,
+        "max_entries": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_ratio": round(info.hits / lookups, 4) if lookups else 0.0,
+    }
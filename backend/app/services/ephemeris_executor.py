@@ -0,0 +1,114 @@
+"""
+Pluggable executor for Swiss Ephemeris work.
+
+Every pyswisseph call holds the GIL, so inside one process calculations are
+effectively serialized onto a single core whatever the number of threads.
+The executor can hand calculations to a pool of worker processes instead, each
+with its own ephemeris state, so throughput scales with the number of cores.
+
+Configuration (environment):
+    EPHEMERIS_WORKERS        Worker processes. 0 (default) runs inline in the
+                             calling thread, exactly like calling the engine directly.
+    EPHEMERIS_QUEUE_SIZE     Max calculations queued or running at once (default 64).
+    EPHEMERIS_QUEUE_TIMEOUT  Seconds to wait for a free slot before giving up (default 5).
+    EPHEMERIS_START_METHOD   multiprocessing start method for workers (default "spawn").
+"""
+import asyncio
+import functools
+import os
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class EphemerisBusyError(RuntimeError):
+    """Raised when the executor queue stays full for longer than the queue timeout."""
+
+def _init_worker():
+    # Importing the engine sets this process's ephemeris path and warms the
+    # timezone lookup, so the first real task does not pay for it.
+    from .. import engine  # noqa: F401
+    logger.info(f"Ephemeris worker {os.getpid()} ready")
+
+class EphemerisExecutor:
+    def __init__(self, workers: int = 0, queue_size: int = 64, queue_timeout: float = 5.0,
+                 start_method: str = "spawn"):
+        self.workers = max(0, workers)
+        self.queue_size = max(1, queue_size)
+        self.queue_timeout = queue_timeout
+        self.start_method = start_method
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "EphemerisExecutor":
+        return cls(
+            workers=int(os.getenv("EPHEMERIS_WORKERS", "0")),
+            queue_size=int(os.getenv("EPHEMERIS_QUEUE_SIZE", "64")),
+            queue_timeout=float(os.getenv("EPHEMERIS_QUEUE_TIMEOUT", "5")),
+            start_method=os.getenv("EPHEMERIS_START_METHOD", "spawn"),
+        )
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                )
+                logger.info(f"Started ephemeris pool with {self.workers} workers")
+            return self._pool
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Schedule `fn(*args, **kwargs)`. `fn` must be a module-level function
+        and its arguments picklable when a worker pool is configured.
+        In inline mode the call runs immediately and a completed Future is returned.
+        """
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise EphemerisBusyError("Ephemeris queue is full, try again shortly")
+
+        if self.workers == 0:
+            future: Future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                self._slots.release()
+            return future
+
+        try:
+            future = self._get_pool().submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn: Callable, *args, **kwargs):
+        """Submit and wait for the result (for sync route handlers)."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run_async(self, fn: Callable, *args, **kwargs):
+        """
+        Submit and await the result (for async route handlers). Waiting for a
+        queue slot, and the calculation itself in inline mode, happen on the
+        event loop's default thread pool so the loop keeps serving requests.
+        """
+        loop = asyncio.get_running_loop()
+        future = await loop.run_in_executor(None, functools.partial(self.submit, fn, *args, **kwargs))
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+ephemeris_executor = EphemerisExecutor.from_env()
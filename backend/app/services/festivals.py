@@ -0,0 +1,206 @@
+"""
+Festival and vrata dates from declarative rules.
+
+A rule names a tithi or nakshatra and the part of the day in which it must
+prevail: at sunrise or moonrise, or overlapping pradosh kaal, nishita or
+madhyahna. It may be restricted to an amanta lunar month or a sidereal solar
+month; a nakshatra festival that can fall twice in its solar month names the
+tithi it should be nearest to. For a year at one location the engine fetches the year's tithi and
+nakshatra transitions once (from the transition index), and for each matching
+element checks only the two or three days it touches, using the shared
+sunrise and moonrise caches. Adhika (intercalary) months are skipped by month-bound rules.
+
+Observance rules:
+    - among the days whose window the element prevails in, the one with the
+      largest overlap is chosen (the first one for sunrise/moonrise);
+    - an element that misses every window (kshaya) is observed on the day it
+      begins.
+"""
+import math
+import bisect
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import swisseph as swe
+
+from .. import ephemeris
+from ..transition_index import transitions_between
+from ..transitions import Transition
+from ..engine import NAKSHATRAS, SIGNS, tithi_name
+from .solar_events import SolarDay, solar_day, quantize
+from .lunar_events import next_moonrise
+
+# Amanta months, named after the sidereal sign the Sun is in at the new moon that starts them
+LUNAR_MONTHS = [
+    "Chaitra", "Vaishakha", "Jyeshtha", "Ashadha", "Shravana", "Bhadrapada",
+    "Ashwin", "Kartika", "Margashirsha", "Pausha", "Magha", "Phalguna",
+]
+
+WINDOWS = ("sunrise", "moonrise", "pradosh", "nishita", "madhyahna")
+
+class FestivalRule(NamedTuple):
+    name: str
+    category: str                     # "vrata" or "festival"
+    window: str                       # one of WINDOWS
+    tithis: Tuple[int, ...] = ()      # 1-30
+    nakshatra: Optional[int] = None   # 1-27
+    lunar_month: Optional[str] = None
+    solar_month: Optional[str] = None  # sidereal sign of the Sun at sunrise
+    near_tithi: Optional[int] = None   # keep only the occurrence closest to this tithi (1-30)
+
+FESTIVAL_RULES = [
+    FestivalRule("Ekadashi", "vrata", "sunrise", tithis=(11, 26)),
+    FestivalRule("Pradosham", "vrata", "pradosh", tithis=(13, 28)),
+    FestivalRule("Sankashti Chaturthi", "vrata", "moonrise", tithis=(19,)),
+    FestivalRule("Vinayaka Chaturthi", "vrata", "madhyahna", tithis=(4,)),
+    FestivalRule("Masik Shivaratri", "vrata", "nishita", tithis=(29,)),
+    FestivalRule("Purnima", "vrata", "sunrise", tithis=(15,)),
+    FestivalRule("Amavasya", "vrata", "sunrise", tithis=(30,)),
+    FestivalRule("Maha Shivaratri", "festival", "nishita", tithis=(29,), lunar_month="Magha"),
+    FestivalRule("Holika Dahan", "festival", "pradosh", tithis=(15,), lunar_month="Phalguna"),
+    FestivalRule("Rama Navami", "festival", "madhyahna", tithis=(9,), lunar_month="Chaitra"),
+    FestivalRule("Guru Purnima", "festival", "sunrise", tithis=(15,), lunar_month="Ashadha"),
+    FestivalRule("Krishna Janmashtami", "festival", "nishita", tithis=(23,), lunar_month="Shravana"),
+    FestivalRule("Ganesh Chaturthi", "festival", "madhyahna", tithis=(4,), lunar_month="Bhadrapada"),
+    FestivalRule("Diwali", "festival", "pradosh", tithis=(30,), lunar_month="Ashwin"),
+    FestivalRule("Thaipusam", "festival", "madhyahna", nakshatra=8, solar_month="Capricorn", near_tithi=15),
+    FestivalRule("Karthigai Deepam", "festival", "pradosh", nakshatra=3, solar_month="Scorpio", near_tithi=15),
+]
+
+class LunarMonth(NamedTuple):
+    start_jd: float   # new moon
+    name: str
+    adhika: bool
+
+def _sun_sign(jd: float, ayanamsa_mode: str) -> int:
+    return int(ephemeris.calc_ut(jd, swe.SUN, ayanamsa_mode)[0] / 30.0)
+
+def lunar_months(tithis: List[Transition], ayanamsa_mode: str = "LAHIRI") -> List[LunarMonth]:
+    """Amanta months starting at the new moons in `tithis` (the last one only decides the adhika flag)."""
+    new_moons = [t.start_jd for t in tithis if t.index == 0]
+    signs = [_sun_sign(jd, ayanamsa_mode) for jd in new_moons]
+    # No sankranti between two new moons: the first month is adhika
+    return [LunarMonth(jd, LUNAR_MONTHS[(sign + 1) % 12], i + 1 < len(signs) and signs[i + 1] == sign)
+            for i, (jd, sign) in enumerate(zip(new_moons, signs))]
+
+class FestivalEngine:
+    """Evaluates rules over one location; days and moonrises are computed once and shared by all rules."""
+
+    def __init__(self, latitude: float, longitude: float, ayanamsa_mode: str = "LAHIRI"):
+        self.latitude, self.longitude = quantize(latitude, longitude)
+        self.ayanamsa_mode = ayanamsa_mode
+        self._days: Dict[int, SolarDay] = {}
+
+    def day(self, ordinal: int) -> SolarDay:
+        day = self._days.get(ordinal)
+        if day is None:
+            day = self._days[ordinal] = solar_day(date.fromordinal(ordinal), self.latitude, self.longitude)
+        return day
+
+    def local_ordinal(self, jd: float) -> int:
+        """Civil date (ordinal) at local mean time of a JD."""
+        return math.floor(jd + self.longitude / 360.0 - 1721424.5)
+
+    def window(self, kind: str, day: SolarDay) -> Tuple[float, float]:
+        night = day.next_sunrise - day.sunset
+        if kind == "sunrise":
+            return day.sunrise, day.sunrise
+        if kind == "moonrise":
+            rise = next_moonrise(day.sunrise, self.latitude, self.longitude)
+            # A day without moonrise before the next sunrise has no window
+            return (rise, rise) if rise < day.next_sunrise else (math.inf, math.inf)
+        if kind == "pradosh":
+            return day.sunset, day.sunset + night / 5
+        if kind == "nishita":
+            return day.sunset + night * 7 / 15, day.sunset + night * 8 / 15
+        if kind == "madhyahna":
+            length = day.sunset - day.sunrise
+            return day.sunrise + length * 2 / 5, day.sunrise + length * 3 / 5
+        raise ValueError(f"Unknown window: {kind}")
+
+    def observance(self, element: Transition, kind: str) -> int:
+        """Civil date (ordinal) on which `element` is observed under window `kind`."""
+        first = self.local_ordinal(element.start_jd) - 1
+        best, best_overlap = None, -1.0
+        for ordinal in range(first, self.local_ordinal(element.end_jd) + 1):
+            lo, hi = self.window(kind, self.day(ordinal))
+            if lo == hi:
+                matched = element.start_jd <= lo < element.end_jd
+                overlap = 0.0
+            else:
+                overlap = min(hi, element.end_jd) - max(lo, element.start_jd)
+                matched = overlap > 0
+            if matched and overlap > best_overlap:
+                best, best_overlap = ordinal, overlap
+        if best is not None:
+            return best
+        # Kshaya: the day during which it begins
+        ordinal = self.local_ordinal(element.start_jd)
+        return ordinal if element.start_jd >= self.day(ordinal).sunrise else ordinal - 1
+
+def festival_dates(year: int, latitude: float, longitude: float, ayanamsa_mode: str = "LAHIRI",
+                   rules: Optional[List[FestivalRule]] = None) -> List[dict]:
+    """
+    Dates of every rule in `rules` (default FESTIVAL_RULES) observed in `year`, sorted by date.
+    Each entry has the rule name, category, date (ISO), the tithi/nakshatra with its start and
+    end JD (UT), and the lunar month for tithi rules.
+    """
+    rules = rules or FESTIVAL_RULES
+    engine = FestivalEngine(latitude, longitude, ayanamsa_mode)
+    first, last = date(year, 1, 1).toordinal(), date(year, 12, 31).toordinal()
+    start_jd = first + 1721424.5 - longitude / 360.0
+    end_jd = last + 1 + 1721424.5 - longitude / 360.0
+
+    # One lunation of margin so January's elements have their month, one day for kshaya lookahead
+    tithis = transitions_between("tithi", start_jd - 31, end_jd + 31, ayanamsa_mode)
+    months = lunar_months(tithis, ayanamsa_mode)
+    month_starts = [m.start_jd for m in months]
+    nakshatras = None
+
+    results = []
+    for rule in rules:
+        if rule.nakshatra is not None:
+            if nakshatras is None:
+                nakshatras = transitions_between("nakshatra", start_jd - 1, end_jd + 1, ayanamsa_mode)
+            candidates = [(t, None) for t in nakshatras if t.index + 1 == rule.nakshatra]
+        else:
+            candidates = []
+            for t in tithis:
+                if t.index + 1 not in rule.tithis or t.end_jd < start_jd - 1 or t.start_jd > end_jd + 1:
+                    continue
+                i = max(0, bisect.bisect_right(month_starts, t.start_jd) - 1)
+                candidates.append((t, months[i] if months else None))
+
+        matches = []
+        for element, month in candidates:
+            if rule.lunar_month and (month is None or month.adhika or month.name != rule.lunar_month):
+                continue
+            ordinal = engine.observance(element, rule.window)
+            if not first <= ordinal <= last:
+                continue
+            if rule.solar_month and SIGNS[_sun_sign(engine.day(ordinal).sunrise, ayanamsa_mode)] != rule.solar_month:
+                continue
+            matches.append((ordinal, element, month))
+
+        if rule.near_tithi and matches:
+            centres = [(t.start_jd + t.end_jd) / 2 for t in tithis if t.index + 1 == rule.near_tithi]
+            def distance(match):
+                centre = (match[1].start_jd + match[1].end_jd) / 2
+                return min(abs(centre - c) for c in centres)
+            matches = [min(matches, key=distance)]
+
+        for ordinal, element, month in matches:
+            results.append({
+                "name": rule.name,
+                "category": rule.category,
+                "date": date.fromordinal(ordinal).isoformat(),
+                "window": rule.window,
+                "tithi": tithi_name(element.index) if rule.nakshatra is None else None,
+                "nakshatra": NAKSHATRAS[element.index] if rule.nakshatra is not None else None,
+                "lunar_month": month.name if month else None,
+                "adhika": month.adhika if month else None,
+                "start_jd": element.start_jd,
+                "end_jd": element.end_jd,
+            })
+    results.sort(key=lambda r: (r["date"], r["name"]))
+    return results
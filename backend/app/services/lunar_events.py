@@ -0,0 +1,99 @@
+"""
+Shared cache of moonrise and moonset times.
+
+Moonrises and moonsets for a whole month at a location are computed in one
+forward sweep, where each rise (set) seeds the search for the next one, and
+kept per (quantized latitude, quantized longitude, year, month). The sweep
+covers the month with a day of margin on both sides, so any civil day of the
+month in any zone can be answered from its table with a binary search. Days
+without a moonrise or moonset (the Moon rises about 50 minutes later each day,
+so roughly one day a month has none, and more near the poles) are answered
+with None.
+
+Configuration (environment):
+    LUNAR_CACHE_SIZE  Max cached location-months (default 1024). Coordinates
+                      are quantized like the solar cache (SOLAR_CACHE_PRECISION).
+"""
+import os
+import bisect
+import swisseph as swe
+from datetime import date
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+from .solar_events import quantize, _local_midnight_jd
+from ..utils.local_time import local_midnight_jd
+
+LUNAR_CACHE_SIZE = int(os.getenv("LUNAR_CACHE_SIZE", "1024"))
+
+class MoonMonth(NamedTuple):
+    start_jd: float                # covered range, JD (UT)
+    end_jd: float
+    rises: Tuple[float, ...]       # JD (UT), ascending
+    sets: Tuple[float, ...]
+
+class MoonDay(NamedTuple):
+    moonrise: Optional[float]      # JD (UT); None when the Moon does not rise that day
+    moonset: Optional[float]
+
+def _sweep(start_jd: float, end_jd: float, flags: int, geopos: tuple) -> Tuple[float, ...]:
+    events = []
+    jd = start_jd
+    while jd < end_jd:
+        status, tret = swe.rise_trans(jd, swe.MOON, flags, geopos)
+        if status != 0:
+            # Circumpolar Moon: no event near `jd`, look again half a day later
+            jd += 0.5
+            continue
+        if tret[0] < end_jd:
+            events.append(tret[0])
+        jd = tret[0] + 1e-3
+    return tuple(events)
+
+@lru_cache(maxsize=LUNAR_CACHE_SIZE)
+def _moon_month(lat: float, lon: float, year: int, month: int) -> MoonMonth:
+    first = date(year, month, 1).toordinal()
+    following = date(year + month // 12, month % 12 + 1, 1).toordinal()
+    start_jd = _local_midnight_jd(first - 1, lon)
+    end_jd = _local_midnight_jd(following + 1, lon)
+    geopos = (lon, lat, 0)
+    return MoonMonth(start_jd, end_jd,
+                     _sweep(start_jd, end_jd, swe.CALC_RISE, geopos),
+                     _sweep(start_jd, end_jd, swe.CALC_SET, geopos))
+
+def moon_month(year: int, month: int, lat: float, lon: float) -> MoonMonth:
+    """Every moonrise and moonset of the month (plus a day each side) at the location."""
+    return _moon_month(*quantize(lat, lon), year, month)
+
+def _first_between(events: Tuple[float, ...], lo: float, hi: float) -> Optional[float]:
+    i = bisect.bisect_left(events, lo)
+    return events[i] if i < len(events) and events[i] < hi else None
+
+def moon_day(d: date, lat: float, lon: float, tz_name: str) -> MoonDay:
+    """Moonrise and moonset (JD UT) on civil date `d` in zone `tz_name`; the first one if there are two."""
+    table = moon_month(d.year, d.month, lat, lon)
+    lo, hi = local_midnight_jd(d, tz_name), local_midnight_jd(date.fromordinal(d.toordinal() + 1), tz_name)
+    return MoonDay(_first_between(table.rises, lo, hi), _first_between(table.sets, lo, hi))
+
+def next_moonrise(jd: float, lat: float, lon: float) -> float:
+    """The first moonrise at or after `jd` (UT)."""
+    lat_q, lon_q = quantize(lat, lon)
+    y, m, _, _ = swe.revjul(jd + lon_q / 360.0)
+    for _ in range(3):
+        table = _moon_month(lat_q, lon_q, y, m)
+        i = bisect.bisect_left(table.rises, jd)
+        if i < len(table.rises):
+            return table.rises[i]
+        y, m = y + m // 12, m % 12 + 1
+    return swe.rise_trans(jd, swe.MOON, swe.CALC_RISE, (lon_q, lat_q, 0))[1][0]
+
+def cache_stats() -> dict:
+    info = _moon_month.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "entries": info.currsize,
+        "max_entries": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_ratio": round(info.hits / lookups, 4) if lookups else 0.0,
+    }
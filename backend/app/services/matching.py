@@ -0,0 +1,236 @@
+"""
+Ashtakoota (Guna Milan) compatibility, one chart against many.
+
+The eight kootas depend only on the Moon's nakshatra (Tara, Yoni, Gana, Nadi)
+or the Moon's sign (Varna, Vashya, Graha Maitri, Bhakoot) of the groom and the
+bride, so every koota is tabulated once as a 27 x 27 or 12 x 12 matrix indexed
+[groom, bride]. Scoring a seeker against N candidates is then a gather from
+those matrices with the candidates' nakshatra and sign index arrays; the Moon
+(with the ascendant and Mars for Mangal dosha) of every saved chart is read
+from the `chart_natal` table that `transit_hits.sync_natal` keeps current, so
+no chart is recomputed.
+
+Mangal dosha: Mars in the 1st, 2nd, 4th, 7th, 8th or 12th sign from the
+ascendant or from the Moon. It is cancelled for a pair when both partners have
+it, or when Mars is in its own sign or exaltation (Aries, Scorpio, Capricorn)
+for every partner that has it.
+
+Signs are assigned whole to the Vashya groups (Sagittarius as Manava,
+Capricorn as Jalachara).
+"""
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..database import DBChart, DBChartNatal
+from ..engine import NAKSHATRAS, SIGNS, calculate_natal_points
+from ..models import BirthDetails
+
+NAKSHATRA_SPAN = 360.0 / 27.0
+
+KOOTAS = ("varna", "vashya", "tara", "yoni", "graha_maitri", "gana", "bhakoot", "nadi")
+KOOTA_MAX = {"varna": 1, "vashya": 2, "tara": 3, "yoni": 4, "graha_maitri": 5, "gana": 6, "bhakoot": 7, "nadi": 8}
+MAX_SCORE = sum(KOOTA_MAX.values())
+
+# --- sign attributes (Aries first) ---
+# Varna rank: Brahmin 4, Kshatriya 3, Vaishya 2, Shudra 1
+_VARNA = (3, 2, 1, 4, 3, 2, 1, 4, 3, 2, 1, 4)
+# Vashya group: 0 Chatushpada, 1 Manava, 2 Jalachara, 3 Vanachara, 4 Keeta
+_VASHYA = (0, 0, 1, 2, 3, 1, 1, 4, 1, 2, 1, 2)
+_VASHYA_SCORES = (
+    (2, 1, 1, 0.5, 1),
+    (1, 2, 0.5, 0, 1),
+    (1, 0.5, 2, 1, 1),
+    (0.5, 0, 1, 2, 0),
+    (1, 1, 1, 0, 2),
+)
+# Sign lords as indexes into _LORDS
+_LORDS = ("Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn")
+_SIGN_LORD = (2, 5, 3, 1, 0, 3, 5, 2, 4, 6, 6, 4)
+_MAITRI_SCORES = (
+    (5, 5, 5, 4, 5, 0, 0),
+    (5, 5, 4, 1, 4, 0.5, 0.5),
+    (5, 4, 5, 0.5, 5, 3, 0.5),
+    (4, 1, 0.5, 5, 0.5, 5, 4),
+    (5, 4, 5, 0.5, 5, 0.5, 3),
+    (0, 0.5, 3, 5, 0.5, 5, 5),
+    (0, 0.5, 0.5, 4, 3, 5, 5),
+)
+
+# --- nakshatra attributes (Ashwini first) ---
+YONIS = ("Horse", "Elephant", "Sheep", "Serpent", "Dog", "Cat", "Rat", "Cow",
+         "Buffalo", "Tiger", "Deer", "Monkey", "Mongoose", "Lion")
+_YONI = (0, 1, 2, 3, 3, 4, 5, 2, 5, 6, 6, 7, 8, 9, 8, 9, 10, 10, 4, 11, 12, 11, 13, 0, 13, 7, 1)
+_YONI_SCORES = (
+    (4, 2, 2, 3, 2, 2, 2, 1, 0, 1, 3, 3, 2, 1),
+    (2, 4, 3, 3, 2, 2, 2, 2, 3, 1, 2, 3, 2, 0),
+    (2, 3, 4, 2, 1, 2, 1, 3, 3, 1, 2, 0, 3, 1),
+    (3, 3, 2, 4, 2, 1, 1, 1, 1, 2, 2, 2, 0, 2),
+    (2, 2, 1, 2, 4, 2, 1, 2, 2, 1, 0, 2, 1, 1),
+    (2, 2, 2, 1, 2, 4, 0, 2, 2, 1, 3, 3, 2, 1),
+    (2, 2, 1, 1, 1, 0, 4, 2, 2, 2, 2, 2, 1, 2),
+    (1, 2, 3, 1, 2, 2, 2, 4, 3, 0, 3, 2, 2, 1),
+    (0, 3, 3, 1, 2, 2, 2, 3, 4, 1, 2, 2, 2, 1),
+    (1, 1, 1, 2, 1, 1, 2, 0, 1, 4, 1, 1, 2, 1),
+    (3, 2, 2, 2, 0, 3, 2, 3, 2, 1, 4, 2, 2, 1),
+    (3, 3, 0, 2, 2, 3, 2, 2, 2, 1, 2, 4, 3, 2),
+    (2, 2, 3, 0, 1, 2, 1, 2, 2, 2, 2, 3, 4, 2),
+    (1, 0, 1, 2, 1, 1, 2, 1, 1, 1, 1, 2, 2, 4),
+)
+GANAS = ("Deva", "Manushya", "Rakshasa")
+_GANA = (0, 1, 2, 1, 0, 1, 0, 0, 2, 2, 1, 1, 0, 2, 0, 2, 0, 2, 2, 1, 1, 0, 2, 2, 1, 1, 0)
+_GANA_SCORES = ((6, 6, 1), (5, 6, 0), (1, 0, 6))   # [groom, bride]
+NADIS = ("Aadi", "Madhya", "Antya")
+_NADI = tuple((0, 1, 2, 2, 1, 0)[i % 6] for i in range(27))
+
+def _build_matrices() -> Dict[str, np.ndarray]:
+    g = np.arange(12)[:, None]
+    b = np.arange(12)[None, :]
+    varna = np.array(_VARNA)
+    vashya = np.array(_VASHYA)
+    lord = np.array(_SIGN_LORD)
+    # Sign of the groom counted from the bride's (1-12); 2/12, 5/9 and 6/8 are inauspicious
+    count = (g - b) % 12 + 1
+    matrices = {
+        "varna": (varna[g] >= varna[b]).astype(float),
+        "vashya": np.array(_VASHYA_SCORES, dtype=float)[vashya[g], vashya[b]],
+        "graha_maitri": np.array(_MAITRI_SCORES, dtype=float)[lord[g], lord[b]],
+        "bhakoot": np.where(np.isin(count, (2, 12, 5, 9, 6, 8)), 0.0, 7.0),
+    }
+    g = np.arange(27)[:, None]
+    b = np.arange(27)[None, :]
+    # Tara counted both ways; 3rd, 5th and 7th (mod 9) are inauspicious, 1.5 points per good side
+    good = lambda n: ~np.isin((n % 27) % 9, (2, 4, 6))
+    yoni, gana, nadi = np.array(_YONI), np.array(_GANA), np.array(_NADI)
+    matrices.update({
+        "tara": 1.5 * good(g - b) + 1.5 * good(b - g),
+        "yoni": np.array(_YONI_SCORES, dtype=float)[yoni[g], yoni[b]],
+        "gana": np.array(_GANA_SCORES, dtype=float)[gana[g], gana[b]],
+        "nadi": np.where(nadi[g] == nadi[b], 0.0, 8.0),
+    })
+    return {k: matrices[k] for k in KOOTAS}
+
+KOOTA_MATRICES = _build_matrices()
+SIGN_SCORE = sum(KOOTA_MATRICES[k] for k in ("varna", "vashya", "graha_maitri", "bhakoot"))
+NAKSHATRA_SCORE = sum(KOOTA_MATRICES[k] for k in ("tara", "yoni", "gana", "nadi"))
+
+_DOSHA_HOUSES = np.array([1, 2, 4, 7, 8, 12])
+_MARS_STRONG_SIGNS = np.array([0, 7, 9])   # Aries, Scorpio, Capricorn
+
+class MatchProfiles(NamedTuple):
+    chart_ids: np.ndarray
+    names: List[str]
+    nakshatra: np.ndarray     # 0-26
+    sign: np.ndarray          # 0-11
+    manglik: np.ndarray       # bool
+    mars_strong: np.ndarray   # bool: Mars in own sign or exaltation
+
+def match_profiles(chart_ids, names: List[str], moon, ascendant, mars) -> MatchProfiles:
+    """Matching keys from sidereal Moon / ascendant / Mars longitudes (NaN ascendant or Mars: no dosha)."""
+    moon = np.asarray(moon, dtype=float)
+    ascendant = np.asarray(ascendant, dtype=float)
+    mars = np.asarray(mars, dtype=float)
+    sign = (moon // 30).astype(int) % 12
+    mars_sign = np.where(np.isnan(mars), -1, mars // 30).astype(int)
+    lagna = np.where(np.isnan(ascendant), -1, ascendant // 30).astype(int)
+
+    def dosha_from(base):
+        return (base >= 0) & (mars_sign >= 0) & np.isin((mars_sign - base) % 12 + 1, _DOSHA_HOUSES)
+
+    return MatchProfiles(
+        np.asarray(chart_ids), list(names),
+        (moon // NAKSHATRA_SPAN).astype(int) % 27, sign,
+        dosha_from(lagna) | dosha_from(sign),
+        np.isin(mars_sign, _MARS_STRONG_SIGNS),
+    )
+
+def select(profiles: MatchProfiles, indexes) -> MatchProfiles:
+    indexes = np.asarray(indexes, dtype=int)
+    return MatchProfiles(*(f[indexes] if isinstance(f, np.ndarray) else [f[i] for i in indexes.tolist()] for f in profiles))
+
+def birth_profile(details: BirthDetails, name: Optional[str] = None) -> MatchProfiles:
+    """Matching keys of unsaved birth data; runs in the ephemeris executor."""
+    moon, ascendant, _, mars = calculate_natal_points([details], details.ayanamsa_mode.value)[0]
+    if np.isnan(moon):
+        raise ValueError("Birth time could not be resolved")
+    return match_profiles(np.array([None]), [name], [moon], [ascendant], [mars])
+
+def load_match_library(db: Session) -> MatchProfiles:
+    """Matching keys of every saved chart with a known Moon in `chart_natal`."""
+    rows = (db.query(DBChart.id, DBChart.name, DBChartNatal.moon, DBChartNatal.ascendant, DBChartNatal.mars)
+            .join(DBChartNatal, DBChartNatal.chart_id == DBChart.id)
+            .filter(DBChartNatal.moon.isnot(None)).order_by(DBChart.id).all())
+    to_float = lambda v: np.nan if v is None else v
+    return match_profiles([r.id for r in rows], [r.name for r in rows],
+                          [r.moon for r in rows], [to_float(r.ascendant) for r in rows], [to_float(r.mars) for r in rows])
+
+def mangal_dosha(groom_manglik, groom_strong, bride_manglik, bride_strong):
+    """0 none, 1 cancelled, 2 present (element-wise)."""
+    any_dosha = groom_manglik | bride_manglik
+    cancelled = (groom_manglik & bride_manglik) | ((~groom_manglik | groom_strong) & (~bride_manglik | bride_strong))
+    return np.where(~any_dosha, 0, np.where(cancelled, 1, 2))
+
+DOSHA_STATES = ("none", "cancelled", "present")
+
+def score_pairs(grooms: MatchProfiles, g: np.ndarray, brides: MatchProfiles, b: np.ndarray) -> np.ndarray:
+    """Total guna scores of the pairs (grooms[g[i]], brides[b[i]]); index arrays broadcast."""
+    return (SIGN_SCORE[grooms.sign[g], brides.sign[b]]
+            + NAKSHATRA_SCORE[grooms.nakshatra[g], brides.nakshatra[b]])
+
+def koota_breakdown(groom: MatchProfiles, gi: int, bride: MatchProfiles, bi: int) -> Dict[str, float]:
+    keys = {"varna": "sign", "vashya": "sign", "graha_maitri": "sign", "bhakoot": "sign"}
+    return {k: float(KOOTA_MATRICES[k][getattr(groom, keys.get(k, "nakshatra"))[gi],
+                                       getattr(bride, keys.get(k, "nakshatra"))[bi]])
+            for k in KOOTAS}
+
+def describe(profiles: MatchProfiles, i: int) -> dict:
+    return {
+        "chart_id": None if profiles.chart_ids[i] is None else int(profiles.chart_ids[i]),
+        "name": profiles.names[i],
+        "nakshatra": NAKSHATRAS[profiles.nakshatra[i]],
+        "moon_sign": SIGNS[profiles.sign[i]],
+        "manglik": bool(profiles.manglik[i]),
+    }
+
+def search_matches(seeker: MatchProfiles, role: str, candidates: MatchProfiles, min_score: float = 0.0,
+                   exclude_dosha: bool = False, limit: int = 100) -> List[dict]:
+    """
+    Candidates ranked by guna score against `seeker` (a one-row profile) in `role`
+    ("groom" or "bride"); ties keep the candidate order.
+    """
+    everyone = np.arange(candidates.chart_ids.size)
+    if role == "groom":
+        scores = score_pairs(seeker, np.zeros_like(everyone), candidates, everyone)
+        dosha = mangal_dosha(seeker.manglik[0], seeker.mars_strong[0], candidates.manglik, candidates.mars_strong)
+    else:
+        scores = score_pairs(candidates, everyone, seeker, np.zeros_like(everyone))
+        dosha = mangal_dosha(candidates.manglik, candidates.mars_strong, seeker.manglik[0], seeker.mars_strong[0])
+    keep = scores >= min_score
+    if seeker.chart_ids[0] is not None:
+        keep &= candidates.chart_ids != seeker.chart_ids[0]
+    if exclude_dosha:
+        keep &= dosha != 2
+    chosen = np.flatnonzero(keep)
+    chosen = chosen[np.argsort(-scores[chosen], kind="stable")][:limit]
+
+    matches = []
+    for i in chosen.tolist():
+        kootas = (koota_breakdown(seeker, 0, candidates, i) if role == "groom"
+                  else koota_breakdown(candidates, i, seeker, 0))
+        matches.append({**describe(candidates, i), "score": float(scores[i]), "kootas": kootas,
+                        "mangal_dosha": DOSHA_STATES[dosha[i]]})
+    return matches
+
+def group_matrix(profiles: MatchProfiles) -> Dict[str, np.ndarray]:
+    """
+    N x N scores and Mangal dosha states, row = groom, column = bride. A chart is
+    not paired with itself: the diagonal holds NaN scores and dosha state -1.
+    """
+    g = np.arange(profiles.chart_ids.size)[:, None]
+    b = g.T
+    scores = score_pairs(profiles, g, profiles, b).astype(float)
+    dosha = mangal_dosha(profiles.manglik[g], profiles.mars_strong[g], profiles.manglik[b], profiles.mars_strong[b])
+    np.fill_diagonal(scores, np.nan)
+    np.fill_diagonal(dosha, -1)
+    return {"scores": scores, "mangal_dosha": dosha}
@@ -0,0 +1,263 @@
+"""
+Muhurta window search over a date range at one location.
+
+A query is a boolean expression over panchanga factors, for example
+
+    weekday in (Mon, Wed, Thu, Fri) and paksha = shukla
+    and nakshatra in (Rohini, Mrigashira, Hasta, 'Uttara Phalguni')
+    and hora in (Jupiter, Venus) and karana != Vishti
+    and not (rahu_kalam or yamagandam or gulika_kalam)
+
+Grammar (keywords and names are case-insensitive; a name with spaces is quoted
+or written with underscores):
+
+    expr      := term ('or' term)*
+    term      := factor ('and' factor)*
+    factor    := 'not' factor | '(' expr ')' | PERIOD
+               | FIELD ('=' | '!=') value
+               | FIELD ['not'] 'in' '(' value (',' value)* ')'
+
+    FIELD     tithi (1-30 or name), paksha (shukla, krishna), nakshatra (1-27
+              or name), yoga (1-27 or name), karana (name), weekday (name or
+              three-letter abbreviation; the Vedic day runs sunrise to
+              sunrise), hora (ruler, or good / neutral / bad), choghadiya
+              (name, or good / neutral / bad)
+    PERIOD    day, night, rahu_kalam, yamagandam, gulika_kalam, dur_muhurtham,
+              abhijit, brahma_muhurta
+
+Every factor becomes a sorted interval list over the searched range: tithi,
+nakshatra, yoga and karana from one `transitions_between` call each for the
+whole range, weekdays, horas, choghadiyas and kalams from the shared
+`DayContext` of each day. `and`, `or` and `not` are then linear merges of those
+lists (`utils.intervals`), so the cost is one pass over the elements in range
+rather than a sampling of every minute.
+"""
+import re
+from datetime import date
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from ..engine import NAKSHATRAS, YOGAS, WEEKDAYS, hora_spans, karana_name, tithi_name
+from ..transition_index import transitions_between
+from ..utils.intervals import Interval, clip, complement, intersect, merge, union
+from .day_context import CHOGHADIYA_CYCLE, WEEKDAY_LORDS, DayContext, day_context
+
+QUALITIES = ("good", "neutral", "bad")
+
+# Fields answered from the transition index: limb, element count, element name
+LIMB_FIELDS: Dict[str, Tuple[str, int, Callable[[int], str]]] = {
+    "tithi": ("tithi", 30, tithi_name),
+    "paksha": ("tithi", 30, lambda i: "Shukla" if i < 15 else "Krishna"),
+    "nakshatra": ("nakshatra", 27, lambda i: NAKSHATRAS[i]),
+    "yoga": ("yoga", 27, lambda i: YOGAS[i]),
+    "karana": ("karana", 60, karana_name),
+}
+
+DAY_FIELDS = ("weekday", "hora", "choghadiya")
+
+FIELDS = tuple(LIMB_FIELDS) + DAY_FIELDS
+
+PERIODS = ("day", "night", "rahu_kalam", "yamagandam", "gulika_kalam", "dur_muhurtham",
+           "abhijit", "brahma_muhurta")
+
+_TOKEN = re.compile(r"""\s*(?:(\(|\)|,|!=|=)|'([^']*)'|"([^"]*)"|([A-Za-z0-9_\-]+))""")
+
+class MuhurtaQueryError(ValueError):
+    """The query does not parse or names an unknown field or value."""
+
+def _norm(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+def _tokens(query: str) -> List[Tuple[str, str]]:
+    """(kind, text) pairs; kind is 'op', 'word' or 'value' (quoted)."""
+    tokens = []
+    pos = 0
+    query = query.rstrip()
+    while pos < len(query):
+        m = _TOKEN.match(query, pos)
+        if m is None:
+            raise MuhurtaQueryError(f"Unexpected character at position {pos}: {query[pos]!r}")
+        op, single, double, word = m.groups()
+        if op is not None:
+            tokens.append(("op", op))
+        elif word is not None:
+            tokens.append(("word", word))
+        else:
+            tokens.append(("value", single if single is not None else double))
+        pos = m.end()
+    return tokens
+
+def _matches(field: str, value: str) -> FrozenSet:
+    """The element indices (limb fields) or names / qualities (day fields) a value selects."""
+    key = _norm(value)
+    if field in LIMB_FIELDS:
+        _, count, name = LIMB_FIELDS[field]
+        if key.isdigit() and field not in ("paksha", "karana"):
+            n = int(key)
+            if not 1 <= n <= count:
+                raise MuhurtaQueryError(f"{field} number out of range: {value}")
+            return frozenset([n - 1])
+        found = frozenset(i for i in range(count) if _norm(name(i)) == key)
+    elif field == "weekday":
+        found = frozenset(i for i, w in enumerate(WEEKDAYS) if key in (_norm(w), _norm(w)[:3]))
+    elif field == "hora":
+        found = frozenset(q for q in QUALITIES + tuple(WEEKDAY_LORDS) if _norm(q) == key)
+    else:
+        found = frozenset(q for q in QUALITIES + tuple(c[0] for c in CHOGHADIYA_CYCLE) if _norm(q) == key)
+    if not found:
+        raise MuhurtaQueryError(f"Unknown {field}: {value}")
+    return found
+
+class _Parser:
+    def __init__(self, query: str):
+        self.tokens = _tokens(query)
+        self.pos = 0
+
+    def peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def keyword(self, word: str) -> bool:
+        token = self.peek()
+        if token is not None and token[0] == "word" and token[1].lower() == word:
+            self.pos += 1
+            return True
+        return False
+
+    def op(self, op: str) -> bool:
+        if self.peek() == ("op", op):
+            self.pos += 1
+            return True
+        return False
+
+    def expect_op(self, op: str):
+        if not self.op(op):
+            found = self.peek()
+            raise MuhurtaQueryError(f"Expected '{op}' but found {found[1]!r}" if found else f"Expected '{op}' at end of query")
+
+    def parse(self):
+        if not self.tokens:
+            raise MuhurtaQueryError("Empty query")
+        node = self.expr()
+        if self.peek() is not None:
+            raise MuhurtaQueryError(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def expr(self):
+        node = self.term()
+        while self.keyword("or"):
+            node = ("or", node, self.term())
+        return node
+
+    def term(self):
+        node = self.factor()
+        while self.keyword("and"):
+            node = ("and", node, self.factor())
+        return node
+
+    def value(self) -> str:
+        token = self.peek()
+        if token is None or token[0] == "op":
+            raise MuhurtaQueryError(f"Expected a value but found {token[1]!r}" if token else "Expected a value at end of query")
+        self.pos += 1
+        return token[1]
+
+    def factor(self):
+        if self.keyword("not"):
+            return ("not", self.factor())
+        if self.op("("):
+            node = self.expr()
+            self.expect_op(")")
+            return node
+        token = self.peek()
+        if token is None or token[0] != "word":
+            raise MuhurtaQueryError(f"Expected a field or period but found {token[1]!r}" if token else "Unexpected end of query")
+        self.pos += 1
+        name = token[1].lower()
+        if name in PERIODS:
+            return ("period", name)
+        if name not in FIELDS:
+            raise MuhurtaQueryError(f"Unknown field or period: {token[1]}")
+        if self.op("="):
+            return ("is", name, _matches(name, self.value()))
+        if self.op("!="):
+            return ("not", ("is", name, _matches(name, self.value())))
+        negate = self.keyword("not")
+        if not self.keyword("in"):
+            raise MuhurtaQueryError(f"Expected '=', '!=' or 'in' after {token[1]}")
+        self.expect_op("(")
+        selected = set(_matches(name, self.value()))
+        while self.op(","):
+            selected |= _matches(name, self.value())
+        self.expect_op(")")
+        node = ("is", name, frozenset(selected))
+        return ("not", node) if negate else node
+
+def parse_query(query: str):
+    """Parse a muhurta query into its expression tree; raises MuhurtaQueryError."""
+    return _Parser(query).parse()
+
+class MuhurtaSearch:
+    """Evaluates queries over the Vedic days from `start` to `end` (inclusive) at one location."""
+
+    def __init__(self, start: date, end: date, lat: float, lon: float, ayanamsa_mode: str = "LAHIRI"):
+        self.lat, self.lon = lat, lon
+        self.ayanamsa_mode = ayanamsa_mode
+        self.days: List[DayContext] = [day_context(date.fromordinal(o), lat, lon)
+                                       for o in range(start.toordinal(), end.toordinal() + 1)]
+        self.start_jd = self.days[0].sunrise
+        self.end_jd = self.days[-1].next_sunrise
+        self._limbs: Dict[str, list] = {}
+
+    def _transitions(self, limb: str) -> list:
+        found = self._limbs.get(limb)
+        if found is None:
+            found = self._limbs[limb] = transitions_between(limb, self.start_jd, self.end_jd, self.ayanamsa_mode)
+        return found
+
+    def _field(self, field: str, selected: FrozenSet) -> List[Interval]:
+        if field in LIMB_FIELDS:
+            limb = LIMB_FIELDS[field][0]
+            return merge((t.start_jd, t.end_jd) for t in self._transitions(limb) if t.index in selected)
+        if field == "weekday":
+            return merge((ctx.sunrise, ctx.next_sunrise) for ctx in self.days if ctx.weekday in selected)
+        if field == "hora":
+            return merge((h.start_jd, h.end_jd) for ctx in self.days
+                         for h in hora_spans(ctx.date, self.lat, self.lon)
+                         if h.ruler in selected or h.quality.lower() in selected)
+        return merge((p.start_jd, p.end_jd) for ctx in self.days
+                     for p in ctx.choghadiya() + ctx.choghadiya(night=True)
+                     if p.name in selected or p.quality.lower() in selected)
+
+    def _period(self, name: str) -> List[Interval]:
+        if name == "day":
+            spans = ((ctx.sunrise, ctx.sunset) for ctx in self.days)
+        elif name == "night":
+            spans = ((ctx.sunset, ctx.next_sunrise) for ctx in self.days)
+        elif name == "dur_muhurtham":
+            spans = (span for ctx in self.days for span in ctx.dur_muhurtham())
+        else:
+            spans = (getattr(ctx, name)() for ctx in self.days)
+        # Per-day spans come in table order (Monday's Dur Muhurtham is the 9th, then the 2nd)
+        return merge(sorted(spans))
+
+    def evaluate(self, node) -> List[Interval]:
+        kind = node[0]
+        if kind == "and":
+            return intersect(self.evaluate(node[1]), self.evaluate(node[2]))
+        if kind == "or":
+            return union(self.evaluate(node[1]), self.evaluate(node[2]))
+        if kind == "not":
+            return complement(self.evaluate(node[1]), self.start_jd, self.end_jd)
+        if kind == "period":
+            return self._period(node[1])
+        return self._field(node[1], node[2])
+
+    def windows(self, query: str, min_duration_minutes: float = 0.0) -> List[Interval]:
+        """Windows (JD UT) in the range where the query holds, at least `min_duration_minutes` long."""
+        found = clip(self.evaluate(parse_query(query)), self.start_jd, self.end_jd)
+        minimum = min_duration_minutes / 1440.0
+        return [w for w in found if w[1] - w[0] >= minimum]
+
+def search_muhurta(query: str, start: date, end: date, lat: float, lon: float, ayanamsa_mode: str = "LAHIRI",
+                   min_duration_minutes: float = 0.0) -> List[Interval]:
+    """Windows (JD UT) between the sunrise of `start` and the sunrise after `end` where `query` holds."""
+    return MuhurtaSearch(start, end, lat, lon, ayanamsa_mode).windows(query, min_duration_minutes)
@@ -1,6 +1,8 @@
 import swisseph as swe
-from datetime import datetime, timedelta, date, time
+from datetime import datetime, date, time
 from typing import List, Tuple, Dict
+from .day_context import DayContext
+from ..utils.local_time import jd_to_local
 from ..panchang_models import (
     TimeRange, TithiDetail, NakshatraDetail, KaranaDetail,
     YogaDetail, GowriPeriod, GowriPanchangam, VaaraSoolai,
@@ -66,22 +68,14 @@ def format_time_12h(dt: datetime) -> str:
     """Format datetime to 12-hour format"""
     return dt.strftime("%I:%M %p").lstrip('0').replace(' 0', ' ')
 
-def calculate_gowri_panchangam(sunrise: datetime, sunset: datetime, weekday_idx: int) -> GowriPanchangam:
+def calculate_gowri_panchangam(ctx: DayContext, tz_name: str) -> GowriPanchangam:
     """
     Calculate Gowri Panchangam
-    Divides day into 8 parts and night into 8 parts
+    Divides day into 8 parts and night (sunset to the real next sunrise) into 8 parts,
+    taken from the day's DayContext.
     Period order rotates based on weekday.
     """
-    # Day duration
-    day_duration = (sunset - sunrise).total_seconds()
-    day_part = timedelta(seconds=day_duration / 8)
-    
-    # Night duration (sunset to next sunrise)
-    next_sunrise = sunrise + timedelta(days=1)
-    night_duration = (next_sunrise - sunset).total_seconds()
-    night_part = timedelta(seconds=night_duration / 8)
-    
-    # Gowri order base per Weekday (0=Mon, 6=Sun)
+    # Gowri order base per Weekday
     # Mapping: Weekday -> Start Index in [Uthi, Amridha...] or specific sequence
     # Common mappings:
     # Sun: Uthi, Amridha, Rogam, Labam, Dhanam, Sugam, Soram, Visham (Standard)
@@ -98,67 +92,31 @@ def calculate_gowri_panchangam(sunrise: datetime, sunset: datetime, weekday_idx:
     # Fri: Sugam, Soram, Visham, Uthi, Amridha, Rogam, Labam, Dhanam
     # Sat: Soram, Visham, Uthi, Amridha, Rogam, Labam, Dhanam, Sugam
     
-    # Note: Python Weekday 0=Mon, 6=Sun
-    # Map Python weekday to shift
-    # Sun(6) -> 0 shift
-    # Mon(0) -> 1 shift
-    # Tue(1) -> 2 shift
-    # etc...
-    # So Shift = (weekday_idx + 1) % 7 if we treat Sun as 0? No.
-    # Mon(0): shift 1
-    # Tue(1): shift 2
-    # Wed(2): shift 3
-    # Thu(3): shift 4
-    # Fri(4): shift 5
-    # Sat(5): shift 6
-    # Sun(6): shift 0
-    
-    shift = (weekday_idx + 1) % 7
-    
-    # Calculate day periods
-    day_periods = []
-    current_time = sunrise
-    for i in range(8):
-        idx = (i + shift) % 8
-        period_name = GOWRI_PERIODS[idx]
-        is_auspicious = idx in GOWRI_AUSPICIOUS_INDICES
-        
-        day_periods.append(GowriPeriod(
-            name=period_name,
-            start_time=format_time_12h(current_time),
-            end_time=format_time_12h(current_time + day_part),
-            is_auspicious=is_auspicious
-        ))
-        current_time += day_part
-    
+    # Shift = weekday counted from Sunday (DayContext.weekday: Sun 0, Mon 1, ... Sat 6)
+    shift = ctx.weekday
+
+    def periods(first, night):
+        bounds = [jd_to_local(jd, tz_name) for jd in ctx.parts(8, night)]
+        result = []
+        for i in range(8):
+            idx = (i + first) % 8
+            result.append(GowriPeriod(
+                name=GOWRI_PERIODS[idx],
+                start_time=format_time_12h(bounds[i]),
+                end_time=format_time_12h(bounds[i + 1]),
+                is_auspicious=idx in GOWRI_AUSPICIOUS_INDICES
+            ))
+        return result
+
     # Night Periods
     # Can be different order. Often starts with specific period.
     # Detailed lookup is best, but for MVP standard logic:
-    # Day + 4 shift is common approximation or independent lookup?
-    # Let's use standard rotation for Night:
-    # Sun Night: Labam... (Starts from 5th of Day Sequence?)
     # Let's rely on the plan's logic: "Shifted by 4 from day"
-    
     night_shift = (shift + 4) % 8
-    
-    night_periods = []
-    current_time = sunset
-    for i in range(8):
-        idx = (i + night_shift) % 8
-        period_name = GOWRI_PERIODS[idx]
-        is_auspicious = idx in GOWRI_AUSPICIOUS_INDICES
-        
-        night_periods.append(GowriPeriod(
-            name=period_name,
-            start_time=format_time_12h(current_time),
-            end_time=format_time_12h(current_time + night_part),
-            is_auspicious=is_auspicious
-        ))
-        current_time += night_part
-    
+
     return GowriPanchangam(
-        day_periods=day_periods,
-        night_periods=night_periods
+        day_periods=periods(shift, False),
+        night_periods=periods(night_shift, True)
     )
 
 def calculate_vaara_soolai(weekday: str) -> VaaraSoolai:
@@ -0,0 +1,92 @@
+"""
+Shared cache of daily solar events.
+
+Sunrise, sunset and next sunrise for a civil date are computed once per
+(quantized latitude, quantized longitude, date) and reused by chart, panchanga,
+hora and special-time calculations. The search starts at local mean midnight
+(UT midnight shifted by longitude), so the events belong to the local civil day
+at any longitude; sunset is the first one after sunrise and next sunrise the
+first one after sunset. Events are computed at the quantized coordinates, so a
+cached value never depends on which caller filled it.
+
+Configuration (environment):
+    SOLAR_CACHE_PRECISION  Decimal places kept from lat/lon (default 3, ~110 m,
+                           under 0.2 s of sunrise time).
+    SOLAR_CACHE_SIZE       Max cached location-days per event kind (default 8192).
+"""
+import os
+import swisseph as swe
+from datetime import date
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+SOLAR_CACHE_PRECISION = int(os.getenv("SOLAR_CACHE_PRECISION", "3"))
+SOLAR_CACHE_SIZE = int(os.getenv("SOLAR_CACHE_SIZE", "8192"))
+
+class SolarDay(NamedTuple):
+    sunrise: float       # JD (UT)
+    sunset: float
+    next_sunrise: float
+
+def quantize(lat: float, lon: float) -> Tuple[float, float]:
+    return round(lat, SOLAR_CACHE_PRECISION), round(lon, SOLAR_CACHE_PRECISION)
+
+def _local_midnight_jd(ordinal: int, lon: float) -> float:
+    d = date.fromordinal(ordinal)
+    return swe.julday(d.year, d.month, d.day, 0.0) - lon / 360.0
+
+def _next_event(jd_start: float, flags: int, geopos: tuple) -> float:
+    return swe.rise_trans(jd_start, swe.SUN, flags, geopos)[1][0]
+
+@lru_cache(maxsize=SOLAR_CACHE_SIZE)
+def _sunrise(lat: float, lon: float, ordinal: int) -> float:
+    return _next_event(_local_midnight_jd(ordinal, lon), swe.CALC_RISE, (lon, lat, 0))
+
+@lru_cache(maxsize=SOLAR_CACHE_SIZE)
+def _solar_day(lat: float, lon: float, ordinal: int) -> SolarDay:
+    geopos = (lon, lat, 0)
+    rise = _sunrise(lat, lon, ordinal)
+    sett = _next_event(rise, swe.CALC_SET, geopos)
+    next_rise = _next_event(sett, swe.CALC_RISE, geopos)
+    return SolarDay(rise, sett, next_rise)
+
+def solar_day(d: date, lat: float, lon: float) -> SolarDay:
+    """Sunrise, sunset and next sunrise (JD UT) of civil date `d` at the location."""
+    return _solar_day(*quantize(lat, lon), d.toordinal())
+
+def sunrise(d: date, lat: float, lon: float) -> float:
+    """Sunrise (JD UT) of civil date `d` alone, when the rest of the solar day is not needed."""
+    return _sunrise(*quantize(lat, lon), d.toordinal())
+
+def following_day(day: SolarDay, lat: float, lon: float) -> SolarDay:
+    """The solar day after `day`, starting at its next sunrise (two searches instead of three)."""
+    lat_q, lon_q = quantize(lat, lon)
+    geopos = (lon_q, lat_q, 0)
+    sett = _next_event(day.next_sunrise, swe.CALC_SET, geopos)
+    return SolarDay(day.next_sunrise, sett, _next_event(sett, swe.CALC_RISE, geopos))
+
+def vedic_day(jd: float, lat: float, lon: float) -> SolarDay:
+    """The solar day whose sunrise..next sunrise span contains `jd`."""
+    lat_q, lon_q = quantize(lat, lon)
+    y, m, d, _ = swe.revjul(jd + lon_q / 360.0)
+    ordinal = date(y, m, d).toordinal()
+    day = _solar_day(lat_q, lon_q, ordinal)
+    if jd < day.sunrise:
+        day = _solar_day(lat_q, lon_q, ordinal - 1)
+    elif jd >= day.next_sunrise:
+        day = _solar_day(lat_q, lon_q, ordinal + 1)
+    return day
+
+def cache_stats() -> dict:
+    stats = {}
+    for name, fn in (("solar_day", _solar_day), ("sunrise", _sunrise)):
+        info = fn.cache_info()
+        lookups = info.hits + info.misses
+        stats[name] = {
+            "entries": info.currsize,
+            "max_entries": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_ratio": round(info.hits / lookups, 4) if lookups else 0.0,
+        }
+    return stats
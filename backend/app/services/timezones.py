@@ -0,0 +1,77 @@
+"""
+Shared timezone resolution.
+
+One `TimezoneFinder` per process (built on first use) answers every
+coordinate-to-timezone lookup. Results are memoized per quantized
+(latitude, longitude) and pytz zone objects per name, so hot paths such as
+converting many timestamps for one location cost a dict lookup each.
+
+Configuration (environment):
+    TIMEZONE_IN_MEMORY        Load the timezone polygons into memory instead of
+                              reading the data files on demand (default off;
+                              roughly doubles the finder's memory).
+    TIMEZONE_CACHE_PRECISION  Decimal places kept from lat/lon (default 3, ~110 m).
+    TIMEZONE_CACHE_SIZE       Max cached coordinates (default 16384).
+"""
+import os
+import logging
+import threading
+from functools import lru_cache
+from typing import Optional
+
+import pytz
+from timezonefinder import TimezoneFinder
+
+logger = logging.getLogger(__name__)
+
+TIMEZONE_IN_MEMORY = os.getenv("TIMEZONE_IN_MEMORY", "").lower() in ("1", "true", "yes")
+TIMEZONE_CACHE_PRECISION = int(os.getenv("TIMEZONE_CACHE_PRECISION", "3"))
+TIMEZONE_CACHE_SIZE = int(os.getenv("TIMEZONE_CACHE_SIZE", "16384"))
+
+_finder_lock = threading.Lock()
+_finder: Optional[TimezoneFinder] = None
+
+def get_finder() -> TimezoneFinder:
+    """The process-wide TimezoneFinder."""
+    global _finder
+    if _finder is None:
+        with _finder_lock:
+            if _finder is None:
+                _finder = TimezoneFinder(in_memory=TIMEZONE_IN_MEMORY)
+                logger.info(f"TimezoneFinder ready (in_memory={TIMEZONE_IN_MEMORY})")
+    return _finder
+
+@lru_cache(maxsize=TIMEZONE_CACHE_SIZE)
+def _timezone_at(lat: float, lon: float) -> Optional[str]:
+    return get_finder().timezone_at(lng=lon, lat=lat)
+
+def timezone_at(lat: float, lon: float) -> Optional[str]:
+    """IANA timezone name at the location, or None (e.g. open sea)."""
+    return _timezone_at(round(lat, TIMEZONE_CACHE_PRECISION), round(lon, TIMEZONE_CACHE_PRECISION))
+
+def timezone_name(lat: float, lon: float, default: str = "UTC") -> str:
+    """IANA timezone name at the location, falling back to `default`."""
+    return timezone_at(lat, lon) or default
+
+@lru_cache(maxsize=None)
+def get_zone(name: str) -> pytz.BaseTzInfo:
+    """Cached `pytz.timezone(name)`; raises `pytz.UnknownTimeZoneError` like it."""
+    return pytz.timezone(name)
+
+def zone_at(lat: float, lon: float) -> pytz.BaseTzInfo:
+    """pytz zone at the location (UTC where no zone is found)."""
+    return get_zone(timezone_name(lat, lon))
+
+def cache_stats() -> dict:
+    stats = {}
+    for name, fn in (("timezone_at", _timezone_at), ("zones", get_zone)):
+        info = fn.cache_info()
+        lookups = info.hits + info.misses
+        stats[name] = {
+            "entries": info.currsize,
+            "max_entries": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_ratio": round(info.hits / lookups, 4) if lookups else 0.0,
+        }
+    return stats
@@ -0,0 +1,214 @@
+"""
+Transit-to-natal hits across the saved chart library.
+
+A hit is a slow planet (Jupiter, Saturn, Rahu, Ketu) conjoining a chart's natal
+Moon or ascendant, or transit Saturn returning to natal Saturn. The time
+reported is the exact crossing of the natal longitude, so a retrograde loop
+gives up to three hits on the same point.
+
+The natal points of every saved chart are kept in the `chart_natal` table and
+recomputed only when the chart's birth data changes: `sync_natal` runs for the
+chart when it is saved, and for the whole library at startup and from
+`POST /admin/natal/sync` (catching rows written outside the API). Reads never
+sync, so a scan never runs `calculate_chart`. For the scan the points are loaded once into
+arrays, grouped by ayanamsa; each transiting body is sampled once per group
+over the window, and the natal longitudes crossed between two samples are
+found with a binary search over the sorted points. The work grows with the
+number of samples and hits, not with samples x charts.
+
+Configuration (environment):
+    TRANSIT_HIT_STEP  Sampling step in days (default 1.0); crossings are
+                      interpolated linearly between samples.
+"""
+import os
+import logging
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import swisseph as swe
+from sqlalchemy.orm import Session
+
+from .. import ephemeris
+from ..database import DBChart, DBChartNatal, SessionLocal
+from ..engine import calculate_natal_points
+from ..models import BirthDetails
+from .ephemeris_executor import ephemeris_executor
+
+logger = logging.getLogger(__name__)
+
+TRANSIT_HIT_STEP = float(os.getenv("TRANSIT_HIT_STEP", "1.0"))
+
+NATAL_POINTS = ("moon", "ascendant", "saturn", "mars")
+
+# Bumped when NATAL_POINTS changes, so existing rows are recomputed
+NATAL_VERSION = 2
+
+# (transiting body, natal point)
+TRANSIT_HIT_RULES = (
+    ("Jupiter", "moon"), ("Jupiter", "ascendant"),
+    ("Saturn", "moon"), ("Saturn", "ascendant"), ("Saturn", "saturn"),
+    ("Rahu", "moon"), ("Rahu", "ascendant"),
+    ("Ketu", "moon"), ("Ketu", "ascendant"),
+)
+
+HIT_BODIES = ("Jupiter", "Saturn", "Rahu", "Ketu")
+
+_BODY_IDS = {"Jupiter": swe.JUPITER, "Saturn": swe.SATURN, "Rahu": swe.TRUE_NODE, "Ketu": swe.TRUE_NODE}
+
+NATAL_CHUNK = 5000
+
+# One sync at a time per process, so concurrent syncs do not rewrite the same rows
+_sync_lock = threading.Lock()
+
+class NatalGroup(NamedTuple):
+    chart_ids: np.ndarray
+    names: List[str]
+    points: np.ndarray     # (n, len(NATAL_POINTS)), NaN where unknown
+
+def natal_source(chart) -> str:
+    """The birth data natal points depend on, as stored in `chart_natal.source`."""
+    return "|".join(str(v) for v in (NATAL_VERSION, chart.date, chart.time, chart.latitude, chart.longitude,
+                                      chart.ayanamsa_mode, chart.location_timezone or ""))
+
+def compute_natal_rows(charts: Sequence[tuple]) -> List[dict]:
+    """`chart_natal` rows for (id, source, date, time, lat, lon, mode, tz) tuples; runs in the ephemeris executor."""
+    rows = []
+    groups: Dict[str, list] = {}
+    for chart_id, source, *birth in charts:
+        date_str, time_str, lat, lon, mode, tz = birth
+        try:
+            details = BirthDetails(date=date_str, time=time_str, latitude=lat, longitude=lon,
+                                   ayanamsa_mode=mode, location_timezone=tz)
+        except Exception:
+            # Unusable birth data: store an empty row so it is not retried until the chart changes
+            rows.append({"chart_id": chart_id, "source": source, **{name: None for name in NATAL_POINTS}})
+            continue
+        groups.setdefault(details.ayanamsa_mode.value, []).append((chart_id, source, details))
+    for mode, members in groups.items():
+        points = calculate_natal_points([d for _, _, d in members], mode)
+        for (chart_id, source, _), row in zip(members, points.tolist()):
+            rows.append({"chart_id": chart_id, "source": source,
+                         **{name: None if np.isnan(v) else v for name, v in zip(NATAL_POINTS, row)}})
+    return rows
+
+def sync_natal(db: Session, chart_ids: Optional[Sequence[int]] = None) -> int:
+    """
+    Bring `chart_natal` up to date with `charts` (only the rows of `chart_ids` when
+    given); returns the number of rows (re)computed.
+    """
+    with _sync_lock:
+        return _sync_natal(db, chart_ids)
+
+def _sync_natal(db: Session, chart_ids: Optional[Sequence[int]]) -> int:
+    charts = db.query(DBChart.id, DBChart.date, DBChart.time, DBChart.latitude, DBChart.longitude,
+                      DBChart.ayanamsa_mode, DBChart.location_timezone)
+    known = db.query(DBChartNatal.chart_id, DBChartNatal.source)
+    if chart_ids is not None:
+        charts = charts.filter(DBChart.id.in_(chart_ids))
+        known = known.filter(DBChartNatal.chart_id.in_(chart_ids))
+    charts = charts.all()
+    known = dict(known.all())
+    stale = []
+    for c in charts:
+        source = natal_source(c)
+        if known.get(c.id) != source:
+            stale.append((c.id, source, c.date, c.time, c.latitude, c.longitude, c.ayanamsa_mode, c.location_timezone))
+    orphans = set(known) - {c.id for c in charts}
+
+    for i in range(0, len(stale), NATAL_CHUNK):
+        chunk = stale[i:i + NATAL_CHUNK]
+        rows = ephemeris_executor.run(compute_natal_rows, chunk)
+        db.query(DBChartNatal).filter(DBChartNatal.chart_id.in_([c[0] for c in chunk])).delete(synchronize_session=False)
+        db.bulk_insert_mappings(DBChartNatal, rows)
+    orphans = sorted(orphans)
+    for i in range(0, len(orphans), NATAL_CHUNK):
+        db.query(DBChartNatal).filter(DBChartNatal.chart_id.in_(orphans[i:i + NATAL_CHUNK])).delete(synchronize_session=False)
+    if stale or orphans:
+        db.commit()
+        logger.info(f"Natal points: {len(stale)} computed, {len(orphans)} removed")
+    return len(stale)
+
+def sync_natal_library() -> int:
+    """Full `sync_natal` in a session of its own (startup and admin use)."""
+    db = SessionLocal()
+    try:
+        return sync_natal(db)
+    finally:
+        db.close()
+
+def load_natal_library(db: Session) -> Dict[str, NatalGroup]:
+    """Every chart's natal points as arrays, grouped by ayanamsa mode."""
+    rows = (db.query(DBChart.id, DBChart.name, DBChart.ayanamsa_mode,
+                     *(getattr(DBChartNatal, name) for name in NATAL_POINTS))
+            .join(DBChartNatal, DBChartNatal.chart_id == DBChart.id)
+            .filter(DBChartNatal.moon.isnot(None)).all())
+    grouped: Dict[str, list] = {}
+    for row in rows:
+        grouped.setdefault(row.ayanamsa_mode, []).append(row)
+    library = {}
+    for mode, members in grouped.items():
+        points = np.array([[np.nan if v is None else v for v in m[3:]] for m in members], dtype=float)
+        library[mode] = NatalGroup(np.array([m.id for m in members]), [m.name for m in members], points)
+    return library
+
+def _track(body: str, jds: np.ndarray, mode: str) -> np.ndarray:
+    """Unwrapped sidereal longitudes of a transiting body."""
+    lon = ephemeris.calc_ut_array(jds, _BODY_IDS[body], mode)[:, 0]
+    if body == "Ketu":
+        lon = (lon + 180.0) % 360.0
+    return np.degrees(np.unwrap(np.radians(lon)))
+
+def crossings(jds: np.ndarray, lon: np.ndarray, natal: np.ndarray):
+    """
+    Every time the track (`jds`, unwrapped `lon`) passes a natal longitude.
+    Returns (natal row, JD, retrograde) arrays.
+    """
+    rows_known = np.flatnonzero(~np.isnan(natal))
+    order = rows_known[np.argsort(natal[rows_known], kind="stable")]
+    # Doubled so a range that wraps past 360 is one contiguous slice
+    points = np.concatenate([natal[order], natal[order] + 360.0])
+    members = np.concatenate([order, order])
+
+    a = np.minimum(lon[:-1], lon[1:])
+    b = np.maximum(lon[:-1], lon[1:])
+    base = np.floor(a / 360.0) * 360.0
+    lo = np.searchsorted(points, a - base, side="left")
+    hi = np.searchsorted(points, b - base, side="left")
+    counts = hi - lo
+    intervals = np.repeat(np.arange(counts.size), counts)
+    pos = np.arange(intervals.size) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(lo, counts)
+
+    target = points[pos] + base[intervals]
+    start, end = lon[intervals], lon[intervals + 1]
+    frac = (target - start) / (end - start)
+    jd = jds[intervals] + frac * (jds[intervals + 1] - jds[intervals])
+    return members[pos], jd, end < start
+
+def find_transit_hits(library: Dict[str, NatalGroup], start_jd: float, end_jd: float,
+                      bodies: Optional[Sequence[str]] = None) -> List[dict]:
+    """Hits of the rules in TRANSIT_HIT_RULES for `bodies` (default all) in [start_jd, end_jd], sorted by time."""
+    bodies = bodies or HIT_BODIES
+    count = max(2, int(np.ceil((end_jd - start_jd) / TRANSIT_HIT_STEP)) + 1)
+    jds = np.linspace(start_jd, end_jd, count)
+    hits = []
+    for mode, group in library.items():
+        for body in bodies:
+            lon = _track(body, jds, mode)
+            for rule_body, point in TRANSIT_HIT_RULES:
+                if rule_body != body:
+                    continue
+                rows, times, retro = crossings(jds, lon, group.points[:, NATAL_POINTS.index(point)])
+                kind = "saturn_return" if body == point.capitalize() else "conjunction"
+                for row, jd, r in zip(rows.tolist(), times.tolist(), retro.tolist()):
+                    hits.append({
+                        "chart_id": int(group.chart_ids[row]),
+                        "name": group.names[row],
+                        "body": body,
+                        "point": point,
+                        "kind": kind,
+                        "jd": jd,
+                        "retrograde": r,
+                    })
+    hits.sort(key=lambda h: (h["jd"], h["chart_id"]))
+    return hits
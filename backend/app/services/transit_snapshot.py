@@ -0,0 +1,157 @@
+"""
+Shared snapshot of the current transits.
+
+Transit positions are the same for every client, so they are computed once per
+time bucket (TRANSIT_REFRESH_SECONDS) for the bucket's start and served from
+memory, already serialized, with an ETag and a Cache-Control max-age that runs
+to the end of the bucket. Because the snapshot is pinned to the bucket start,
+every worker process produces identical bytes and ETags.
+
+An asyncio task started with the app refreshes the snapshot at each bucket
+boundary; a request that finds a stale snapshot (refresher not running, or
+lagging) computes it inline, once, under a lock. A failed calculation is never
+stored: the previous snapshot keeps being served (with max-age 0) until a
+refresh succeeds, and without one the request fails.
+
+Configuration (environment):
+    TRANSIT_REFRESH_SECONDS  Snapshot cadence in seconds (default 300).
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+from ..engine import get_current_transits, get_current_transits_extended
+from .ephemeris_executor import ephemeris_executor
+
+logger = logging.getLogger(__name__)
+
+TRANSIT_REFRESH_SECONDS = max(1, int(os.getenv("TRANSIT_REFRESH_SECONDS", "300")))
+
+class TransitDocument(NamedTuple):
+    body: bytes
+    etag: str
+
+class TransitSnapshot(NamedTuple):
+    bucket: int          # bucket number (epoch seconds // cadence)
+    at: datetime         # start of the bucket, UTC
+    expires: datetime    # end of the bucket
+    current: TransitDocument
+    extended: TransitDocument
+
+def _document(payload) -> TransitDocument:
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    return TransitDocument(body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+
+def compute_transits(at: datetime) -> tuple:
+    """Both transit payloads at `at`; runs in the ephemeris executor."""
+    current, extended = get_current_transits(at), get_current_transits_extended(at)
+    if not current or not extended:
+        raise RuntimeError(f"Transit calculation at {at.isoformat()} returned no bodies")
+    return current, extended
+
+class TransitSnapshots:
+    def __init__(self, cadence: int = TRANSIT_REFRESH_SECONDS):
+        self.cadence = cadence
+        self._snapshot: Optional[TransitSnapshot] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.inline_refreshes = 0
+        self.failures = 0
+
+    def bucket_at(self, now: Optional[float] = None) -> int:
+        return int((time.time() if now is None else now) // self.cadence)
+
+    def _build(self, bucket: int, payloads: tuple) -> TransitSnapshot:
+        at = datetime.fromtimestamp(bucket * self.cadence, timezone.utc)
+        current, extended = payloads
+        return TransitSnapshot(
+            bucket, at, at + timedelta(seconds=self.cadence),
+            _document(current),
+            _document({
+                "timestamp": at.replace(tzinfo=None).isoformat(),
+                "bodies": extended,
+                "next_update": (at + timedelta(seconds=self.cadence)).replace(tzinfo=None).isoformat(),
+            }),
+        )
+
+    def _store(self, snapshot: TransitSnapshot):
+        if self._snapshot is None or snapshot.bucket >= self._snapshot.bucket:
+            self._snapshot = snapshot
+        self.refreshes += 1
+
+    def get(self) -> TransitSnapshot:
+        """The snapshot for the current bucket, computing it inline if the refresher has not."""
+        bucket = self.bucket_at()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.bucket == bucket:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.bucket != bucket:
+                at = datetime.fromtimestamp(bucket * self.cadence, timezone.utc)
+                try:
+                    payloads = ephemeris_executor.run(compute_transits, at)
+                except Exception as e:
+                    if snapshot is None:
+                        raise
+                    self.failures += 1
+                    logger.error(f"Transit snapshot refresh failed, serving bucket {snapshot.bucket}: {e}")
+                    return snapshot
+                snapshot = self._build(bucket, payloads)
+                self._store(snapshot)
+                self.inline_refreshes += 1
+        return snapshot
+
+    async def refresh(self):
+        bucket = self.bucket_at()
+        at = datetime.fromtimestamp(bucket * self.cadence, timezone.utc)
+        payloads = await ephemeris_executor.run_async(compute_transits, at)
+        with self._lock:
+            self._store(self._build(bucket, payloads))
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The previous snapshot stays in place
+                self.failures += 1
+                logger.error(f"Transit snapshot refresh failed: {e}", exc_info=True)
+            # Wake just after the next bucket boundary
+            await asyncio.sleep(self.cadence - time.time() % self.cadence + 0.05)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"Transit snapshot refresher started (every {self.cadence}s)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "cadence_seconds": self.cadence,
+            "bucket_start": snapshot.at.isoformat() if snapshot else None,
+            "refreshes": self.refreshes,
+            "inline_refreshes": self.inline_refreshes,
+            "failures": self.failures,
+            "refresher_running": self._task is not None and not self._task.done(),
+        }
+
+transit_snapshots = TransitSnapshots()
@@ -0,0 +1,208 @@
+"""
+Transit event search: sign and nakshatra ingresses, retrograde stations and
+combustion windows.
+
+Each body is sampled on a grid whose step follows from its maximum speed (and
+its shortest retrograde loop), so that between two samples it can station at
+most once and never enters and leaves a combustion orb unseen. All samples of a
+body come from one vectorized `ephemeris.calc_ut_array` call. Stations are
+located first, where the speed changes sign, and the track is split there, so
+every remaining piece is monotonic: the ingresses inside a piece are exactly
+the span boundaries between its end longitudes. All crossings of all bodies are
+then refined together by vectorized bisection to TOLERANCE_DAYS.
+
+Longitudes are sidereal (ayanamsa as requested); Ketu is Rahu + 180 degrees.
+"""
+import math
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import ephemeris
+from .engine import PLANET_MAP, SIGNS, NAKSHATRAS
+
+EVENT_TYPES = ("sign_ingress", "nakshatra_ingress", "station", "combustion")
+
+NAKSHATRA_SPAN = 360.0 / 27.0
+
+TOLERANCE_DAYS = 1e-5   # ~1 s
+
+class BodyTrack(NamedTuple):
+    step: float          # sampling step in days
+    stations: bool       # report retrograde/direct stations
+
+# Steps keep each body under ~10 degrees per sample and several samples inside
+# its shortest retrograde loop. The true node wobbles (its speed changes sign
+# about twice a month), so it is sampled daily and its stations are not events.
+BODY_TRACKS = {
+    "Sun": BodyTrack(5.0, False),
+    "Moon": BodyTrack(0.5, False),
+    "Mercury": BodyTrack(2.0, True),
+    "Venus": BodyTrack(3.0, True),
+    "Mars": BodyTrack(5.0, True),
+    "Jupiter": BodyTrack(8.0, True),
+    "Saturn": BodyTrack(8.0, True),
+    "Uranus": BodyTrack(10.0, True),
+    "Neptune": BodyTrack(10.0, True),
+    "Pluto": BodyTrack(10.0, True),
+    "Rahu": BodyTrack(1.0, False),
+    "Ketu": BodyTrack(1.0, False),
+}
+
+# Combustion orbs in degrees from the Sun (direct, retrograde)
+COMBUSTION_ORBS = {
+    "Moon": (12.0, 12.0),
+    "Mars": (17.0, 17.0),
+    "Mercury": (14.0, 12.0),
+    "Jupiter": (11.0, 11.0),
+    "Venus": (10.0, 8.0),
+    "Saturn": (15.0, 15.0),
+}
+
+BODIES = tuple(BODY_TRACKS)
+
+class _Track(NamedTuple):
+    jds: np.ndarray
+    lon: np.ndarray      # unwrapped
+    speed: np.ndarray
+
+def _wrap180(angle):
+    return (angle + 180.0) % 360.0 - 180.0
+
+def _positions(body: str, jds: np.ndarray, ayanamsa_mode: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Sidereal longitude (0-360) and speed of a body at many JDs."""
+    pid = PLANET_MAP["Rahu" if body == "Ketu" else body]
+    xx = ephemeris.calc_ut_array(jds, pid, ayanamsa_mode)
+    lon = xx[:, 0] if body != "Ketu" else (xx[:, 0] + 180.0) % 360.0
+    return lon, xx[:, 3]
+
+def _bisect(f, lo: np.ndarray, hi: np.ndarray, f_lo_positive: np.ndarray) -> np.ndarray:
+    """Vectorized bisection of f (array -> array) over brackets [lo, hi], f changing sign in each."""
+    if lo.size == 0:
+        return lo
+    width = float(np.max(hi - lo))
+    for _ in range(max(1, math.ceil(math.log2(max(width, TOLERANCE_DAYS) / TOLERANCE_DAYS)))):
+        mid = (lo + hi) / 2
+        same = (f(mid) > 0) == f_lo_positive
+        lo = np.where(same, mid, lo)
+        hi = np.where(same, hi, mid)
+    return (lo + hi) / 2
+
+class TransitEventSearch:
+    """Events of several bodies between two JDs (UT)."""
+
+    def __init__(self, start_jd: float, end_jd: float, ayanamsa_mode: str = "LAHIRI"):
+        self.start_jd = start_jd
+        self.end_jd = end_jd
+        self.ayanamsa_mode = ayanamsa_mode
+        self._sun: Optional[_Track] = None
+
+    def _grid(self, step: float, pad: float = 0.0) -> np.ndarray:
+        count = max(2, math.ceil((self.end_jd - self.start_jd + 2 * pad) / step) + 1)
+        return np.linspace(self.start_jd - pad, self.end_jd + pad, count)
+
+    def _track(self, body: str, jds: np.ndarray) -> _Track:
+        lon, speed = _positions(body, jds, self.ayanamsa_mode)
+        return _Track(jds, np.degrees(np.unwrap(np.radians(lon))), speed)
+
+    def stations(self, body: str, track: _Track) -> Tuple[np.ndarray, np.ndarray]:
+        """Times where the speed changes sign, and whether the body turns retrograde there."""
+        i = np.nonzero(np.sign(track.speed[:-1]) != np.sign(track.speed[1:]))[0]
+        speed = lambda jds: _positions(body, jds, self.ayanamsa_mode)[1]
+        times = _bisect(speed, track.jds[i], track.jds[i + 1], track.speed[i] > 0)
+        return times, track.speed[i] > 0
+
+    def _split(self, body: str, track: _Track, station_jds: np.ndarray) -> _Track:
+        """Insert the stations into the track so every interval is monotonic."""
+        if station_jds.size == 0:
+            return track
+        lon, speed = _positions(body, station_jds, self.ayanamsa_mode)
+        jds = np.concatenate([track.jds, station_jds])
+        order = np.argsort(jds, kind="stable")
+        raw = np.concatenate([track.lon % 360.0, lon])[order]
+        unwrapped = np.degrees(np.unwrap(np.radians(raw)))
+        return _Track(jds[order], unwrapped, np.concatenate([track.speed, speed])[order])
+
+    def ingresses(self, body: str, track: _Track, span: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Times of span-boundary crossings and the index of the element entered."""
+        k = np.floor(track.lon / span).astype(np.int64)
+        counts = np.abs(np.diff(k))
+        rows = np.repeat(np.arange(k.size - 1), counts)
+        if rows.size == 0:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        forward = k[rows + 1] > k[rows]
+        # Position of each crossing within its interval: 1..count
+        nth = np.arange(rows.size) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+        boundary = np.where(forward, k[rows] + nth, k[rows] - nth + 1)
+        targets = boundary * span
+        entered = np.where(forward, boundary, boundary - 1)
+        lon0 = track.lon[rows]
+        f = lambda jds: _wrap180(_positions(body, jds, self.ayanamsa_mode)[0] - targets % 360.0)
+        # f(lo) < 0 when moving forward (before the boundary), > 0 when moving backward
+        times = _bisect(f, track.jds[rows], track.jds[rows + 1], _wrap180(lon0 - targets) > 0)
+        return times, entered % round(360.0 / span)
+
+    def combustion(self, body: str, track: _Track) -> List[Tuple[Optional[float], Optional[float]]]:
+        """(start, end) JDs of the windows within the orb of the Sun; None where it runs past the range."""
+        direct_orb, retro_orb = COMBUSTION_ORBS[body]
+        sun_lon, _ = _positions("Sun", track.jds, self.ayanamsa_mode)
+
+        def excess(lon, speed, sun):
+            return np.abs(_wrap180(lon - sun)) - np.where(speed < 0, retro_orb, direct_orb)
+
+        g = excess(track.lon % 360.0, track.speed, sun_lon)
+        i = np.nonzero(np.sign(g[:-1]) != np.sign(g[1:]))[0]
+
+        def f(jds):
+            lon, speed = _positions(body, jds, self.ayanamsa_mode)
+            return excess(lon, speed, _positions("Sun", jds, self.ayanamsa_mode)[0])
+
+        times = _bisect(f, track.jds[i], track.jds[i + 1], g[i] > 0)
+        windows = []
+        start = None if g[0] < 0 else False
+        for t, entering in zip(times.tolist(), (g[i] > 0).tolist()):
+            if entering:
+                start = t
+            elif start is not False:
+                windows.append((start, t))
+                start = False
+        if start is not False:
+            windows.append((start, None))
+        return windows
+
+    def search(self, bodies: Sequence[str] = BODIES, types: Sequence[str] = EVENT_TYPES) -> List[dict]:
+        events = []
+        for body in bodies:
+            spec = BODY_TRACKS[body]
+            step = spec.step
+            combust = "combustion" in types and body in COMBUSTION_ORBS
+            track = self._track(body, self._grid(step))
+            station_jds, to_retro = self.stations(body, track)
+            if spec.stations and "station" in types:
+                for jd, retro in zip(station_jds.tolist(), to_retro.tolist()):
+                    events.append({"type": "station", "body": body, "jd": jd,
+                                   "direction": "retrograde" if retro else "direct"})
+            split = self._split(body, track, station_jds)
+            for kind, span, names in (("sign_ingress", 30.0, SIGNS), ("nakshatra_ingress", NAKSHATRA_SPAN, NAKSHATRAS)):
+                if kind not in types:
+                    continue
+                times, entered = self.ingresses(body, split, span)
+                key = "sign" if kind == "sign_ingress" else "nakshatra"
+                for jd, index in zip(times.tolist(), entered.tolist()):
+                    events.append({"type": kind, "body": body, "jd": jd, key: names[index]})
+            if combust:
+                for start, end in self.combustion(body, split):
+                    events.append({"type": "combustion", "body": body, "jd": start if start is not None else self.start_jd,
+                                   "start_jd": start, "end_jd": end})
+        events.sort(key=lambda e: e["jd"])
+        return events
+
+def find_transit_events(start_jd: float, end_jd: float, bodies: Optional[Sequence[str]] = None,
+                        types: Optional[Sequence[str]] = None, ayanamsa_mode: str = "LAHIRI") -> List[dict]:
+    """
+    Transit events between two JDs (UT), sorted by time. Every event has `type`, `body`
+    and `jd`; ingresses add the `sign` or `nakshatra` entered, stations the new
+    `direction`, combustion windows `start_jd`/`end_jd` (None where the window
+    extends past the range).
+    """
+    return TransitEventSearch(start_jd, end_jd, ayanamsa_mode).search(bodies or BODIES, types or EVENT_TYPES)
@@ -0,0 +1,240 @@
+"""
+Precomputed panchanga transition index.
+
+Tithi, karana, nakshatra and yoga boundaries are instants that do not depend on
+the location. The build step walks through the covered years with the
+transition solver on Swiss Ephemeris and stores every boundary JD as a sorted
+float64 array in one memory-mapped file (see `utils.mmap_tables`). Tithi and
+karana depend only on the Moon-Sun elongation, so they are stored once;
+nakshatra and yoga are stored per ayanamsa. Finding the element running at a
+JD, or every element overlapping a range, is then a binary search over a
+mapped array with no ephemeris call.
+
+Build / verify (from backend/, with EPHEME_PATH set):
+    python -m app.transition_index build [--out PATH] [--start YEAR] [--end YEAR] [--ayanamsa LAHIRI,RAMAN]
+    python -m app.transition_index report [--samples N]
+
+At runtime the index is loaded from TRANSITION_INDEX (default
+`$EPHEME_PATH/transitions.bin`) if the file exists; otherwise, outside the
+covered range and for ayanamsas that were not built, callers fall back to
+`transitions.TransitionSolver`.
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import swisseph as swe
+
+from .ephemeris import AYANAMSA_MAP
+from .transitions import LIMBS, PanchangaTransitions, Transition, TransitionSolver
+from .utils.mmap_tables import MappedTables, write_tables
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+DEFAULT_START_YEAR = 1900
+DEFAULT_END_YEAR = 2100
+
+# Limbs whose angle does not depend on the ayanamsa
+ELONGATION_LIMBS = ("tithi", "karana")
+
+def default_index_path() -> str:
+    return os.getenv("TRANSITION_INDEX") or os.path.join(os.getenv("EPHEME_PATH", "/app/ephemeris"), "transitions.bin")
+
+def array_name(limb: str, ayanamsa_mode: str) -> str:
+    return limb if limb in ELONGATION_LIMBS else f"{limb}_{ayanamsa_mode}"
+
+def _boundaries(walked: List[Transition]) -> np.ndarray:
+    return np.array([t.start_jd for t in walked] + [walked[-1].end_jd])
+
+def build_index(path: str, start_jd: float, end_jd: float, ayanamsa_modes: Optional[List[str]] = None):
+    """Solve every boundary in [start_jd, end_jd] on Swiss Ephemeris and write the index file."""
+    ayanamsa_modes = ayanamsa_modes or list(AYANAMSA_MAP)
+    header = {"version": INDEX_VERSION, "start_jd": start_jd, "end_jd": end_jd, "limbs": {}}
+    arrays = {}
+
+    def add(name: str, limb: str, walked: List[Transition]):
+        arrays[name] = _boundaries(walked)
+        header["limbs"][name] = {"limb": limb, "first_index": walked[0].index}
+        logger.info(f"Built {name}: {len(walked)} transitions in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    solver = TransitionSolver("SAYANA", high_precision=True)
+    tithis = solver.walk("tithi", start_jd, end_jd)
+    add("tithi", "tithi", tithis)
+    started = time.perf_counter()
+    karanas = []
+    for i, tithi in enumerate(tithis):
+        karanas.extend(solver.karanas(tithi))
+        if i % 1000 == 0:
+            solver.clear()
+    add("karana", "karana", karanas)
+
+    for mode in ayanamsa_modes:
+        solver = TransitionSolver(mode, high_precision=True)
+        for limb in ("nakshatra", "yoga"):
+            started = time.perf_counter()
+            add(array_name(limb, mode), limb, solver.walk(limb, start_jd, end_jd))
+
+    write_tables(path, header, arrays)
+
+class TransitionIndex:
+    """Reader over an index file."""
+
+    def __init__(self, path: str):
+        self._tables = MappedTables(path)
+        header = self._tables.header
+        self.start_jd = header["start_jd"]
+        self.end_jd = header["end_jd"]
+        self._limbs = {}
+        for name, spec in header["limbs"].items():
+            boundaries = self._tables[name]
+            count = round(360.0 / LIMBS[spec["limb"]][0])
+            self._limbs[name] = (boundaries, spec["first_index"], count, float(boundaries[0]), float(boundaries[-1]))
+
+    def covers(self, limb: str, jd: float, ayanamsa_mode: str = "LAHIRI") -> bool:
+        spec = self._limbs.get(array_name(limb, ayanamsa_mode))
+        return spec is not None and spec[3] <= jd < spec[4]
+
+    def _transition(self, spec, i: int) -> Transition:
+        boundaries, first_index, count = spec[:3]
+        index = (first_index + i) % count
+        start, end = boundaries[i:i + 2].tolist()
+        return Transition(index, start, end, index * 360.0 / count)
+
+    def transition(self, limb: str, jd: float, ayanamsa_mode: str = "LAHIRI") -> Optional[Transition]:
+        """
+        The element running at `jd` with its start and end, or None when not covered.
+        `angle` is the angle at the element's start; the index holds no positions.
+        """
+        if not self.covers(limb, jd, ayanamsa_mode):
+            return None
+        spec = self._limbs[array_name(limb, ayanamsa_mode)]
+        return self._transition(spec, int(spec[0].searchsorted(jd, side="right")) - 1)
+
+    def between(self, limb: str, start_jd: float, end_jd: float, ayanamsa_mode: str = "LAHIRI") -> Optional[List[Transition]]:
+        """Every element overlapping [start_jd, end_jd], in order, or None when not covered."""
+        if not (self.covers(limb, start_jd, ayanamsa_mode) and self.covers(limb, end_jd, ayanamsa_mode)):
+            return None
+        spec = self._limbs[array_name(limb, ayanamsa_mode)]
+        first, last = (spec[0].searchsorted([start_jd, end_jd], side="right") - 1).tolist()
+        return [self._transition(spec, i) for i in range(first, last + 1)]
+
+_index_lock = threading.Lock()
+_index: Optional[TransitionIndex] = None
+_index_loaded = False
+
+def get_index() -> Optional[TransitionIndex]:
+    """The process-wide index reader, or None if no index file is installed."""
+    global _index, _index_loaded
+    if _index_loaded:
+        return _index
+    with _index_lock:
+        if not _index_loaded:
+            path = default_index_path()
+            if os.path.exists(path):
+                try:
+                    _index = TransitionIndex(path)
+                    logger.info(f"Loaded transition index from {path}")
+                except Exception as e:
+                    logger.warning(f"Could not load transition index {path}: {e}")
+            _index_loaded = True
+    return _index
+
+def _at(transition: Transition, angle: float, jd: float, span: float) -> Transition:
+    """`transition` with the sampled angle, kept inside the indexed element near its edges."""
+    low = transition.index * span
+    if int(angle / span) != transition.index:
+        angle = low if jd - transition.start_jd < transition.end_jd - jd else low + span * (1 - 1e-9)
+    return transition._replace(angle=angle)
+
+def lookup_panchanga(jd: float, ayanamsa_mode: str = "LAHIRI") -> PanchangaTransitions:
+    """
+    Like `transitions.panchanga_transitions`, from the index where it covers `jd`:
+    one Sun/Moon sample (for longitudes and completion) instead of a full solve.
+    """
+    solver = TransitionSolver(ayanamsa_mode)
+    index = get_index()
+    if index is None or not all(index.covers(limb, jd, ayanamsa_mode) for limb in LIMBS):
+        return solver.panchanga(jd)
+    limbs = {}
+    for limb, (span, _, _) in LIMBS.items():
+        angle, _ = solver.angle(limb, jd)
+        limbs[limb] = _at(index.transition(limb, jd, ayanamsa_mode), angle, jd, span)
+    sun, _, moon, _ = solver.sample(jd)
+    return PanchangaTransitions(limbs["tithi"], limbs["nakshatra"], limbs["yoga"], limbs["karana"], sun, moon, solver.evaluations)
+
+def transitions_between(limb: str, start_jd: float, end_jd: float, ayanamsa_mode: str = "LAHIRI") -> List[Transition]:
+    """Every element overlapping [start_jd, end_jd], from the index where it covers the range, else solved."""
+    index = get_index()
+    found = index.between(limb, start_jd, end_jd, ayanamsa_mode) if index is not None else None
+    if found is not None:
+        return found
+    solver = TransitionSolver(ayanamsa_mode)
+    if limb == "karana":
+        karanas = [k for t in solver.walk("tithi", start_jd, end_jd) for k in solver.karanas(t)]
+        return [k for k in karanas if k.end_jd > start_jd and k.start_jd <= end_jd]
+    return solver.walk(limb, start_jd, end_jd)
+
+def accuracy_report(index: TransitionIndex, samples: int = 500, seed: int = 0) -> Dict[str, dict]:
+    """Max / mean differences (seconds) of indexed boundaries against a fresh Swiss Ephemeris solve."""
+    rng = np.random.default_rng(seed)
+    report = {}
+    for name, (boundaries, *_) in index._limbs.items():
+        limb, _, mode = name.partition("_")
+        solver = TransitionSolver(mode or "LAHIRI", high_precision=True)
+        errors = []
+        for jd in rng.uniform(boundaries[0], boundaries[-1], samples):
+            ours = index.transition(limb, jd, mode or "LAHIRI")
+            ref = solver.transition(limb, jd)
+            if limb == "karana":
+                ref = solver.karana(jd, solver.transition("tithi", jd))
+            if ours.index != ref.index:
+                errors.append(np.inf)
+                continue
+            errors.append(max(abs(ours.start_jd - ref.start_jd), abs(ours.end_jd - ref.end_jd)) * 86400)
+        errors = np.array(errors)
+        report[name] = {
+            "transitions": len(boundaries) - 1,
+            "max_seconds": float(errors.max()),
+            "mean_seconds": float(errors.mean()),
+        }
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or verify the panchanga transition index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("--out", default=default_index_path())
+    build.add_argument("--start", type=int, default=DEFAULT_START_YEAR)
+    build.add_argument("--end", type=int, default=DEFAULT_END_YEAR)
+    build.add_argument("--ayanamsa", default=",".join(AYANAMSA_MAP), help="Comma-separated ayanamsa modes")
+    report = sub.add_parser("report")
+    report.add_argument("--index", default=default_index_path())
+    report.add_argument("--samples", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    swe.set_ephe_path(os.getenv("EPHEME_PATH", "/app/ephemeris"))
+
+    if args.command == "build":
+        modes = [m.strip().upper() for m in args.ayanamsa.split(",") if m.strip()]
+        unknown = [m for m in modes if m not in AYANAMSA_MAP]
+        if unknown:
+            parser.error(f"Unknown ayanamsa: {', '.join(unknown)}")
+        build_index(args.out, swe.julday(args.start, 1, 1, 0.0), swe.julday(args.end, 1, 1, 0.0), modes)
+        print(f"Wrote {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB)")
+    else:
+        index = TransitionIndex(args.index)
+        print("array".ljust(24) + "transitions".rjust(12) + "max s".rjust(10) + "mean s".rjust(10))
+        for name, r in accuracy_report(index, args.samples).items():
+            print(f"{name:<24}{r['transitions']:>12}{r['max_seconds']:>10.3f}{r['mean_seconds']:>10.3f}")
+
+if __name__ == "__main__":
+    sys.exit(main())
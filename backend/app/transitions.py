@@ -0,0 +1,163 @@
+"""
+Exact panchanga transition times.
+
+Each limb of the panchanga changes when an angle crosses a multiple of its span:
+
+    tithi      Moon - Sun    12 degrees
+    karana     Moon - Sun     6 degrees
+    nakshatra  Moon          13 deg 20 min
+    yoga       Moon + Sun    13 deg 20 min
+
+All three angles always increase, so every crossing is solved with Newton
+steps on the angle's rate (the `FLG_SPEED` derivatives). The first step starts
+from the sample at the query time, and the last step is applied without
+another evaluation once it is below the tolerance, so a crossing typically
+costs two Sun+Moon evaluations. Evaluations are memoized per JD and shared by
+the four limbs: a full day's panchanga (start and end of each limb) takes
+about 15. Walking forward through consecutive limbs (`following`) starts each
+search from the previous boundary, so a calendar pays only for new boundaries.
+"""
+from typing import Dict, List, NamedTuple, Tuple
+
+import swisseph as swe
+
+from . import ephemeris
+
+NAKSHATRA_SPAN = 360.0 / 27.0
+
+# limb -> (span in degrees, Moon coefficient, Sun coefficient)
+LIMBS = {
+    "tithi": (12.0, 1, -1),
+    "karana": (6.0, 1, -1),
+    "nakshatra": (NAKSHATRA_SPAN, 1, 0),
+    "yoga": (NAKSHATRA_SPAN, 1, 1),
+}
+
+# Mean rates in degrees/day, used to place the first guess for the next boundary
+MEAN_RATES = {
+    "tithi": 12.19,
+    "karana": 12.19,
+    "nakshatra": 13.18,
+    "yoga": 14.17,
+}
+
+TOLERANCE_DAYS = 1e-5   # ~0.9 s
+MAX_ITERATIONS = 12
+
+class Transition(NamedTuple):
+    index: int       # 0-based number of the tithi / nakshatra / yoga / karana (0-59)
+    start_jd: float  # JD (UT) when it began
+    end_jd: float    # JD (UT) when it ends
+    angle: float     # angle at the query time, degrees
+
+    def completion(self, span: float) -> float:
+        """Percentage of the span covered at the query time."""
+        return (self.angle % span) / span * 100
+
+class PanchangaTransitions(NamedTuple):
+    tithi: Transition
+    nakshatra: Transition
+    yoga: Transition
+    karana: Transition
+    sun_lon: float   # sidereal, at the query time
+    moon_lon: float
+    evaluations: int
+
+def _wrap180(angle: float) -> float:
+    return (angle + 180.0) % 360.0 - 180.0
+
+class TransitionSolver:
+    """Finds limb boundaries around instants, sharing Sun/Moon samples between queries."""
+
+    def __init__(self, ayanamsa_mode: str = "LAHIRI", high_precision: bool = False):
+        self.ayanamsa_mode = ayanamsa_mode
+        self.high_precision = high_precision
+        self._samples: Dict[float, Tuple[float, float, float, float]] = {}
+
+    @property
+    def evaluations(self) -> int:
+        return len(self._samples)
+
+    def sample(self, jd: float) -> Tuple[float, float, float, float]:
+        """(sun_lon, sun_speed, moon_lon, moon_speed) at `jd`, sidereal."""
+        sample = self._samples.get(jd)
+        if sample is None:
+            sun = ephemeris.calc_ut(jd, swe.SUN, self.ayanamsa_mode, high_precision=self.high_precision)
+            moon = ephemeris.calc_ut(jd, swe.MOON, self.ayanamsa_mode, high_precision=self.high_precision)
+            sample = self._samples[jd] = (sun[0], sun[3], moon[0], moon[3])
+        return sample
+
+    def clear(self):
+        """Drop memoized samples (long walks only ever move forward)."""
+        self._samples.clear()
+
+    def angle(self, limb: str, jd: float) -> Tuple[float, float]:
+        """The limb's angle (0-360) and its rate in degrees/day at `jd`."""
+        _, k_moon, k_sun = LIMBS[limb]
+        sun, sun_speed, moon, moon_speed = self.sample(jd)
+        return (k_moon * moon + k_sun * sun) % 360.0, k_moon * moon_speed + k_sun * sun_speed
+
+    def crossing(self, limb: str, target: float, jd: float) -> float:
+        """JD at which the limb's angle reaches `target` degrees, searching from `jd`."""
+        for _ in range(MAX_ITERATIONS):
+            angle, rate = self.angle(limb, jd)
+            step = _wrap180(target - angle) / rate
+            jd += step
+            if abs(step) < TOLERANCE_DAYS:
+                return jd
+        raise ArithmeticError(f"{limb} crossing at {target} did not converge")
+
+    def transition(self, limb: str, jd: float) -> Transition:
+        """The limb running at `jd` with its exact start and end."""
+        span = LIMBS[limb][0]
+        angle, _ = self.angle(limb, jd)
+        index = int(angle / span)
+        start = self.crossing(limb, index * span, jd)
+        end = self.crossing(limb, ((index + 1) * span) % 360.0, jd)
+        return Transition(index, start, end, angle)
+
+    def following(self, limb: str, previous: Transition) -> Transition:
+        """The limb that starts when `previous` ends."""
+        span = LIMBS[limb][0]
+        index = (previous.index + 1) % round(360.0 / span)
+        guess = previous.end_jd + span / MEAN_RATES[limb]
+        end = self.crossing(limb, ((index + 1) * span) % 360.0, guess)
+        return Transition(index, previous.end_jd, end, index * span)
+
+    def walk(self, limb: str, start_jd: float, end_jd: float) -> List[Transition]:
+        """Consecutive transitions from the one running at `start_jd` to the one running at `end_jd`."""
+        current = self.transition(limb, start_jd)
+        walked = [current]
+        while current.end_jd <= end_jd:
+            current = self.following(limb, current)
+            walked.append(current)
+            if len(walked) % 1000 == 0:
+                self.clear()
+        return walked
+
+    def karanas(self, tithi: Transition) -> Tuple[Transition, Transition]:
+        """The two karanas of a tithi; only the midpoint is solved."""
+        first = 2 * tithi.index
+        middle = self.crossing("karana", first * 6.0 + 6.0, (tithi.start_jd + tithi.end_jd) / 2)
+        return (Transition(first, tithi.start_jd, middle, first * 6.0),
+                Transition(first + 1, middle, tithi.end_jd, first * 6.0 + 6.0))
+
+    def karana(self, jd: float, tithi: Transition) -> Transition:
+        """Karana at `jd`; one of its ends is always the tithi's, so only the other is solved."""
+        angle, _ = self.angle("karana", jd)
+        index = int(angle / 6.0)
+        if index % 2 == 0:
+            return Transition(index, tithi.start_jd, self.crossing("karana", (index + 1) * 6.0, jd), angle)
+        return Transition(index, self.crossing("karana", index * 6.0, jd), tithi.end_jd, angle)
+
+    def panchanga(self, jd: float) -> PanchangaTransitions:
+        tithi = self.transition("tithi", jd)
+        nakshatra = self.transition("nakshatra", jd)
+        yoga = self.transition("yoga", jd)
+        karana = self.karana(jd, tithi)
+        sun, _, moon, _ = self.sample(jd)
+        return PanchangaTransitions(tithi, nakshatra, yoga, karana, sun, moon, self.evaluations)
+
+def panchanga_transitions(jd: float, ayanamsa_mode: str = "LAHIRI") -> PanchangaTransitions:
+    """Tithi, nakshatra, yoga and karana running at `jd` (UT) with exact start and end times."""
+    return TransitionSolver(ayanamsa_mode).panchanga(jd)
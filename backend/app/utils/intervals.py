@@ -0,0 +1,77 @@
+"""
+Set algebra over sorted interval lists.
+
+An interval list is a list of (start, end) pairs, sorted by start, with no two
+pairs overlapping or touching. Every operation takes and returns such lists and
+runs in one linear merge over its inputs.
+"""
+from typing import Iterable, List, Tuple
+
+Interval = Tuple[float, float]
+
+def merge(intervals: Iterable[Interval]) -> List[Interval]:
+    """Coalesce pairs sorted by start (possibly overlapping or touching) into an interval list."""
+    merged: List[Interval] = []
+    for start, end in intervals:
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+def intersect(a: List[Interval], b: List[Interval]) -> List[Interval]:
+    result: List[Interval] = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+def union(a: List[Interval], b: List[Interval]) -> List[Interval]:
+    merged: List[Interval] = []
+    i = j = 0
+    while i < len(a) or j < len(b):
+        if j >= len(b) or (i < len(a) and a[i][0] <= b[j][0]):
+            nxt, i = a[i], i + 1
+        else:
+            nxt, j = b[j], j + 1
+        if merged and nxt[0] <= merged[-1][1]:
+            if nxt[1] > merged[-1][1]:
+                merged[-1] = (merged[-1][0], nxt[1])
+        else:
+            merged.append(nxt)
+    return merged
+
+def complement(a: List[Interval], lo: float, hi: float) -> List[Interval]:
+    """The parts of [lo, hi] not covered by `a`."""
+    result: List[Interval] = []
+    cursor = lo
+    for start, end in a:
+        if end <= cursor:
+            continue
+        if start >= hi:
+            break
+        if start > cursor:
+            result.append((cursor, start))
+        cursor = max(cursor, end)
+    if cursor < hi:
+        result.append((cursor, hi))
+    return result
+
+def subtract(a: List[Interval], b: List[Interval]) -> List[Interval]:
+    """The parts of `a` not covered by `b`."""
+    if not a:
+        return []
+    return intersect(a, complement(b, a[0][0], a[-1][1]))
+
+def clip(a: List[Interval], lo: float, hi: float) -> List[Interval]:
+    return intersect(a, [(lo, hi)]) if lo < hi else []
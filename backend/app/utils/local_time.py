@@ -0,0 +1,107 @@
+"""
+Julian day to local time conversion on floats.
+
+Each zone's UTC offsets are kept as a table of transitions (UTC epoch seconds
+and offset), built once from the pytz zone. Converting a JD is an epoch
+computation plus a bisect, and `to_local_epoch` converts a whole array with a
+single `searchsorted`. Results are aware datetimes or epoch seconds; format
+them only when building a response.
+"""
+import bisect
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import List, Sequence, Union
+
+import numpy as np
+
+from ..services.timezones import get_zone
+
+UNIX_EPOCH_JD = 2440587.5
+UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Format used for local times in chart responses ("06:12 AM 2024-01-15")
+LOCAL_TIME_FORMAT = "%I:%M %p %Y-%m-%d"
+
+class ZoneOffsets:
+    """UTC offset transitions of one zone."""
+
+    def __init__(self, tz_name: str):
+        tz = get_zone(tz_name)
+        times = getattr(tz, "_utc_transition_times", None)
+        if times:
+            epoch = datetime(1970, 1, 1)
+            # pytz starts the table at datetime.min; keep it as -inf
+            self.transitions = [-np.inf] + [(t - epoch).total_seconds() for t in times[1:]]
+            self.offsets = [info[0].total_seconds() for info in tz._transition_info]
+            self.names = [info[2] for info in tz._transition_info]
+        else:
+            # Fixed-offset zones (UTC, Etc/GMT+5, ...)
+            offset = tz.utcoffset(datetime(2000, 1, 1))
+            self.transitions = [-np.inf]
+            self.offsets = [offset.total_seconds()]
+            self.names = [tz.tzname(datetime(2000, 1, 1))]
+        self.transition_array = np.array(self.transitions)
+        self.offset_array = np.array(self.offsets)
+
+    def index(self, epoch: float) -> int:
+        return bisect.bisect_right(self.transitions, epoch) - 1
+
+    def offset(self, epoch: float) -> float:
+        """UTC offset in seconds at UTC epoch seconds `epoch`."""
+        return self.offsets[self.index(epoch)]
+
+    def offset_array_at(self, epochs: np.ndarray) -> np.ndarray:
+        return self.offset_array[np.searchsorted(self.transition_array, epochs, side="right") - 1]
+
+@lru_cache(maxsize=None)
+def zone_offsets(tz_name: str) -> ZoneOffsets:
+    return ZoneOffsets(tz_name)
+
+@lru_cache(maxsize=1024)
+def _fixed_zone(offset: float, name: str) -> timezone:
+    return timezone(timedelta(seconds=offset), name)
+
+def jd_to_epoch(jd: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    """UTC epoch seconds of a JD (UT); works elementwise on arrays."""
+    return (jd - UNIX_EPOCH_JD) * 86400.0
+
+def epoch_to_jd(epoch: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    return epoch / 86400.0 + UNIX_EPOCH_JD
+
+def utc_offset(jd: float, tz_name: str) -> float:
+    """UTC offset of the zone in seconds at JD (UT)."""
+    return zone_offsets(tz_name).offset(jd_to_epoch(jd))
+
+def to_local_epoch(jds: Union[Sequence[float], np.ndarray], tz_name: str) -> np.ndarray:
+    """Local wall-clock time as epoch seconds (UTC epoch + offset) for an array of JDs."""
+    epochs = jd_to_epoch(np.asarray(jds, dtype=float))
+    return epochs + zone_offsets(tz_name).offset_array_at(epochs)
+
+def local_midnight_jd(d: date, tz_name: str) -> float:
+    """JD (UT) at which civil date `d` begins in the zone."""
+    zone = zone_offsets(tz_name)
+    wall = (datetime(d.year, d.month, d.day, tzinfo=timezone.utc) - UNIX_EPOCH).total_seconds()
+    # The offset in force at midnight, found from a guess one offset away
+    epoch = wall - zone.offset(wall)
+    return epoch_to_jd(wall - zone.offset(epoch))
+
+def jd_to_local(jd: float, tz_name: str) -> datetime:
+    """Aware local datetime (fixed-offset tzinfo named like the zone's abbreviation) of a JD (UT)."""
+    zone = zone_offsets(tz_name)
+    epoch = jd_to_epoch(jd)
+    i = zone.index(epoch)
+    tz = _fixed_zone(zone.offsets[i], zone.names[i])
+    return (UNIX_EPOCH + timedelta(seconds=epoch)).astimezone(tz)
+
+def jd_to_local_many(jds: Union[Sequence[float], np.ndarray], tz_name: str) -> List[datetime]:
+    """`jd_to_local` for many JDs, resolving offsets in one pass."""
+    zone = zone_offsets(tz_name)
+    epochs = jd_to_epoch(np.asarray(jds, dtype=float))
+    indices = np.searchsorted(zone.transition_array, epochs, side="right") - 1
+    return [
+        (UNIX_EPOCH + timedelta(seconds=epoch)).astimezone(_fixed_zone(zone.offsets[i], zone.names[i]))
+        for epoch, i in zip(epochs.tolist(), indices.tolist())
+    ]
+
+def format_local(jd: float, tz_name: str, fmt: str = LOCAL_TIME_FORMAT) -> str:
+    return jd_to_local(jd, tz_name).strftime(fmt)
@@ -0,0 +1,76 @@
+"""
+Read-only numeric tables stored in a single memory-mapped file.
+
+Layout:
+    8 bytes   magic
+    8 bytes   little-endian uint64 length of the JSON header
+    N bytes   JSON header: free-form metadata plus an "arrays" index of
+              {name: {"dtype", "shape", "offset"}}
+    ...       raw array data, each array aligned to 64 bytes
+
+Arrays are exposed as numpy views over the mapping, so opening a file is cheap,
+the pages are shared between worker processes, and reads need no locking.
+"""
+import os
+import json
+import mmap
+import struct
+from typing import Dict
+
+import numpy as np
+
+MAGIC = b"ASTTBL01"
+ALIGN = 64
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+def write_tables(path: str, header: dict, arrays: Dict[str, np.ndarray]):
+    """Write `arrays` and `header` to `path` atomically (temp file + rename)."""
+    arrays = {name: np.ascontiguousarray(arr) for name, arr in arrays.items()}
+
+    # The header size depends on the offsets and vice versa; lay the arrays out
+    # after a generously rounded header size and pad the header to fit.
+    index = {name: {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": 0} for name, arr in arrays.items()}
+    draft = json.dumps({**header, "arrays": index}).encode()
+    data_start = _align(16 + len(draft) + 32 * len(arrays) + 256)
+    offset = data_start
+    for name, arr in arrays.items():
+        index[name]["offset"] = offset
+        offset = _align(offset + arr.nbytes)
+    header_bytes = json.dumps({**header, "arrays": index}).encode()
+    if 16 + len(header_bytes) > data_start:
+        raise ValueError("Table header too large")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for name, arr in arrays.items():
+            f.seek(index[name]["offset"])
+            f.write(arr.tobytes())
+        f.truncate(offset)
+    os.replace(tmp_path, path)
+
+class MappedTables:
+    """A table file opened read-only; `header` is the metadata, `arrays` the numpy views."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:8] != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a table file")
+        (header_len,) = struct.unpack("<Q", self._mm[8:16])
+        self.header = json.loads(self._mm[16:16 + header_len])
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, spec in self.header.pop("arrays").items():
+            dtype = np.dtype(spec["dtype"])
+            shape = tuple(spec["shape"])
+            count = int(np.prod(shape)) if shape else 1
+            self.arrays[name] = np.frombuffer(self._mm, dtype=dtype, count=count, offset=spec["offset"]).reshape(shape)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
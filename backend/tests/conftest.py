@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Point the app at a throwaway database before anything imports app.database,
+# so no test run can create or write backend/charts.db
+_db_dir = tempfile.mkdtemp(prefix="astro-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'charts.db')}"
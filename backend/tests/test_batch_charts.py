@@ -0,0 +1,38 @@
+from app.engine import calculate_chart, calculate_charts_batch
+from app.models import BirthDetails
+
+CASES = [
+    BirthDetails(date="1955-02-24", time="19:15:00", latitude=37.7749, longitude=-122.4194,
+                 location_timezone="America/Los_Angeles", ayanamsa_mode="LAHIRI"),
+    BirthDetails(date="1986-05-17", time="10:58:00", latitude=10.7905, longitude=78.7047,
+                 location_timezone="Asia/Kolkata", ayanamsa_mode="KRISHNAMURTI"),
+    BirthDetails(date="1984-05-14", time="14:39:00", latitude=41.0340, longitude=-73.7629,
+                 location_timezone="America/New_York", ayanamsa_mode="SAYANA"),
+]
+
+def test_batch_matches_single_chart():
+    results = list(calculate_charts_batch(CASES))
+    assert [r["index"] for r in results] == list(range(len(CASES)))
+
+    for details, result in zip(CASES, results):
+        expected = calculate_chart(details).model_dump(mode="json")
+
+        for key in ["ascendant", "ascendant_sign", "houses", "dashas", "panchanga", "strengths", "ayanamsa"]:
+            assert result[key] == expected[key], f"{key} mismatch for {details.date}"
+
+        # Batch charts skip Maandi (needs the birth day's sunrise/sunset)
+        expected_planets = [p for p in expected["planets"] if p["name"] != "Maandi"]
+        assert result["planets"] == expected_planets
+
+        for name, varga in expected["divisional_charts"].items():
+            batch_varga = result["divisional_charts"][name]
+            assert batch_varga["ascendant_sign"] == varga["ascendant_sign"]
+            assert batch_varga["planets"] == [p for p in varga["planets"] if p["planet"] != "Maandi"]
+
+def test_batch_unknown_timezone_falls_back_to_utc():
+    unknown = BirthDetails(date="2000-01-01", time="12:00:00", latitude=0, longitude=0,
+                           location_timezone="Not/AZone")
+    utc = unknown.model_copy(update={"location_timezone": "UTC"})
+    first, second = calculate_charts_batch([unknown, utc])
+    assert first["index"] == 0 and second["index"] == 1
+    assert first["ascendant"] == second["ascendant"]
@@ -0,0 +1,54 @@
+import datetime
+
+from app.models import BirthDetails
+from app.engine import calculate_chart
+from app.services.chart_cache import ChartCache, chart_key
+
+
+def _details(**overrides):
+    data = dict(date=datetime.date(1990, 5, 1), time=datetime.time(10, 30), latitude=12.97, longitude=77.59)
+    data.update(overrides)
+    return BirthDetails(**data)
+
+
+def test_key_ignores_display_only_fields():
+    assert chart_key(_details()) == chart_key(_details(location_city="Bangalore"))
+    assert chart_key(_details()) != chart_key(_details(ayanamsa_mode="RAMAN"))
+    assert chart_key(_details()) != chart_key(_details(location_timezone="Asia/Kolkata"))
+
+
+def test_cache_hit_and_lru_eviction():
+    cache = ChartCache(max_entries=2)
+    calls = []
+
+    def compute(details):
+        calls.append(details)
+        return calculate_chart(details)
+
+    a, b, c = _details(), _details(latitude=28.6), _details(latitude=19.07)
+    first = cache.get_or_compute(a, lambda: compute(a))
+    again = cache.get_or_compute(a, lambda: compute(a))
+    assert len(calls) == 1
+    assert again == first
+
+    cache.get_or_compute(b, lambda: compute(b))
+    cache.get_or_compute(c, lambda: compute(c))  # evicts a
+    cache.get_or_compute(a, lambda: compute(a))
+    assert len(calls) == 4
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 1 and stats["misses"] == 4
+    assert stats["evictions"] == 2
+
+
+def test_cache_expiry_and_byte_cap():
+    cache = ChartCache(ttl=-1)
+    details = _details()
+    cache.get_or_compute(details, lambda: calculate_chart(details))
+    cache.get_or_compute(details, lambda: calculate_chart(details))
+    assert cache.stats()["expirations"] == 1
+
+    tiny = ChartCache(max_bytes=100)
+    tiny.get_or_compute(details, lambda: calculate_chart(details))
+    assert tiny.stats()["entries"] == 0
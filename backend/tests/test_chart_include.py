@@ -0,0 +1,37 @@
+import datetime
+
+import pytest
+
+from app.models import BirthDetails
+from app.engine import calculate_chart, parse_chart_include
+from app.services.chart_cache import chart_key
+
+
+def _details():
+    return BirthDetails(date=datetime.date(1990, 5, 1), time=datetime.time(10, 30), latitude=12.97, longitude=77.59)
+
+
+def test_parse_include():
+    assert parse_chart_include(None) is None and parse_chart_include("all") is None
+    sections = parse_chart_include("planets,vargas:D1,d9,dashas")
+    assert sections.sections == {"planets", "vargas", "dashas"}
+    assert sections.vargas == (1, 9)
+    assert sections.canonical() == "planets,vargas:D1,D9,dashas"
+    assert parse_chart_include("dashas,planets").canonical() == parse_chart_include("planets,dashas").canonical()
+    with pytest.raises(ValueError):
+        parse_chart_include("planets,aspects")
+    with pytest.raises(ValueError):
+        parse_chart_include("vargas:D13")
+
+
+def test_partial_chart_matches_full_chart():
+    full = calculate_chart(_details())
+    part = calculate_chart(_details(), "planets,vargas:D9,strengths")
+    assert part.dashas is None and part.panchanga is None and part.special_times is None and part.houses is None
+    assert list(part.divisional_charts) == ["D9"]
+    # Maandi is part of the "mandhi" section, so it is absent from every partial listing
+    full_d9 = full.divisional_charts["D9"]
+    assert part.divisional_charts["D9"].planets == [p for p in full_d9.planets if p.planet != "Maandi"]
+    assert part.strengths == full.strengths
+    assert part.planets == [p for p in full.planets if p.name != "Maandi"]
+    assert chart_key(_details(), parse_chart_include("planets")) != chart_key(_details())
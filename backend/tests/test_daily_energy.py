@@ -0,0 +1,76 @@
+import json
+from datetime import date
+
+import numpy as np
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.advisor import calculate_daily_energy
+from app.database import Base, DBChart, get_db
+from app.engine import calculate_chart, calculate_daily_panchanga
+from app.models import BirthDetails
+from app.services.transit_hits import sync_natal
+
+
+def test_batch_matches_advisor():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    rng = np.random.default_rng(7)
+    places = [(13.0827, 80.2707, "Asia/Kolkata"), (28.6139, 77.209, "Asia/Kolkata"), (40.7128, -74.006, "America/New_York")]
+    births = []
+    for i in range(24):
+        lat, lon, tz = places[i % 3]
+        details = BirthDetails(date=f"{1940 + int(rng.integers(0, 80))}-{int(rng.integers(1, 13)):02d}-{int(rng.integers(1, 28)):02d}",
+                               time=f"{int(rng.integers(0, 24)):02d}:{int(rng.integers(0, 60)):02d}:00",
+                               latitude=lat, longitude=lon, location_timezone=tz)
+        births.append(details)
+        db.add(DBChart(name=f"c{i}", date=details.date.isoformat(), time=details.time.isoformat(), latitude=lat,
+                       longitude=lon, ayanamsa_mode="LAHIRI", location_timezone=tz))
+    db.commit()
+    sync_natal(db)
+
+    on = date(2026, 10, 17)
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        response = TestClient(app).get("/charts/daily-energy", params={"date": on.isoformat()})
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["name"] for r in rows] == [f"c{i}" for i in range(24)]
+    for details, row in zip(births, rows):
+        expected = calculate_daily_energy(calculate_chart(details), on,
+                                          calculate_daily_panchanga(on, details.latitude, details.longitude))
+        assert row["score"] == expected["score"]
+        assert row["breakdown"] == expected["breakdown"]
+        assert row["label"] == expected["label"]
+
+
+def test_mentor_with_saved_chart():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    details = {"date": "1987-09-12", "time": "04:45:00", "latitude": 19.076, "longitude": 72.8777,
+               "ayanamsa_mode": "LAHIRI", "location_timezone": "Asia/Kolkata"}
+    chart = DBChart(name="mumbai", **details)
+    db.add(chart)
+    db.commit()
+
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        client = TestClient(app)
+        params = {"current_date": "2026-10-17", "timezone_str": "Asia/Kolkata"}
+        saved = client.post("/daily/mentor", params={**params, "chart_id": chart.id})
+        direct = client.post("/daily/mentor", params=params, json=details)
+        assert saved.status_code == direct.status_code == 200
+        for key in ("score", "label", "breakdown"):
+            assert saved.json()["energy"][key] == direct.json()["energy"][key]
+        assert saved.json()["special_times"] == direct.json()["special_times"]
+        assert client.post("/daily/mentor", params={**params, "chart_id": 999}).status_code == 404
+        assert client.post("/daily/mentor", params=params).status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_db, None)
@@ -0,0 +1,55 @@
+import datetime
+import math
+
+import pytest
+import swisseph as swe
+
+from app.engine import VimshottariDasha, calculate_chart, calculate_dasha_tree, calculate_dashas, current_dasha, DASHA_LEVELS
+from app.models import BirthDetails, DashaPeriod
+
+
+def test_dasha_at_agrees_with_lazy_periods():
+    tree = VimshottariDasha(123.4, 2448012.7)
+    for jd in (2448012.7, 2455000.25, 2460967.5, 2493000.0):
+        path = tree.dasha_at(jd, 5)
+        assert [n.level for n in path] == list(DASHA_LEVELS)
+        for parent, child in zip(path, path[1:]):
+            assert child in tree.children(parent)
+        assert all(n.start_jd <= jd < n.end_jd for n in path)
+        assert list(tree.periods(5, jd, jd + 1e-6)) == [path[-1]]
+    with pytest.raises(ValueError):
+        tree.dasha_at(2455000.0, 6)
+
+
+def test_period_boundaries_and_table():
+    tree = VimshottariDasha(0.0, 2451545.0)  # Moon at 0 Aries: a full Ketu Mahadasha from birth
+    mahadashas = list(tree.periods(1))
+    assert [n.lord for n in mahadashas][:3] == ["Ketu", "Venus", "Sun"]
+    assert sum(n.years for n in mahadashas) == pytest.approx(120.0)
+    assert tree.dasha_at(mahadashas[1].start_jd, 1)[0].lord == "Venus"
+
+    table = calculate_dashas(0.0, datetime.date(2000, 1, 1))
+    assert len(table) == 81 and table[0]["lord"] == "Ketu-Ketu" and table[0]["start_date"] == "2000-01-01"
+
+
+def test_current_dasha():
+    dashas = [
+        DashaPeriod(lord="Ketu-Ketu", duration=0.4, start_date=datetime.date(2000, 1, 1), end_date=datetime.date(2000, 5, 27)),
+        DashaPeriod(lord="Ketu-Venus", duration=1.2, start_date=datetime.date(2000, 5, 27), end_date=datetime.date(2001, 7, 27)),
+    ]
+    assert current_dasha(dashas, datetime.date(2000, 3, 1)).lord == "Ketu-Ketu"
+    assert current_dasha(dashas, datetime.date(2000, 5, 27)).lord == "Ketu-Venus"
+    assert current_dasha([], datetime.date(2000, 3, 1)) is None
+
+
+def test_tree_and_table_share_the_anchor():
+    details = BirthDetails(date="1987-09-12", time="04:45:00", latitude=19.076, longitude=72.8777,
+                           location_timezone="Asia/Kolkata")
+    table = calculate_chart(details).dashas
+    tree = calculate_dasha_tree(details)
+    epoch = swe.julday(1987, 9, 12, 0.0)
+    antardashas = [n for n in tree.periods(2) if n.end_jd > epoch]
+    assert [n.label for n in antardashas] == [p.lord for p in table]
+    # The table dates a period by the day it starts on, counted from the same epoch
+    for node, period in zip(antardashas[1:], table[1:]):
+        assert details.date + datetime.timedelta(days=math.floor(node.start_jd - epoch)) == period.start_date
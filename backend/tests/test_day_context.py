@@ -0,0 +1,39 @@
+import datetime
+
+from app.engine import calculate_special_times, hora_spans
+from app.services.day_context import day_context
+from app.services.panchang_calculator import calculate_gowri_panchangam
+from app.utils.local_time import jd_to_local
+
+LAT, LON, TZ = 12.97, 77.59, "Asia/Kolkata"
+THURSDAY = datetime.date(2024, 6, 13)
+
+
+def test_periods_share_one_context():
+    ctx = day_context(THURSDAY, LAT, LON)
+    assert day_context(THURSDAY, LAT, LON) is ctx
+    assert ctx.weekday == 4 and ctx.weekday_lord == "Jupiter"
+    assert ctx.parts(8)[0] == ctx.sunrise and ctx.parts(8)[-1] == ctx.sunset
+    assert ctx.parts(8, night=True)[-1] == ctx.next_sunrise
+
+    spans = hora_spans(THURSDAY, LAT, LON)
+    assert [h.start_jd for h in spans[:12]] == list(ctx.parts(12)[:12])
+    assert spans[-1].end_jd == ctx.next_sunrise
+
+    # Thursday: Rahu 6th, Yamagandam 1st, Gulika 3rd eighth; Dur Muhurtham 6th and 13th muhurta
+    assert ctx.rahu_kalam() == ctx.part(8, 6) and ctx.yamagandam() == ctx.part(8, 1) and ctx.gulika_kalam() == ctx.part(8, 3)
+    assert ctx.dur_muhurtham() == [ctx.part(15, 6), ctx.part(15, 13)]
+    start, end = ctx.brahma_muhurta()
+    assert end < ctx.sunrise and abs((end - start) - (ctx.sunrise - ctx.previous_sunset) / 15) < 1e-9
+
+    special = {p["name"]: p for p in calculate_special_times(THURSDAY, LAT, LON, TZ)}
+    assert special["Rahu Kalam"]["start_dt"] == jd_to_local(ctx.rahu_kalam()[0], TZ).replace(microsecond=0).isoformat()
+
+
+def test_choghadiya_and_gowri():
+    ctx = day_context(THURSDAY, LAT, LON)
+    assert [p.name for p in ctx.choghadiya()] == ["Shubh", "Rog", "Udveg", "Char", "Labh", "Amrit", "Kaal", "Shubh"]
+    assert [p.name for p in ctx.choghadiya(night=True)] == ["Amrit", "Char", "Rog", "Kaal", "Labh", "Udveg", "Shubh", "Amrit"]
+    gowri = calculate_gowri_panchangam(ctx, TZ)
+    # The night runs to the real next sunrise, not sunrise + 24 h
+    assert gowri.night_periods[-1].end_time == jd_to_local(ctx.next_sunrise, TZ).strftime("%I:%M %p").lstrip('0').replace(' 0', ' ')
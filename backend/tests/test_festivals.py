@@ -0,0 +1,23 @@
+from app.services.festivals import FESTIVAL_RULES, festival_dates
+
+
+def test_festival_dates_delhi_2024():
+    dates = festival_dates(2024, 28.61, 77.21)
+    by_name = {}
+    for f in dates:
+        by_name.setdefault(f["name"], []).append(f["date"])
+    assert by_name["Maha Shivaratri"] == ["2024-03-08"]
+    assert by_name["Krishna Janmashtami"] == ["2024-08-26"]
+    assert by_name["Ganesh Chaturthi"] == ["2024-09-07"]
+    assert "2024-01-07" in by_name["Ekadashi"] and len(by_name["Ekadashi"]) in (24, 25, 26)
+    assert len(by_name["Purnima"]) in (12, 13) and len(by_name["Amavasya"]) in (12, 13)
+    assert all(f["date"].startswith("2024-") for f in dates)
+    assert dates == sorted(dates, key=lambda f: (f["date"], f["name"]))
+    assert {f["name"] for f in dates} == {r.name for r in FESTIVAL_RULES}
+
+
+def test_adhika_month_is_skipped():
+    # 2023 had an adhika Shravana; Janmashtami falls in the regular one
+    janmashtami = [f for f in festival_dates(2023, 28.61, 77.21) if f["name"] == "Krishna Janmashtami"]
+    assert [f["date"] for f in janmashtami] == ["2023-09-06"]
+    assert any(f["adhika"] for f in festival_dates(2023, 28.61, 77.21))
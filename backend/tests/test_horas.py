@@ -0,0 +1,31 @@
+import datetime
+
+import pytest
+
+from app.engine import calculate_horas, hora_at, hora_spans
+
+
+def test_hora_at_matches_timeline_scan():
+    lat, lon = 40.71, -74.0
+    day = datetime.date(2024, 3, 10)
+    spans = hora_spans(day, lat, lon)
+    assert len(spans) == 24 and all(a.end_jd == b.start_jd for a, b in zip(spans, spans[1:]))
+    for h in spans:
+        for jd in (h.start_jd, (h.start_jd + h.end_jd) / 2):
+            current, following = hora_at(jd, lat, lon)
+            assert current == h
+            # The next day's sunrise is solved separately; it agrees to well under a second
+            assert following.start_jd == pytest.approx(h.end_jd, abs=1e-6)
+
+
+def test_pre_sunrise_uses_previous_night():
+    lat, lon = 12.97, 77.59
+    day = datetime.date(2024, 1, 15)
+    sunrise = hora_spans(day, lat, lon)[0].start_jd
+    current, following = hora_at(sunrise - 0.01, lat, lon)
+    assert current == hora_spans(day - datetime.timedelta(days=1), lat, lon)[23]
+    assert following == hora_spans(day, lat, lon)[0]
+
+    timeline = calculate_horas(day, lat, lon, "Asia/Kolkata")
+    assert [h.index for h in timeline.previous_night_horas] == list(range(13, 25))
+    assert timeline.previous_night_horas[-1].end_jd == timeline.horas[0].start_jd
@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytz
+
+from app.utils.local_time import jd_to_local, jd_to_local_many, to_local_epoch, utc_offset, jd_to_epoch
+
+
+def _jd(dt):
+    return 2440587.5 + (dt - datetime(1970, 1, 1, tzinfo=timezone.utc)).total_seconds() / 86400.0
+
+
+def test_matches_pytz_across_dst_transitions():
+    tz = pytz.timezone("America/New_York")
+    start = datetime(2024, 3, 9, tzinfo=timezone.utc)
+    moments = [start + timedelta(minutes=37 * k) for k in range(200)]  # spans the March change
+    jds = [_jd(m) for m in moments]
+    for m, jd, many in zip(moments, jds, jd_to_local_many(jds, "America/New_York")):
+        expected = m.astimezone(tz)
+        assert jd_to_local(jd, "America/New_York").utcoffset() == expected.utcoffset() == many.utcoffset()
+        assert abs(jd_to_local(jd, "America/New_York").replace(tzinfo=None) - expected.replace(tzinfo=None)) < timedelta(milliseconds=1)
+    local = to_local_epoch(jds, "America/New_York")
+    offsets = [m.astimezone(tz).utcoffset().total_seconds() for m in moments]
+    assert np.allclose(local - jd_to_epoch(np.array(jds)), offsets)
+
+
+def test_fixed_offset_zones():
+    assert utc_offset(2460000.0, "UTC") == 0.0
+    assert utc_offset(2460000.0, "Asia/Kolkata") == 19800.0
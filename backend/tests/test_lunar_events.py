@@ -0,0 +1,34 @@
+from datetime import date
+
+import swisseph as swe
+
+from app.services.lunar_events import moon_day, moon_month, next_moonrise
+from app.utils.local_time import jd_to_local, local_midnight_jd
+
+LAT, LON, TZ = 12.97, 77.59, "Asia/Kolkata"
+
+
+def test_month_matches_direct_search():
+    month = moon_month(2024, 6, LAT, LON)
+    assert len(month.rises) >= 30 and list(month.rises) == sorted(month.rises)
+    for rise in month.rises[1:]:
+        direct = swe.rise_trans(rise - 0.5, swe.MOON, swe.CALC_RISE, (round(LON, 3), round(LAT, 3), 0))[1][0]
+        assert abs(direct - rise) < 1e-6
+    assert next_moonrise(month.rises[5] - 0.1, LAT, LON) == month.rises[5]
+
+
+def test_days_without_moonrise_or_moonset():
+    days = [moon_day(date(2024, 6, d), LAT, LON, TZ) for d in range(1, 31)]
+    # About one day a month has no moonrise and one has no moonset
+    assert sum(d.moonrise is None for d in days) == 1
+    assert sum(d.moonset is None for d in days) == 1
+    for n, d in enumerate(days, 1):
+        for jd in (d.moonrise, d.moonset):
+            if jd is not None:
+                assert jd_to_local(jd, TZ).date() == date(2024, 6, n)
+
+
+def test_local_midnight_across_dst():
+    for d in (date(2024, 3, 31), date(2024, 10, 27)):
+        local = jd_to_local(local_midnight_jd(d, "Europe/Berlin") + 1e-6, "Europe/Berlin")
+        assert local.date() == d and local.hour == 0
@@ -0,0 +1,101 @@
+import numpy as np
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.database import Base, DBChart, get_db
+from app.services.matching import (DOSHA_STATES, KOOTA_MATRICES, KOOTA_MAX, MAX_SCORE, NAKSHATRA_SCORE, SIGN_SCORE,
+                                   koota_breakdown, load_match_library, match_profiles, mangal_dosha, search_matches,
+                                   select)
+from app.services.transit_hits import sync_natal
+
+
+def test_koota_tables():
+    for name, matrix in KOOTA_MATRICES.items():
+        assert matrix.min() >= 0 and matrix.max() == KOOTA_MAX[name]
+    assert MAX_SCORE == 36
+    # Same nakshatra: same nadi, no points; 6/8 signs (Aries-Virgo): no bhakoot
+    assert all(KOOTA_MATRICES["nadi"][i, i] == 0 for i in range(27))
+    assert KOOTA_MATRICES["bhakoot"][0, 5] == KOOTA_MATRICES["bhakoot"][5, 0] == 0
+    # Groom Ashwini (Aries), bride Bharani (Aries): 1 + 2 + 3 + 2 + 5 + 6 + 7 + 8
+    assert SIGN_SCORE[0, 0] + NAKSHATRA_SCORE[0, 1] == 34
+    # Deva groom with Rakshasa bride scores differently from the reverse pairing
+    assert KOOTA_MATRICES["gana"][0, 2] == 1 and KOOTA_MATRICES["gana"][2, 0] == 1
+    assert KOOTA_MATRICES["gana"][1, 0] == 5 and KOOTA_MATRICES["gana"][0, 1] == 6
+
+
+def test_mangal_dosha():
+    # Mars 7th from the ascendant (Aries lagna, Libra Mars); 2nd profile Mars in Aries (own sign)
+    profiles = match_profiles([1, 2, 3], ["a", "b", "c"], [100.0, 100.0, 100.0], [5.0, 5.0, 5.0], [190.0, 10.0, 160.0])
+    assert profiles.manglik.tolist() == [True, True, False]
+    assert mangal_dosha(profiles.manglik[0], profiles.mars_strong[0], profiles.manglik[2], profiles.mars_strong[2]) == 2
+    assert mangal_dosha(profiles.manglik[0], profiles.mars_strong[0], profiles.manglik[1], profiles.mars_strong[1]) == 1
+    assert mangal_dosha(profiles.manglik[2], profiles.mars_strong[2], profiles.manglik[2], profiles.mars_strong[2]) == 0
+
+
+def test_search_ranks_library():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    for i in range(40):
+        db.add(DBChart(name=f"c{i}", date=f"19{70 + i % 30}-{1 + i % 12:02d}-{1 + i % 27:02d}", time="10:30:00",
+                       latitude=12.97, longitude=77.59, ayanamsa_mode="LAHIRI", location_timezone="Asia/Kolkata"))
+    db.commit()
+    sync_natal(db)
+    library = load_match_library(db)
+    assert library.chart_ids.size == 40
+
+    seeker = select(library, [0])
+    everyone = search_matches(seeker, "bride", library)
+    matches = everyone[:10]
+    assert len(everyone) == 39 and all(m["chart_id"] != library.chart_ids[0] for m in matches)
+    scores = [m["score"] for m in matches]
+    assert scores == sorted(scores, reverse=True)
+    assert all(abs(sum(m["kootas"].values()) - m["score"]) < 1e-9 for m in matches)
+
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        client = TestClient(app)
+        response = client.post("/match/search", json={"chart_id": int(library.chart_ids[0]), "role": "bride", "limit": 10})
+        assert response.status_code == 200
+        assert [m["score"] for m in response.json()["matches"]] == scores
+        ids = [int(c) for c in library.chart_ids[:4]]
+        group = client.post("/match/group", json={"chart_ids": ids}).json()
+        assert len(group["scores"]) == 4 and all(len(row) == 4 for row in group["scores"])
+        assert group["scores"][1][0] == next(m["score"] for m in everyone if m["chart_id"] == ids[1])
+        assert client.post("/match/search", json={"role": "groom"}).status_code == 400
+        assert client.post("/match/group", json={"chart_ids": [ids[0], 99999]}).status_code == 404
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+def test_group_masks_self_pairs():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    for i, d in enumerate(["1984-03-11", "1990-08-27", "1979-12-02"]):
+        db.add(DBChart(name=f"g{i}", date=d, time="06:15:00", latitude=28.61, longitude=77.21,
+                       ayanamsa_mode="LAHIRI", location_timezone="Asia/Kolkata"))
+    db.commit()
+    sync_natal(db)
+    library = load_match_library(db)
+    ids = [int(c) for c in library.chart_ids]
+
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        group = TestClient(app).post("/match/group", json={"chart_ids": ids}).json()
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+    scores, dosha = group["scores"], group["mangal_dosha"]
+    for i in range(3):
+        assert scores[i][i] is None and dosha[i][i] is None
+        for j in range(3):
+            if i == j:
+                continue
+            forward, reverse = koota_breakdown(library, i, library, j), koota_breakdown(library, j, library, i)
+            assert abs(scores[i][j] - sum(forward.values())) < 1e-9 and dosha[i][j] in DOSHA_STATES
+            # Only varna and gana depend on who is the groom
+            assert {k: v for k, v in forward.items() if k not in ("varna", "gana")} == \
+                   {k: v for k, v in reverse.items() if k not in ("varna", "gana")}
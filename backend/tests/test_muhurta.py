@@ -0,0 +1,73 @@
+import pytest
+from datetime import date
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.engine import hora_at, karana_name
+from app.transition_index import transitions_between
+from app.services.day_context import day_context
+from app.services.muhurta import MuhurtaQueryError, MuhurtaSearch, parse_query
+from app.utils.intervals import complement, intersect, merge, subtract, union
+
+LAT, LON = 13.0827, 80.2707  # Chennai
+
+
+def test_interval_algebra():
+    a = [(0, 2), (4, 6), (8, 10)]
+    b = [(1, 5), (9, 12)]
+    assert intersect(a, b) == [(1, 2), (4, 5), (9, 10)]
+    assert union(a, b) == [(0, 6), (8, 12)]
+    assert complement(a, -1, 11) == [(-1, 0), (2, 4), (6, 8), (10, 11)]
+    assert subtract(a, b) == [(0, 1), (5, 6), (8, 9)]
+    assert merge([(0, 1), (1, 2), (3, 3), (4, 5)]) == [(0, 2), (4, 5)]
+
+
+def test_windows_satisfy_every_factor():
+    search = MuhurtaSearch(date(2024, 7, 1), date(2024, 9, 28), LAT, LON)
+    query = ("weekday in (Mon, Thu) and paksha = shukla and hora = Jupiter "
+             "and karana != Vishti and not (rahu_kalam or yamagandam)")
+    windows = search.windows(query)
+    assert windows
+    for start, end in windows:
+        for jd in (start + 1e-5, (start + end) / 2, end - 1e-5):
+            ctx = next(c for c in search.days if c.sunrise <= jd < c.next_sunrise)
+            assert ctx.weekday in (1, 4)
+            assert hora_at(jd, LAT, LON)[0].ruler == "Jupiter"
+            tithi = transitions_between("tithi", jd, jd)[0]
+            karana = transitions_between("karana", jd, jd)[0]
+            assert tithi.index < 15 and karana_name(karana.index) != "Vishti"
+            for kalam in (ctx.rahu_kalam(), ctx.yamagandam()):
+                assert not kalam[0] < jd < kalam[1]
+
+
+def test_query_errors():
+    for query in ("", "weekday in (Funday)", "tithi = 31", "hora", "nakshatra in (Rohini", "rahu_kalam and", "planet = Sun"):
+        with pytest.raises(MuhurtaQueryError):
+            parse_query(query)
+    assert parse_query("not abhijit or tithi not in (4, 'Navami')") == (
+        "or", ("not", ("period", "abhijit")), ("not", ("is", "tithi", frozenset({3, 8, 23}))))
+
+
+def test_muhurta_endpoint():
+    client = TestClient(app)
+    body = {"query": "nakshatra = Rohini and day and not rahu_kalam", "from": "2024-01-01", "to": "2024-03-31",
+            "latitude": LAT, "longitude": LON, "min_duration_minutes": 30}
+    response = client.post("/api/muhurta/search", json=body)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["timezone"] == "Asia/Kolkata"
+    assert 3 <= len(data["windows"]) <= 8
+    assert all(w["duration_minutes"] >= 30 and w["start"] < w["end"] for w in data["windows"])
+    assert client.post("/api/muhurta/search", json={**body, "query": "nakshatra = Pluto"}).status_code == 400
+    assert client.post("/api/muhurta/search", json={**body, "to": "2026-01-01"}).status_code == 400
+
+
+def test_monday_dur_muhurtham_keeps_both_parts():
+    monday = date(2024, 7, 1)
+    ctx = day_context(monday, LAT, LON)
+    assert ctx.weekday == 1
+    windows = MuhurtaSearch(monday, monday, LAT, LON).windows("dur_muhurtham")
+    assert windows == sorted(ctx.dur_muhurtham())
+    free = MuhurtaSearch(monday, monday, LAT, LON).windows("not dur_muhurtham")
+    for start, end in ctx.dur_muhurtham():
+        assert not any(s < (start + end) / 2 < e for s, e in free)
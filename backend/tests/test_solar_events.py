@@ -0,0 +1,36 @@
+import datetime
+
+import pytz
+import swisseph as swe
+
+from app.services.solar_events import solar_day, vedic_day, _solar_day
+from app.utils.timezone_helper import get_sunrise_sunset
+
+
+def _local(jd, tz):
+    y, m, d, h = swe.revjul(jd)
+    utc = datetime.datetime(y, m, d, tzinfo=pytz.UTC) + datetime.timedelta(hours=h)
+    return utc.astimezone(pytz.timezone(tz))
+
+
+def test_events_fall_on_the_local_civil_date():
+    target = datetime.date(2024, 1, 15)
+    for lat, lon, tz in [(35.68, 139.69, "Asia/Tokyo"), (-33.87, 151.21, "Australia/Sydney"),
+                         (34.05, -118.24, "America/Los_Angeles"), (12.97, 77.59, "Asia/Kolkata")]:
+        day = solar_day(target, lat, lon)
+        assert day.sunrise < day.sunset < day.next_sunrise
+        assert _local(day.sunrise, tz).date() == target
+        assert _local(day.sunset, tz).date() == target
+        sunrise, sunset = get_sunrise_sunset(lat, lon, target)
+        assert sunrise.date() == target and sunset.date() == target
+
+
+def test_vedic_day_contains_jd_and_is_cached():
+    jd = swe.julday(2024, 1, 15, 23.5)  # 05:00 IST on the 16th, before sunrise
+    day = vedic_day(jd, 12.97, 77.59)
+    assert day.sunrise <= jd < day.next_sunrise
+    assert day == solar_day(datetime.date(2024, 1, 15), 12.97, 77.59)
+
+    hits = _solar_day.cache_info().hits
+    solar_day(datetime.date(2024, 1, 15), 12.9701, 77.5899)  # same quantized location
+    assert _solar_day.cache_info().hits == hits + 1
@@ -0,0 +1,17 @@
+import pytz
+
+from app.services import timezones
+
+
+def test_lookup_is_shared_and_cached():
+    assert timezones.timezone_name(12.97, 77.59) == "Asia/Kolkata"
+    assert timezones.timezone_name(40.7128, -74.006) == "America/New_York"
+    before = timezones.cache_stats()["timezone_at"]["hits"]
+    assert timezones.timezone_at(12.97001, 77.59001) == "Asia/Kolkata"  # same quantized cell
+    assert timezones.cache_stats()["timezone_at"]["hits"] == before + 1
+    assert timezones.get_finder() is timezones.get_finder()
+
+
+def test_zone_objects():
+    assert timezones.get_zone("Asia/Kolkata") is timezones.get_zone("Asia/Kolkata")
+    assert timezones.zone_at(12.97, 77.59) is pytz.timezone("Asia/Kolkata")
@@ -0,0 +1,42 @@
+import swisseph as swe
+from fastapi.testclient import TestClient
+
+from app import ephemeris
+from app.main import app
+from app.transit_events import NAKSHATRA_SPAN, find_transit_events
+from app.engine import PLANET_MAP, SIGNS, NAKSHATRAS
+
+
+def test_mercury_stations_2020():
+    events = find_transit_events(swe.julday(2020, 1, 1, 0), swe.julday(2020, 4, 1, 0), ["Mercury"], ["station"])
+    assert [e["direction"] for e in events] == ["retrograde", "direct"]
+    # Published: stationary retrograde 2020-02-17 00:54 UT, direct 2020-03-10 03:49 UT
+    assert abs(events[0]["jd"] - swe.julday(2020, 2, 17, 0.9)) < 0.02
+    assert abs(events[1]["jd"] - swe.julday(2020, 3, 10, 3.82)) < 0.02
+
+
+def test_ingresses_land_on_boundaries():
+    start, end = swe.julday(2024, 1, 1, 0), swe.julday(2025, 1, 1, 0)
+    events = find_transit_events(start, end, ["Moon", "Mars", "Rahu"], ["sign_ingress", "nakshatra_ingress"])
+    # About 13.4 sidereal months: every sign and nakshatra entered 13 or 14 times
+    moon_signs = [e for e in events if e["body"] == "Moon" and e["type"] == "sign_ingress"]
+    assert 13 * 12 <= len(moon_signs) <= 14 * 12
+    for e in events:
+        before, after = (ephemeris.calc_ut(e["jd"] + dt, PLANET_MAP[e["body"]], "LAHIRI")[0] for dt in (-2e-4, 2e-4))
+        if e["type"] == "sign_ingress":
+            assert SIGNS[int(after / 30)] == e["sign"] != SIGNS[int(before / 30)]
+        else:
+            assert NAKSHATRAS[int(after / NAKSHATRA_SPAN)] == e["nakshatra"] != NAKSHATRAS[int(before / NAKSHATRA_SPAN)]
+
+
+def test_transit_events_endpoint():
+    client = TestClient(app)
+    response = client.get("/api/transits/events", params={"from": "2020-01-01", "to": "2020-12-31",
+                                                          "bodies": "mercury,venus", "types": "station,combustion"})
+    assert response.status_code == 200
+    events = response.json()["events"]
+    assert {e["body"] for e in events} == {"Mercury", "Venus"}
+    assert [e["time"] for e in events] == sorted(e["time"] for e in events)
+    assert all(e["start"] < e["end"] for e in events if e["type"] == "combustion" and e["start"] and e["end"])
+    assert client.get("/api/transits/events", params={"from": "2020-01-01", "to": "2020-02-01", "bodies": "Chiron"}).status_code == 400
+    assert client.get("/api/transits/events", params={"from": "2020-02-01", "to": "2020-01-01"}).status_code == 400
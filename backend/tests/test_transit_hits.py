@@ -0,0 +1,48 @@
+import swisseph as swe
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import ephemeris
+from app.database import Base, DBChart, DBChartNatal
+from app.services.transit_hits import NATAL_POINTS, find_transit_hits, load_natal_library, sync_natal
+
+
+def _session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_hits_across_library():
+    db = _session()
+    births = [("1991-03-05", "06:30:00", 28.61, 77.21, "LAHIRI", "Asia/Kolkata"),
+              ("1985-11-20", "23:10:00", 40.71, -74.0, "LAHIRI", None),
+              ("1962-07-14", "12:00:00", 51.5, -0.12, "RAMAN", "Europe/London"),
+              ("bad-date", "12:00:00", 0.0, 0.0, "LAHIRI", None)]
+    for i, (d, t, lat, lon, mode, tz) in enumerate(births):
+        db.add(DBChart(name=f"c{i}", date=d, time=t, latitude=lat, longitude=lon, ayanamsa_mode=mode, location_timezone=tz))
+    db.commit()
+    assert sync_natal(db) == 4
+    assert sync_natal(db) == 0
+    library = load_natal_library(db)
+    assert sorted(library) == ["LAHIRI", "RAMAN"] and len(library["LAHIRI"].chart_ids) == 2
+
+    start, end = swe.julday(2020, 1, 1, 0), swe.julday(2030, 1, 1, 0)
+    hits = find_transit_hits(library, start, end)
+    assert hits and [h["jd"] for h in hits] == sorted(h["jd"] for h in hits)
+    # The 1991 chart (natal Saturn ~Capricorn) has its Saturn return in the decade
+    assert any(h["kind"] == "saturn_return" and h["name"] == "c0" for h in hits)
+    natal = {n: (mode, dict(zip(NATAL_POINTS, p))) for mode, g in library.items() for n, p in zip(g.names, g.points.tolist())}
+    for h in hits:
+        mode, points = natal[h["name"]]
+        body = {"Jupiter": swe.JUPITER, "Saturn": swe.SATURN}.get(h["body"], swe.TRUE_NODE)
+        lon = ephemeris.calc_ut(h["jd"], body, mode)[0] + (180.0 if h["body"] == "Ketu" else 0.0)
+        assert abs((lon - points[h["point"]] + 180.0) % 360.0 - 180.0) < 0.01
+
+    # Changed birth data is recomputed; deleted charts drop their natal row
+    db.query(DBChart).filter(DBChart.name == "c1").update({"time": "23:40:00"})
+    db.query(DBChart).filter(DBChart.name == "c2").delete()
+    db.commit()
+    assert sync_natal(db) == 1
+    assert db.query(DBChartNatal).count() == 3
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.engine import get_current_transits
+from app.services.transit_snapshot import TransitSnapshots
+
+
+def test_snapshot_is_pinned_to_bucket():
+    snapshots = TransitSnapshots(cadence=300)
+    first = snapshots.get()
+    assert snapshots.get() is first and snapshots.inline_refreshes == 1
+    assert first.at.timestamp() == first.bucket * 300 and (first.expires - first.at).total_seconds() == 300
+    # Another process computing the same bucket produces the same document
+    asyncio.run(snapshots.refresh())
+    if snapshots.get().bucket == first.bucket:
+        assert snapshots.get().current.etag == first.current.etag
+    names = [t["name"] for t in get_current_transits(first.at)]
+    assert names[-2:] == ["Rahu", "Ketu"]
+
+
+def test_transit_endpoints_support_etag():
+    client = TestClient(app)
+    for path in ("/api/transits/current", "/api/transits/current/extended"):
+        response = client.get(path)
+        assert response.status_code == 200 and response.json()
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"].startswith("public, max-age=")
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_failed_refresh_keeps_previous_snapshot(monkeypatch):
+    from app.services import transit_snapshot
+
+    def fail(at):
+        raise RuntimeError("ephemeris unavailable")
+
+    snapshots = TransitSnapshots(cadence=300)
+    monkeypatch.setattr(transit_snapshot, "compute_transits", fail)
+    with pytest.raises(RuntimeError):
+        snapshots.get()
+    assert snapshots.stats()["bucket_start"] is None
+
+    monkeypatch.undo()
+    first = snapshots.get()
+    monkeypatch.setattr(transit_snapshot, "compute_transits", fail)
+    monkeypatch.setattr(snapshots, "bucket_at", lambda now=None: first.bucket + 1)
+    assert snapshots.get() is first
+    with pytest.raises(RuntimeError):
+        asyncio.run(snapshots.refresh())
+    assert snapshots.get() is first and snapshots.failures == 2
@@ -0,0 +1,61 @@
+import datetime
+
+import pytest
+
+from app.engine import calculate_daily_panchanga_extended, datetime_to_jd
+from app.transitions import LIMBS, TransitionSolver, panchanga_transitions
+
+
+@pytest.mark.parametrize("jd", [2451545.0, 2460310.75, 2415385.3, 2488070.1])
+def test_boundaries_bracket_and_hit_targets(jd):
+    limbs = panchanga_transitions(jd)
+    assert limbs.evaluations <= 20
+    check = TransitionSolver()
+    for name in ("tithi", "nakshatra", "yoga", "karana"):
+        t = getattr(limbs, name)
+        span = LIMBS[name][0]
+        assert t.start_jd <= jd < t.end_jd
+        assert int(t.angle / span) == t.index
+        for boundary, target in ((t.start_jd, t.index * span), (t.end_jd, (t.index + 1) * span)):
+            angle, _ = check.angle(name, boundary)
+            assert abs((angle - target + 180) % 360 - 180) < 1e-3
+
+
+def test_daily_panchanga_has_start_times():
+    sunrise = datetime.datetime(2024, 1, 15, 1, 10, tzinfo=datetime.timezone.utc)
+    p = calculate_daily_panchanga_extended(sunrise.date(), sunrise.time(), 12.97, 77.59, jd=datetime_to_jd(sunrise))
+    for limb in (p.tithi, p.nakshatra, p.yoga, p.karana):
+        assert limb.start_jd < datetime_to_jd(sunrise) < limb.end_jd
+        assert limb.start_time and limb.end_time
+
+
+def test_calendar_days_are_contiguous():
+    from app.engine import calculate_panchanga_calendar
+    days = list(calculate_panchanga_calendar(datetime.date(2024, 1, 1), datetime.date(2024, 1, 31), 12.97, 77.59))
+    assert [d["date"] for d in days][:2] == ["2024-01-01", "2024-01-02"] and len(days) == 31
+    for prev, day in zip(days, days[1:]):
+        assert prev["next_sunrise"] == day["sunrise"]
+        for limb in ("tithi", "nakshatra", "yoga", "karana"):
+            assert day[limb][0]["start"] <= day["sunrise"] < day[limb][0]["end"]
+            assert all(a["end"] == b["start"] for a, b in zip(day[limb], day[limb][1:]))
+            assert prev[limb][-1] == day[limb][0]
+
+
+def test_transition_index_matches_solver(tmp_path):
+    from app.transition_index import TransitionIndex, build_index
+    path = str(tmp_path / "transitions.bin")
+    start = 2460310.5
+    build_index(path, start, start + 60, ["LAHIRI"])
+    index = TransitionIndex(path)
+    solver = TransitionSolver(high_precision=True)
+    for jd in (start + 0.3, start + 17.9, start + 41.25):
+        for limb in ("tithi", "nakshatra", "yoga"):
+            ours, ref = index.transition(limb, jd), solver.transition(limb, jd)
+            assert ours.index == ref.index
+            assert abs(ours.start_jd - ref.start_jd) < 1e-5 and abs(ours.end_jd - ref.end_jd) < 1e-5
+        karana = solver.karana(jd, solver.transition("tithi", jd))
+        assert index.transition("karana", jd).index == karana.index
+    assert index.transition("nakshatra", start + 10, "RAMAN") is None
+    assert index.transition("tithi", start + 100) is None
+    days = index.between("tithi", start + 5, start + 8)
+    assert days[0].start_jd <= start + 5 < days[0].end_jd and days[-1].start_jd <= start + 8 < days[-1].end_jd
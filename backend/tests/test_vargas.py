@@ -0,0 +1,98 @@
+import numpy as np
+
+from app.engine import SIGNS, VARGA_NUMS, VARGA_ROWS, calculate_varga, calculate_varga_matrix
+
+
+# Output of the original per-varga if-chain (before the lookup table), frozen for
+# two longitudes per sign, in BASELINE_VARGAS order
+BASELINE_VARGAS = [1, 2, 3, 4, 7, 9, 10, 12, 16, 20, 24, 27, 30, 40, 45, 60]
+BASELINE = {
+    3.7: "Aries Leo Aries Aries Aries Taurus Taurus Taurus Taurus Gemini Libra Cancer Aries Leo Virgo Scorpio",
+    17.3: "Aries Cancer Leo Libra Leo Virgo Virgo Libra Capricorn Pisces Virgo Cancer Sagittarius Pisces Taurus Aquarius",
+    35.6: "Taurus Cancer Taurus Taurus Sagittarius Aquarius Aquarius Cancer Libra Pisces Scorpio Sagittarius Virgo Taurus Aries Aries",
+    49.6: "Taurus Leo Virgo Scorpio Pisces Gemini Cancer Sagittarius Gemini Capricorn Libra Sagittarius Pisces Sagittarius Capricorn Leo",
+    67.5: "Gemini Leo Gemini Virgo Cancer Sagittarius Leo Virgo Aries Capricorn Aquarius Aries Aquarius Aquarius Scorpio Virgo",
+    81.9: "Gemini Cancer Aquarius Sagittarius Scorpio Aries Capricorn Aquarius Scorpio Libra Capricorn Taurus Gemini Virgo Leo Capricorn",
+    99.4: "Cancer Cancer Cancer Libra Pisces Virgo Gemini Libra Virgo Libra Aquarius Virgo Virgo Libra Gemini Capricorn",
+    114.2: "Cancer Leo Pisces Aries Gemini Aquarius Scorpio Aries Aries Leo Aquarius Libra Capricorn Gemini Aries Cancer",
+    131.3: "Leo Leo Sagittarius Scorpio Libra Cancer Scorpio Sagittarius Aquarius Cancer Taurus Aquarius Sagittarius Cancer Sagittarius Gemini",
+    146.5: "Leo Cancer Aries Taurus Aquarius Scorpio Aries Gemini Libra Taurus Taurus Pisces Libra Pisces Scorpio Capricorn",
+    163.2: "Virgo Cancer Capricorn Sagittarius Gemini Aries Virgo Aquarius Cancer Aries Taurus Gemini Pisces Pisces Cancer Scorpio",
+    178.8: "Virgo Leo Taurus Gemini Virgo Virgo Aquarius Leo Pisces Pisces Gemini Leo Scorpio Sagittarius Cancer Gemini",
+    195.1: "Libra Cancer Aquarius Aries Capricorn Aquarius Pisces Aries Sagittarius Aquarius Leo Scorpio Sagittarius Sagittarius Aquarius Aries",
+    181.1: "Libra Leo Libra Libra Libra Libra Libra Libra Aries Aries Leo Libra Aries Taurus Taurus Sagittarius",
+    227.0: "Scorpio Leo Pisces Taurus Leo Sagittarius Sagittarius Taurus Taurus Scorpio Leo Aries Pisces Leo Virgo Virgo",
+    213.4: "Scorpio Cancer Scorpio Scorpio Taurus Leo Leo Sagittarius Virgo Aquarius Virgo Aries Taurus Aquarius Capricorn Taurus",
+    258.9: "Sagittarius Cancer Aries Gemini Aries Virgo Gemini Cancer Libra Leo Scorpio Virgo Gemini Taurus Aries Capricorn",
+    245.7: "Sagittarius Leo Sagittarius Sagittarius Capricorn Taurus Capricorn Aquarius Pisces Scorpio Sagittarius Virgo Aquarius Scorpio Leo Scorpio",
+    290.8: "Capricorn Leo Virgo Cancer Scorpio Cancer Pisces Virgo Pisces Taurus Scorpio Capricorn Capricorn Capricorn Scorpio Gemini",
+    278.0: "Capricorn Cancer Capricorn Aries Leo Pisces Scorpio Aries Leo Virgo Capricorn Aquarius Virgo Leo Aries Taurus",
+    322.7: "Aquarius Cancer Libra Scorpio Cancer Aries Virgo Scorpio Leo Pisces Aquarius Gemini Gemini Libra Gemini Scorpio",
+    310.3: "Aquarius Leo Gemini Taurus Aries Capricorn Taurus Gemini Capricorn Gemini Aries Cancer Sagittarius Taurus Scorpio Libra",
+    354.6: "Pisces Leo Scorpio Sagittarius Aquarius Aquarius Cancer Sagittarius Capricorn Sagittarius Aquarius Scorpio Capricorn Gemini Sagittarius Aries",
+    342.6: "Pisces Cancer Cancer Gemini Scorpio Libra Pisces Leo Gemini Aries Taurus Sagittarius Pisces Aquarius Gemini Aries",
+}
+
+
+def test_matrix_matches_scalar_lookup():
+    lons = np.array(list(BASELINE))
+    matrix = calculate_varga_matrix(lons)
+    assert matrix.shape == (len(VARGA_NUMS), len(lons))
+    for lon, column in zip(lons, matrix.T):
+        expected = dict(zip(BASELINE_VARGAS, BASELINE[lon].split()))
+        for v, sign in expected.items():
+            assert calculate_varga(lon, v) == sign, (lon, v)
+            assert SIGNS[column[VARGA_ROWS[v]]] == sign, (lon, v)
+
+
+def test_hand_computed_placements():
+    cases = [
+        # Navamsha: earth signs start from Capricorn; Taurus 12 deg is part 3 -> Aries
+        (42.0, 9, "Aries"),
+        # Water signs start from Cancer; Pisces 29 deg is part 8 -> Pisces (vargottama)
+        (359.0, 9, "Pisces"),
+        # Dasamsha: odd Gemini counts from itself, 17 deg is part 5 -> Scorpio
+        (77.0, 10, "Scorpio"),
+        # Even Taurus counts from its 9th (Capricorn), 4 deg is part 1 -> Aquarius
+        (34.0, 10, "Aquarius"),
+        # Shashtyamsha counts from the sign: Aries 0.6 deg is part 1, Libra 29.9 deg part 59 -> Virgo
+        (0.6, 60, "Taurus"),
+        (209.9, 60, "Virgo"),
+        # Panchamsha, even signs Venus, Mercury, Jupiter, Saturn, Mars: Taurus 25 deg -> Scorpio
+        (55.0, 5, "Scorpio"),
+        # Shashtamsha: odd Gemini from Aries, 12 deg is part 2; even Cancer from Libra, 27 deg part 5
+        (72.0, 6, "Gemini"),
+        (117.0, 6, "Pisces"),
+        # Ashtamsha: fixed Leo from Sagittarius, 10 deg is part 2; dual Gemini from Leo;
+        # movable Aries from itself, 29 deg is part 7
+        (130.0, 8, "Aquarius"),
+        (61.0, 8, "Leo"),
+        (29.0, 8, "Scorpio"),
+        # Parivritti vargas count floor(lon * n / 30) parts from Aries through the zodiac
+        (35.0, 11, "Aries"),          # 12.83 -> 12
+        (359.99, 11, "Pisces"),       # 131.996 -> 131
+        (100.1, 81, "Libra"),         # 270.27 -> 270
+        (200.2, 108, "Aries"),        # 720.72 -> 720
+        (15.3, 144, "Taurus"),        # 73.44 -> 73
+        (300.3, 150, "Taurus"),       # 1501.5 -> 1501
+    ]
+    lons = np.array([lon for lon, _, _ in cases])
+    matrix = calculate_varga_matrix(lons)
+    for i, (lon, v, sign) in enumerate(cases):
+        assert calculate_varga(lon, v) == sign, (lon, v)
+        assert SIGNS[matrix[VARGA_ROWS[v], i]] == sign, (lon, v)
+
+
+def test_known_placements():
+    # Trimshamsha boundaries fall on whole degrees
+    assert calculate_varga(4.99, 30) == "Aries" and calculate_varga(5.0, 30) == "Aquarius"
+    assert calculate_varga(30 + 11.99, 30) == "Virgo" and calculate_varga(30 + 12.0, 30) == "Pisces"
+    # Panchamsha: odd and even signs
+    assert calculate_varga(6.5, 5) == "Aquarius" and calculate_varga(36.5, 5) == "Virgo"
+    # Shashtamsha: even signs start from Libra
+    assert calculate_varga(30.5, 6) == "Libra"
+    # Ashtamsha: fixed signs start from Sagittarius
+    assert calculate_varga(30.5, 8) == "Sagittarius"
+    # Parivritti vargas continue the count from sign to sign
+    assert calculate_varga(29.99, 11) == "Aquarius" and calculate_varga(30.0, 11) == "Pisces"
+    assert calculate_varga(359.99, 150) == "Pisces"
@@ -75,7 +75,15 @@ export const DivisionalChartsTab: React.FC<Props> = ({ chartData, birthDetails,
         'D7': "Saptamsha. Children and creative output.",
         'D12': "Dwadashamsha. Parents and ancestry.",
         'D30': "Trimshamsha. Misfortunes and health issues.",
-        'D60': "Shashtyamsha. Past life karma and fine details."
+        'D60': "Shashtyamsha. Past life karma and fine details.",
+        'D5': "Panchamsha. Fame, authority and spiritual merit.",
+        'D6': "Shashtamsha. Health, disease and obstacles.",
+        'D8': "Ashtamsha. Sudden events and longevity.",
+        'D11': "Rudramsha. Destruction, gains and endings.",
+        'D81': "Nava-Navamsha. Fine reading of the Navamsha.",
+        'D108': "Ashtottaramsha. Deep spiritual and karmic influences.",
+        'D144': "Dwadas-Dwadashamsha. Fine reading of the Dwadashamsha.",
+        'D150': "Nadiamsha. Finest division used in Nadi astrology."
     };
 
     return (